@@ -0,0 +1,103 @@
+import argparse
+import math
+import os
+import random
+import statistics
+import tempfile
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy") # Kein Fenster nötig
+
+import pygame
+
+import breakout_levels
+from breakout_bricks import BrickField
+
+# --- Konfiguration ---
+# Misst für wachsende Levelgrößen, wie lange Erzeugen, Speichern, Laden und
+# Aufbauen (BrickField) dauern und was ein Frame kostet: Kollisionen von BALLS
+# Bällen und das Zeichnen des sichtbaren Ausschnitts. Dank Gitter-Index sollten
+# die Kosten pro Frame kaum mit der Anzahl der Bricks wachsen.
+LEVEL_SIZES = ((10, 100), (50, 200), (100, 500), (300, 1000))  # (Zeilen, Spalten)
+BRICK_SIZE = (75, 20)    # Wie in breakout.py
+BRICK_GAP = 5
+BALLS = 32               # Gleichzeitige Bälle (Multi-Ball)
+BALL_RADIUS = 10
+BALL_SPEED = 6           # Pixel pro Simulationsschritt
+FRAMES = 300             # Gemessene Simulationsschritte pro Level
+VIEWPORT = (800, 600)    # Sichtbarer Ausschnitt beim Zeichnen
+COLORS = [(213, 50, 80), (254, 150, 0), (236, 240, 0), (0, 200, 110), (60, 135, 220)]
+SEED = 1
+
+
+def timed(function, *args):
+    """Gibt (Ergebnis, Dauer in s) zurück."""
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def frame_costs(bricks, width, height, frames=FRAMES, n_balls=BALLS, seed=SEED):
+    """Mittlere Zeit pro Frame in s: (Kollision aller Bälle, Zeichnen des Ausschnitts)."""
+    rnd = random.Random(seed)
+    balls = []
+    for _ in range(n_balls):
+        angle = rnd.uniform(0, 2 * math.pi)
+        balls.append([rnd.uniform(0, width), rnd.uniform(0, height),
+                      BALL_SPEED * math.cos(angle), BALL_SPEED * math.sin(angle)])
+    screen = pygame.Surface(VIEWPORT)
+    collide_times = []
+    draw_times = []
+    for _ in range(frames):
+        start = time.perf_counter()
+        for ball in balls:
+            x, y, dx, dy, _ = bricks.move_ball(ball[0], ball[1], ball[2], ball[3], BALL_RADIUS)
+            if (x < BALL_RADIUS and dx < 0) or (x > width - BALL_RADIUS and dx > 0): # Am Levelrand umkehren
+                dx = -dx
+            if (y < BALL_RADIUS and dy < 0) or (y > height - BALL_RADIUS and dy > 0):
+                dy = -dy
+            ball[:] = x, y, dx, dy
+        collide_times.append(time.perf_counter() - start)
+
+        # Ausschnitt um den ersten Ball, wie eine mitlaufende Kamera
+        left = int(min(max(0, balls[0][0] - VIEWPORT[0] / 2), max(0, width - VIEWPORT[0])))
+        top = int(min(max(0, balls[0][1] - VIEWPORT[1] / 2), max(0, height - VIEWPORT[1])))
+        start = time.perf_counter()
+        screen.fill((0, 0, 0))
+        for brick in bricks.query(left, top, left + VIEWPORT[0], top + VIEWPORT[1]):
+            pygame.draw.rect(screen, brick['color'], brick['rect'].move(-left, -top), border_radius=3)
+        draw_times.append(time.perf_counter() - start)
+    return statistics.mean(collide_times), statistics.mean(draw_times)
+
+
+# --- Hauptteil des Skripts ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ladezeit und Frame-Kosten von Breakout-Levels messen.")
+    parser.add_argument("--sizes", nargs="*", default=[f"{r}x{c}" for r, c in LEVEL_SIZES],
+                        help="Levelgrößen als ZEILENxSPALTEN (Standard: %(default)s)")
+    parser.add_argument("--frames", type=int, default=FRAMES)
+    parser.add_argument("--balls", type=int, default=BALLS)
+    args = parser.parse_args()
+    try:
+        sizes = [tuple(int(n) for n in size.lower().split("x")) for size in args.sizes]
+    except ValueError:
+        parser.error("Größen im Format ZEILENxSPALTEN angeben, z.B. 100x500")
+
+    pygame.init()
+    print(f"{'Level':>10} {'Bricks':>8} {'Erzeugen':>9} {'Datei':>8} {'Speichern':>10} {'Laden':>8} "
+          f"{'Aufbauen':>9} {'Kollision/Frame':>16} {'Zeichnen/Frame':>15}")
+    with tempfile.TemporaryDirectory() as directory:
+        for rows, cols in sizes:
+            path = os.path.join(directory, f"level_{rows}x{cols}.npz")
+            level, generate_s = timed(breakout_levels.generate_level, rows, cols, SEED)
+            _, save_s = timed(breakout_levels.save_level, path, level)
+            loaded, load_s = timed(breakout_levels.load_level, path)
+            bricks = BrickField()
+            count, build_s = timed(breakout_levels.build_bricks, loaded, bricks, COLORS,
+                                   BRICK_SIZE[0], BRICK_SIZE[1], BRICK_GAP, 0, 0)
+            collide_s, draw_s = frame_costs(bricks, cols * (BRICK_SIZE[0] + BRICK_GAP),
+                                            rows * (BRICK_SIZE[1] + BRICK_GAP), args.frames, args.balls)
+            print(f"{rows:>4}x{cols:<5} {count:>8} {generate_s * 1000:>7.1f}ms {os.path.getsize(path) / 1024:>6.1f}KB "
+                  f"{save_s * 1000:>8.1f}ms {load_s * 1000:>6.1f}ms {build_s * 1000:>7.1f}ms "
+                  f"{collide_s * 1000:>14.3f}ms {draw_s * 1000:>13.3f}ms")
+    pygame.quit()
@@ -0,0 +1,71 @@
+import sys
+import time
+
+import cv2
+
+import bild_ausewrtung_multiple_numbers as multi
+from ocr_backends import TESSERACT_ENGINES, get_ocr_backend
+
+# --- Konfiguration ---
+# Vergleicht pytesseract (ein Prozess pro Aufruf) mit tesserocr (Engine im Prozess)
+# anhand der 5 OCR-Varianten x 6 ROIs aus bild_ausewrtung_multiple_numbers.py.
+IMAGE_PATH = 'received_original.jpg'
+REPEATS = 5  # Anzahl Durchläufe pro Engine (nach einem Aufwärmdurchlauf)
+CALLS_PER_ROI = 5
+
+
+def load_rois(image_path):
+    """Lädt das Bild und gibt die vorverarbeiteten ROIs zurück."""
+    image = cv2.imread(image_path)
+    if image is None:
+        print(f"Fehler: Bild konnte nicht geladen werden: '{image_path}'")
+        sys.exit(1)
+    gray_image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    roi_imgs = []
+    for roi in multi.rois:
+        roi_img = gray_image[roi["y"]:roi["y"] + roi["h"], roi["x"]:roi["x"] + roi["w"]]
+        if roi_img.size > 0 and roi_img.shape == (roi["h"], roi["w"]):
+            roi_imgs.append(roi_img)
+    return multi.preprocess_rois(roi_imgs)
+
+
+def run_engine(engine, roi_processed_images):
+    """Misst die OCR-Zeit einer Engine über alle ROIs. Gibt (Zeiten, Ergebnisse) zurück."""
+    multi.OCR_ENGINE = engine
+    # Aufwärmen: lädt bei tesserocr die Engines, bei pytesseract Dateisystem-Caches
+    results = [multi.select_best_result(multi.ocr_roi_variants(p))["extracted_digits"]
+               for p in roi_processed_images]
+    durations = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        for roi_processed in roi_processed_images:
+            multi.ocr_roi_variants(roi_processed)
+        durations.append(time.perf_counter() - start)
+    return durations, results
+
+
+if __name__ == "__main__":
+    image_path = sys.argv[1] if len(sys.argv) > 1 else IMAGE_PATH
+    roi_processed_images = load_rois(image_path)
+    calls_per_image = len(roi_processed_images) * CALLS_PER_ROI
+    print(f"{len(roi_processed_images)} ROIs, {calls_per_image} OCR-Aufrufe pro Bild, {REPEATS} Durchläufe\n")
+
+    timings = {}
+    for engine in TESSERACT_ENGINES:
+        try:
+            get_ocr_backend(engine)
+        except ImportError as e:
+            print(f"{engine}: nicht verfügbar ({e})")
+            continue
+        durations, results = run_engine(engine, roi_processed_images)
+        best = min(durations)
+        avg = sum(durations) / len(durations)
+        timings[engine] = (best, results)
+        print(f"{engine:>10}: Ø {avg * 1000:8.1f} ms/Bild, bestes {best * 1000:8.1f} ms/Bild, "
+              f"{best / calls_per_image * 1000:6.2f} ms/Aufruf, Ziffern: {''.join(results)}")
+
+    if 'tesseract' in timings and 'tesserocr' in timings:
+        speedup = timings['tesseract'][0] / timings['tesserocr'][0]
+        same = timings['tesseract'][1] == timings['tesserocr'][1]
+        print(f"\ntesserocr ist {speedup:.1f}x schneller als pytesseract "
+              f"({'gleiche' if same else 'ABWEICHENDE'} Ergebnisse)")
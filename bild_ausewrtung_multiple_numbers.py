@@ -2,7 +2,16 @@ import cv2
 import pytesseract
 import re
 import os # Modul zum Prüfen, ob die Datei existiert
+import time # Für die Zeitmessung der OCR
 import numpy as np  # Für die Anzeige mehrerer Bilder
+from concurrent.futures import ThreadPoolExecutor # Parallele OCR-Aufrufe
+from ocr_cache import DigitOCRCache # Cache für unveränderte Ziffern
+from ocr_backends import TESSERACT_ENGINES, get_ocr_backend # pytesseract oder tesserocr
+from digit_templates import get_classifier # Schnelle Ziffernerkennung per Template-Vergleich
+from counter_decoder import RollingCounterDecoder, digit_candidates # Plausibilisierung über die Zeit
+from ocr_cascade import VariantWinStats # Gewinnstatistik der OCR-Varianten
+from debug_sink import DebugSink # Debug-Bilder im Hintergrund speichern
+from preprocessing_pipeline import PreprocessingPipeline, ScaleStage, BlurStage, ThresholdStage # Gestapelte Vorverarbeitung
 
 # --- Konfiguration ---
 
@@ -17,25 +26,54 @@ import numpy as np  # Für die Anzeige mehrerer Bilder
 # !!! ÄNDERN SIE DIES ZU IHREM BILDNAMEN/PFAD !!!
 image_path = 'received_original.jpg' # Ersetzen Sie dies mit dem Pfad zu Ihrem Bild
 
-# --- Vorbereitung ---
-# Prüfen, ob das Bild existiert
-if not os.path.exists(image_path):
-    print(f"Fehler: Bilddatei nicht gefunden unter '{image_path}'")
-    exit() # Beendet das Skript, wenn die Datei nicht existiert
-
-# --- Bild laden ---
-try:
-    image = cv2.imread(image_path)
-    if image is None:
-        print(f"Fehler: Bild konnte nicht geladen werden. Prüfen Sie den Pfad und das Dateiformat: '{image_path}'")
-        exit()
-except Exception as e:
-    print(f"Ein Fehler ist beim Laden des Bildes aufgetreten: {e}")
-    exit()
+# OCR Engine: 'tesseract' (pytesseract, ein Prozess pro Aufruf),
+# 'tesserocr' (Tesseract im Prozess geladen, pip install tesserocr) oder
+# 'template' (Vergleich mit gelernten Ziffern, siehe digit_templates.py).
+# Bei 30 Aufrufen pro Bild dominiert sonst der Prozessstart die Laufzeit.
+OCR_ENGINE = 'tesseract'
+
+# --- Template-Erkennung (Nur wenn OCR_ENGINE = 'template') ---
+TEMPLATE_FILE = 'digit_templates.npz' # Erstellen mit: python digit_templates.py train <Ordner>
+TEMPLATE_MIN_CONFIDENCE = 60.0 # Darunter wird die Ziffer zusätzlich mit Tesseract erkannt
+TEMPLATE_FALLBACK_ENGINE = 'tesseract' # 'tesseract' oder 'tesserocr'
+
+# --- Parallele OCR ---
+# Alle ROI x Varianten OCR-Aufrufe sind unabhängig voneinander und werden auf
+# einen Thread-Pool verteilt. Threads reichen, da sowohl der tesseract-Prozess
+# (pytesseract) als auch tesserocr während der Erkennung den GIL freigeben.
+OCR_PARALLEL = True
+OCR_MAX_WORKERS = os.cpu_count() or 4
+
+# --- OCR-Strategie ---
+# 'all':     Alle 5 Varianten pro ROI ausführen, danach die beste Konfidenz wählen.
+# 'cascade': Varianten nach bisheriger Gewinnquote ordnen und abbrechen, sobald
+#            eine Variante genau eine Ziffer mit ausreichender Konfidenz liefert.
+OCR_STRATEGY = 'cascade'
+CASCADE_CONF_THRESHOLD = 80.0 # Mindestkonfidenz (0-100) für den vorzeitigen Abbruch
+CASCADE_EXPLORE_EVERY = 20 # Jedes n-te Bild mit allen Varianten, hält die Statistik aktuell
+VARIANT_STATS_FILE = 'ocr_variant_stats.json' # Gewinnstatistik bleibt zwischen Skriptläufen erhalten
+# Niedrigere Schwelle, wenn die Ziffer zum letzten Zählerstand passt (gleich oder +1)
+CASCADE_EXPECTED_CONF_THRESHOLD = 50.0
 
-# --- Bildvorverarbeitung ---
-# 1. Konvertierung in Graustufen (OCR arbeitet oft besser mit Graustufen)
-gray_image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+# --- Zählerstand-Plausibilisierung ---
+# Ein Rollenzählwerk kann nur steigen, und nur um einen begrenzten Betrag.
+# Der letzte übernommene Stand wird gespeichert und jede neue Lesung daran geprüft.
+COUNTER_DECODER_ENABLED = True
+COUNTER_STATE_FILE = 'counter_state.json'
+COUNTER_MAX_INCREASE = 500 # Maximaler Anstieg zwischen zwei Aufnahmen
+
+# --- OCR-Cache ---
+# Ziffern, deren ROI sich seit der letzten Aufnahme nicht verändert hat,
+# werden aus dem Cache beantwortet statt erneut 5x durch Tesseract zu laufen.
+OCR_CACHE_ENABLED = True
+OCR_CACHE_FILE = 'ocr_cache.json' # Cache bleibt zwischen Skriptläufen erhalten
+OCR_CACHE_MAX_ENTRIES = 256
+OCR_CACHE_MAX_HAMMING = 2 # Erlaubte Abweichung (Bits von 64) für "unverändert", nur innerhalb desselben ROI
+
+# --- Debug-Bilder ---
+# 4 PNGs pro ROI plus Übersichtsbilder: 'off', 'sampled' oder 'always' (siehe debug_sink.py)
+DEBUG_IMAGE_MODE = 'always'
+DEBUG_SAMPLE_EVERY = 10
 
 # --- Definition der 6 ROIs ---
 rois = [
@@ -47,69 +85,12 @@ rois = [
     {"name": "ROI 6", "x": 280, "y": 65, "w": 35, "h": 55, "color": (0, 255, 255)} # ROI 6 in Gelb
 ]
 
-# ROIs in Originalbild einzeichnen und extrahieren
-image_with_rois = image.copy()
-roi_images = []
-roi_processed_images = []
-
-for roi in rois:
-    # ROI einzeichnen
-    cv2.rectangle(image_with_rois, 
-                 (roi["x"], roi["y"]), 
-                 (roi["x"] + roi["w"], roi["y"] + roi["h"]), 
-                 roi["color"], 2)
-    cv2.putText(image_with_rois, roi["name"], 
-                (roi["x"], roi["y"] - 5), 
-                cv2.FONT_HERSHEY_SIMPLEX, 0.7, roi["color"], 2)
-    
-    # Prüfen, ob die ROI innerhalb des Bildes liegt
-    if (roi["x"] >= 0 and roi["y"] >= 0 and 
-        roi["x"] + roi["w"] <= image.shape[1] and 
-        roi["y"] + roi["h"] <= image.shape[0]):
-        
-        # ROI extrahieren
-        roi_img = gray_image[roi["y"]:roi["y"]+roi["h"], roi["x"]:roi["x"]+roi["w"]]
-        
-        # Prüfen, ob ROI nicht leer ist
-        if roi_img.size > 0:
-            roi_images.append(roi_img)
-            
-            # ROI verarbeiten
-            # 1. Adaptive Threshold
-            roi_adapt = cv2.adaptiveThreshold(roi_img, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, 
-                                            cv2.THRESH_BINARY_INV, 11, 2)
-            
-            # 2. Minimale Verarbeitung mit Otsu-Thresholding
-            roi_min = cv2.GaussianBlur(roi_img, (3, 3), 0)
-            _, roi_min_thresh = cv2.threshold(roi_min, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
-            
-            # 3. Vergrößerte Version für bessere OCR
-            roi_resized = cv2.resize(roi_img, (roi_img.shape[1]*3, roi_img.shape[0]*3), 
-                                    interpolation=cv2.INTER_CUBIC)
-            _, roi_resized_thresh = cv2.threshold(roi_resized, 0, 255, 
-                                                cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
-            
-            # Speichern der verarbeiteten ROIs
-            roi_processed = {
-                "original": roi_img,
-                "adaptive": roi_adapt,
-                "minimal": roi_min_thresh,
-                "resized": roi_resized_thresh
-            }
-            roi_processed_images.append(roi_processed)
-            
-            # Optional: Speichern der ROIs als separate Bilder
-            cv2.imwrite(f'{roi["name"].replace(" ", "_")}_original.png', roi_img)
-            cv2.imwrite(f'{roi["name"].replace(" ", "_")}_adaptive.png', roi_adapt)
-            cv2.imwrite(f'{roi["name"].replace(" ", "_")}_minimal.png', roi_min_thresh)
-            cv2.imwrite(f'{roi["name"].replace(" ", "_")}_resized.png', roi_resized_thresh)
-        else:
-            print(f"Warnung: ROI {roi['name']} ist leer oder außerhalb des Bildes.")
-    else:
-        print(f"Warnung: ROI {roi['name']} liegt außerhalb des Bildes und wird übersprungen.")
-
-# Speichern des Bildes mit allen ROIs
-cv2.imwrite('image_with_all_rois.png', image_with_rois)
+# --- Automatische ROI-Kalibrierung ---
+# Ersetzt die Koordinaten oben durch automatisch gefundene Ziffernzellen
+# (siehe roi_calibration.py). Namen und Farben der ROIs bleiben erhalten.
+ROI_AUTO_CALIBRATE = False
+ROI_CALIBRATION_FILE = 'roi_calibration.json'
+ROI_CAMERA_ID = 'default' # Schlüssel in der Kalibrierdatei
 
 # --- OCR mit Pytesseract ---
 # Verschiedene Konfigurationen für Tesseract testen:
@@ -118,182 +99,460 @@ config_single_char = r'--oem 3 --psm 10 -c tessedit_char_whitelist=0123456789'
 config_single_line = r'--oem 3 --psm 7 -c tessedit_char_whitelist=0123456789'
 config_single_word = r'--oem 3 --psm 8 -c tessedit_char_whitelist=0123456789'
 
-# Sammeln aller Erkennungsergebnisse
-all_recognition_results = []
+# Die 5 OCR-Varianten pro ROI: (Methodenname, verarbeitetes Bild, Tesseract-Konfiguration)
+OCR_VARIANTS = [
+    ("Original (Zeichen)", "original", config_single_char),  # 1. Original-ROI (Einzelzeichenmodus)
+    ("Original (Zeile)", "original", config_single_line),    # 2. Original-ROI mit Zeilenerkennung
+    ("Adaptive Threshold", "adaptive", config_single_char),  # 3. Adaptive Threshold
+    ("Minimal verarbeitet", "minimal", config_single_char),  # 4. Minimal verarbeitet
+    ("Vergrößert", "resized", config_single_char),           # 5. Vergrößerte Version
+]
 
-try:
-    for i, roi in enumerate(rois):
-        if i >= len(roi_processed_images):
-            print(f"Überspringe ROI {roi['name']}, da sie nicht erfolgreich verarbeitet wurde.")
-            continue
-            
-        roi_processed = roi_processed_images[i]
-        
-        # OCR mit Konfidenzwerten für jede Erkennungsmethode
-        # Basismethode: image_to_data gibt detaillierte Daten mit Konfidenzwerten zurück
-        
-        # 1. Original-ROI OCR mit Konfidenz (Einzelzeichenmodus)
-        data_original = pytesseract.image_to_data(roi_processed["original"], config=config_single_char, 
-                                                  output_type=pytesseract.Output.DICT)
-        
-        # 2. Original-ROI mit Zeilenerkennung
-        data_original_line = pytesseract.image_to_data(roi_processed["original"], config=config_single_line, 
-                                                      output_type=pytesseract.Output.DICT)
-        
-        # 3. Adaptive Threshold mit Einzelzeichenmodus
-        data_adapt = pytesseract.image_to_data(roi_processed["adaptive"], config=config_single_char, 
-                                              output_type=pytesseract.Output.DICT)
-        
-        # 4. Minimal verarbeitet mit Einzelzeichenmodus
-        data_min = pytesseract.image_to_data(roi_processed["minimal"], config=config_single_char, 
-                                            output_type=pytesseract.Output.DICT)
-        
-        # 5. Vergrößerte Version mit Einzelzeichenmodus
-        data_resized = pytesseract.image_to_data(roi_processed["resized"], config=config_single_char, 
-                                                output_type=pytesseract.Output.DICT)
-        
-        # Hilfsfunktion, um Text und durchschnittliche Konfidenz aus den OCR-Daten zu extrahieren
-        def extract_text_and_confidence(data):
-            texts = []
-            confs = []
-            
-            for i in range(len(data['text'])):
-                if int(data['conf'][i]) > 0:  # Nur gültige Konfidenzwerte (> 0)
-                    texts.append(data['text'][i])
-                    confs.append(float(data['conf'][i]))
-            
-            if texts:
-                text = ' '.join(texts).strip()
-                avg_conf = sum(confs) / len(confs) if confs else 0
-                return text, avg_conf
-            else:
-                return "", 0.0
-        
-        # Ergebnisse mit Konfidenzwerten extrahieren
-        text_original, conf_original = extract_text_and_confidence(data_original)
-        text_original_line, conf_original_line = extract_text_and_confidence(data_original_line)
-        text_adapt, conf_adapt = extract_text_and_confidence(data_adapt)
-        text_min, conf_min = extract_text_and_confidence(data_min)
-        text_resized, conf_resized = extract_text_and_confidence(data_resized)
-        
-        # Ergebnis mit der besten Erkennung verwenden
-        results = {
-            "Original (Zeichen)": {"text": text_original.strip(), "conf": conf_original},
-            "Original (Zeile)": {"text": text_original_line.strip(), "conf": conf_original_line},
-            "Adaptive Threshold": {"text": text_adapt.strip(), "conf": conf_adapt},
-            "Minimal verarbeitet": {"text": text_min.strip(), "conf": conf_min},
-            "Vergrößert": {"text": text_resized.strip(), "conf": conf_resized}
-        }
-        
-        # Beste Methode auswählen - bevorzuge Methoden mit höherer Konfidenz
-        best_method = None
-        best_conf = -1
-        best_text = ""
-        
-        for method, result in results.items():
-            if result["text"] and result["conf"] > best_conf:
-                best_conf = result["conf"]
-                best_text = result["text"]
-                best_method = method
-        
-        # Wenn keine Methode erfolgreich war, Standard-Fallback
-        if not best_text:
-            best_text = text_original
-            best_method = "Original (Zeichen)"
-            best_conf = conf_original
-            
+
+# --- Funktionen ---
+# Vorverarbeitung der Varianten: je eine Pipeline, die alle ROIs eines Bildes
+# gestapelt verarbeitet und ihre Puffer über mehrere Bilder wiederverwendet.
+PREPROCESSING_PIPELINES = {
+    # 1. Adaptive Threshold
+    "adaptive": PreprocessingPipeline([ThresholdStage('adaptive', invert=True, block_size=11, c=2)]),
+    # 2. Minimale Verarbeitung mit Otsu-Thresholding
+    "minimal": PreprocessingPipeline([BlurStage('gaussian', 3), ThresholdStage('otsu', invert=True)]),
+    # 3. Vergrößerte Version für bessere OCR
+    "resized": PreprocessingPipeline([ScaleStage(3, cv2.INTER_CUBIC), ThresholdStage('otsu', invert=True)]),
+}
+
+
+def preprocess_rois(roi_imgs):
+    """Erzeugt die verarbeiteten Varianten aller (gleich großen) Graustufen-ROIs eines Bildes.
+
+    Die Bilder sind Ansichten in die Puffer der Pipelines und nur bis zum
+    nächsten Aufruf gültig.
+    """
+    batches = {key: pipeline.run(roi_imgs) for key, pipeline in PREPROCESSING_PIPELINES.items()}
+    return [dict({"original": roi_img}, **{key: batch[i] for key, batch in batches.items()})
+            for i, roi_img in enumerate(roi_imgs)]
+
+
+def preprocess_roi(roi_img):
+    """Erzeugt die verarbeiteten Varianten eines einzelnen Graustufen-ROI (als Kopie)."""
+    return {key: img.copy() for key, img in preprocess_rois([roi_img])[0].items()}
+
+
+def preprocessing_timing_summary():
+    return "; ".join(f"{key}: {pipeline.timing_summary()}" for key, pipeline in PREPROCESSING_PIPELINES.items())
+
+
+def tesseract_engine():
+    """Tesseract-Backend für die OCR-Varianten (bei 'template' das Fallback)."""
+    return OCR_ENGINE if OCR_ENGINE in TESSERACT_ENGINES else TEMPLATE_FALLBACK_ENGINE
+
+
+def ocr_variant(roi_processed, variant):
+    """Führt einen einzelnen OCR-Aufruf (eine Variante eines ROI) durch."""
+    _, image_key, config = variant
+    # recognize() liefert Text und durchschnittliche Konfidenz (pytesseract: image_to_data)
+    text, conf = get_ocr_backend(tesseract_engine()).recognize(roi_processed[image_key], config=config)
+    return {"text": text.strip(), "conf": conf}
+
+
+def ocr_roi_variants(roi_processed):
+    """Führt die OCR für alle 5 Varianten eines ROI durch (mit Konfidenzwerten)."""
+    return {variant[0]: ocr_variant(roi_processed, variant) for variant in OCR_VARIANTS}
+
+
+def is_confident_digit(result, expected=None):
+    """True, wenn ein Ergebnis genau eine Ziffer mit ausreichender Konfidenz enthält.
+
+    expected: Ziffern, die laut letztem Zählerstand zu erwarten sind (niedrigere Schwelle).
+    """
+    digits = re.sub(r'\D', '', result["text"])
+    if len(digits) != 1:
+        return False
+    threshold = CASCADE_EXPECTED_CONF_THRESHOLD if expected and digits in expected else CASCADE_CONF_THRESHOLD
+    return result["conf"] >= threshold
+
+
+def ocr_roi_cascade(roi_processed, variant_stats=None, expected=None):
+    """Führt die Varianten der Reihe nach aus, bis eine sicher genug ist."""
+    variants = variant_stats.order(OCR_VARIANTS) if variant_stats is not None else OCR_VARIANTS
+    results = {}
+    for variant in variants:
+        result = ocr_variant(roi_processed, variant)
+        results[variant[0]] = result
+        if is_confident_digit(result, expected):
+            break
+    return results
+
+
+def finish_recognition(results, variant_stats=None):
+    """Wählt das beste Ergebnis und zählt den Sieg der Variante."""
+    recognition = select_best_result(results)
+    if variant_stats is not None:
+        variant_stats.record(recognition["best_method"], calls=len(results),
+                             early_exit=len(results) < len(OCR_VARIANTS))
+    return recognition
+
+
+def select_best_result(results):
+    """Wählt die Methode mit der höchsten Konfidenz und bereinigt den Text."""
+    best_method = None
+    best_conf = -1
+    best_text = ""
+
+    for method, result in results.items():
+        if result["text"] and result["conf"] > best_conf:
+            best_conf = result["conf"]
+            best_text = result["text"]
+            best_method = method
+
+    # Wenn keine Methode erfolgreich war, Standard-Fallback
+    if not best_text:
+        best_method = "Original (Zeichen)" if "Original (Zeichen)" in results else next(iter(results))
+        best_text = results[best_method]["text"]
+        best_conf = results[best_method]["conf"]
+
+    return {
+        "results": results,
+        "best_method": best_method,
+        "best_confidence": best_conf,
+        "detected_text": best_text,
         # Bereinigen - nur Ziffern behalten
-        extracted_digits = re.sub(r'\D', '', best_text)
-        
-        # Ergebnisse speichern
-        all_recognition_results.append({
-            "roi_name": roi["name"],
-            "results": results,
-            "best_method": best_method,
-            "best_confidence": best_conf,
-            "detected_text": best_text,
-            "extracted_digits": extracted_digits
-        })
-        
-except pytesseract.TesseractNotFoundError:
-    print("Fehler: Tesseract wurde nicht gefunden.")
-    print("Stellen Sie sicher, dass Tesseract OCR installiert ist und der Pfad ggf.")
-    print("in der Variable 'pytesseract.pytesseract.tesseract_cmd' oben im Skript korrekt gesetzt ist.")
-    exit()
-except Exception as e:
-    print(f"Ein Fehler ist während der OCR-Verarbeitung aufgetreten: {e}")
-    exit()
-
-# --- Ergebnisse ausgeben ---
-print("\n--- OCR-Erkennungsergebnisse für alle ROIs ---")
-for result in all_recognition_results:
-    print(f"\n{result['roi_name']}:")
-    print(f"  Erkannter Text: '{result['detected_text']}'")
-    print(f"  Extrahierte Ziffern: '{result['extracted_digits']}'")
-    print(f"  Beste Methode: {result['best_method']}")
-    print(f"  Konfidenz: {result['best_confidence']:.2f}%")
-    
-    print("  Detaillierte Ergebnisse je Methode:")
-    for method, res in result["results"].items():
-        print(f"    - {method}: '{res['text']}' (Konfidenz: {res['conf']:.2f}%)")
-
-# --- Optional: Zusammenfassung aller erkannten Zahlen mit Konfidenz ---
-all_digits = [(result["extracted_digits"], result["best_confidence"]) for result in all_recognition_results]
-print("\n--- Zusammenfassung aller erkannten Ziffern mit Konfidenz ---")
-for i, (digits, conf) in enumerate(all_digits):
-    if i < len(all_recognition_results):
-        print(f"{all_recognition_results[i]['roi_name']}: {digits} (Konfidenz: {conf:.2f}%)")
-
-# --- Bilder anzeigen ---
-# Zeige das Originalbild mit allen ROIs
-cv2.imshow("Originalbild mit allen ROIs", image_with_rois)
-
-# Erstelle ein Gitter zum Anzeigen aller ROI-Bilder
-if roi_images:  # Nur fortfahren, wenn wir ROIs haben
-    # ROIs in einer Reihe anzeigen
-    roi_display_images = []
+        "extracted_digits": re.sub(r'\D', '', best_text)
+    }
+
+
+def lookup_cache(roi_processed, cache):
+    """Gibt (Cache-Schlüssel, gespeichertes Ergebnis oder None) für ein ROI zurück."""
+    if cache is None:
+        return None, None
+    # Schlüssel aus dem binarisierten ROI, robust gegen leichte Helligkeitsschwankungen.
+    # Pro ROI getrennt, damit eine andere Ziffernstelle nie deren Ergebnis liefert.
+    cache_key = cache.key(roi_processed["minimal"], roi_processed.get("roi"))
+    return cache_key, cache.get(cache_key)
+
+
+def recognize_rois(roi_processed_images, cache=None, executor=None, variant_stats=None, expected_digits=None):
+    """Erkennt alle ROIs mit der konfigurierten OCR_ENGINE (in der Reihenfolge der ROIs).
+
+    expected_digits: optional je ROI die laut letztem Zählerstand erwarteten Ziffern.
+    """
+    if OCR_ENGINE == 'template':
+        return recognize_rois_template(roi_processed_images, cache, executor, variant_stats, expected_digits)
+    return recognize_rois_tesseract(roi_processed_images, cache, executor, variant_stats, expected_digits)
+
+
+def recognize_rois_tesseract(roi_processed_images, cache=None, executor=None, variant_stats=None,
+                             expected_digits=None):
+    """Erkennt ROIs mit Tesseract. Mit executor laufen alle ROI x Varianten Aufrufe parallel.
+
+    Bei OCR_STRATEGY = 'cascade' hängt jede Variante vom Ergebnis der vorherigen ab,
+    dann laufen nur die ROIs parallel. Cache und Statistik werden nur hier im
+    aufrufenden Thread gelesen und geschrieben. Gibt die Ergebnisse in der
+    Reihenfolge der ROIs zurück.
+    """
+    expected_digits = expected_digits or [None] * len(roi_processed_images)
+    recognitions = [None] * len(roi_processed_images)
+    pending = {}  # ROI-Index -> Cache-Schlüssel
     for i, roi_processed in enumerate(roi_processed_images):
-        # Originales ROI anzeigen
-        img = roi_processed["original"]
-        h, w = img.shape
-        # Text hinzufügen mit erkannten Ziffern und Konfidenz
-        img_color = cv2.cvtColor(img, cv2.COLOR_GRAY2BGR)
-        text = f"{all_recognition_results[i]['extracted_digits']} ({all_recognition_results[i]['best_confidence']:.1f}%)"
-        cv2.putText(img_color, text, (5, h-10), cv2.FONT_HERSHEY_SIMPLEX, 0.4, (0, 255, 0), 1)
-        roi_display_images.append(img_color)
-        
-        # Adaptive Threshold anzeigen 
-        img_adapt_color = cv2.cvtColor(roi_processed["adaptive"], cv2.COLOR_GRAY2BGR)
-        cv2.putText(img_adapt_color, text, (5, h-10), cv2.FONT_HERSHEY_SIMPLEX, 0.4, (0, 255, 0), 1)
-        roi_display_images.append(img_adapt_color)
+        cache_key, cached = lookup_cache(roi_processed, cache)
+        if cached is not None:
+            recognitions[i] = dict(cached, from_cache=True)
+        else:
+            pending[i] = cache_key
+    if not pending:
+        return recognitions
+
+    # Einmal pro Bild entscheiden: alle veränderten ROIs erkunden gemeinsam oder gar nicht
+    explore = OCR_STRATEGY == 'cascade' and variant_stats is not None and variant_stats.should_explore()
+    cascade = OCR_STRATEGY == 'cascade' and not explore
+
+    if executor is None:
+        results = {i: ocr_roi_cascade(roi_processed_images[i], variant_stats, expected_digits[i]) if cascade
+                   else ocr_roi_variants(roi_processed_images[i]) for i in pending}
+    elif cascade:
+        futures = {i: executor.submit(ocr_roi_cascade, roi_processed_images[i], variant_stats, expected_digits[i])
+                   for i in pending}
+        results = {i: future.result() for i, future in futures.items()}
+    else:
+        # Nur veränderte ROIs: alle 5 Varianten sofort in den Pool geben
+        futures = {i: {variant[0]: executor.submit(ocr_variant, roi_processed_images[i], variant)
+                       for variant in OCR_VARIANTS} for i in pending}
+        results = {i: {method: future.result() for method, future in variant_futures.items()}
+                   for i, variant_futures in futures.items()}
+
+    for i, cache_key in pending.items():
+        recognition = finish_recognition(results[i], variant_stats)
+        if cache is not None:
+            cache.put(cache_key, recognition)
+        recognitions[i] = dict(recognition, from_cache=False)
+    return recognitions
+
+
+def recognize_rois_template(roi_processed_images, cache=None, executor=None, variant_stats=None,
+                            expected_digits=None):
+    """Erkennt alle ROIs in einem Durchgang per Template-Vergleich.
+
+    Nur Ziffern unter TEMPLATE_MIN_CONFIDENCE laufen zusätzlich durch Tesseract.
+    """
+    predictions = get_classifier(TEMPLATE_FILE).classify([p["original"] for p in roi_processed_images])
+    recognitions = [None] * len(roi_processed_images)
+    uncertain = []
+    for i, (digit, conf) in enumerate(predictions):
+        if conf >= TEMPLATE_MIN_CONFIDENCE:
+            recognitions[i] = dict(select_best_result({"Template": {"text": digit, "conf": conf}}),
+                                   from_cache=False)
+        else:
+            uncertain.append(i)
+
+    if uncertain:
+        fallback = recognize_rois_tesseract([roi_processed_images[i] for i in uncertain],
+                                            cache, executor, variant_stats,
+                                            [expected_digits[i] for i in uncertain] if expected_digits else None)
+        for i, recognition in zip(uncertain, fallback):
+            template_digit, template_conf = predictions[i]
+            recognition["results"] = dict(recognition["results"],
+                                          Template={"text": template_digit, "conf": template_conf})
+            recognitions[i] = recognition
+    return recognitions
+
+
+# --- Hauptteil des Skripts ---
+if __name__ == "__main__":
+    # --- Vorbereitung ---
+    # Prüfen, ob das Bild existiert
+    if not os.path.exists(image_path):
+        print(f"Fehler: Bilddatei nicht gefunden unter '{image_path}'")
+        exit() # Beendet das Skript, wenn die Datei nicht existiert
+
+    # --- Bild laden ---
+    try:
+        image = cv2.imread(image_path)
+        if image is None:
+            print(f"Fehler: Bild konnte nicht geladen werden. Prüfen Sie den Pfad und das Dateiformat: '{image_path}'")
+            exit()
+    except Exception as e:
+        print(f"Ein Fehler ist beim Laden des Bildes aufgetreten: {e}")
+        exit()
+
+    # --- Bildvorverarbeitung ---
+    # 1. Konvertierung in Graustufen (OCR arbeitet oft besser mit Graustufen)
+    gray_image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+
+    # ROIs automatisch bestimmen (nur bei Verschiebung der Kamera neu)
+    if ROI_AUTO_CALIBRATE:
+        from roi_calibration import ROICalibrator
+        cells = ROICalibrator(ROI_CALIBRATION_FILE, len(rois)).rois(ROI_CAMERA_ID, gray_image)
+        if cells:
+            for roi, (x, y, w, h) in zip(rois, cells):
+                roi.update(x=x, y=y, w=w, h=h)
+        else:
+            print("Warnung: Automatische Kalibrierung fehlgeschlagen, verwende die manuellen ROIs.")
+
+    # ROIs in Originalbild einzeichnen und extrahieren
+    image_with_rois = image.copy()
+    roi_images = []
+    roi_names = [] # Zu jedem Bild in roi_images der Name des ROI (Cache-Schlüssel)
+    roi_processed_images = []
+
+    for roi in rois:
+        # ROI einzeichnen
+        cv2.rectangle(image_with_rois,
+                     (roi["x"], roi["y"]),
+                     (roi["x"] + roi["w"], roi["y"] + roi["h"]),
+                     roi["color"], 2)
+        cv2.putText(image_with_rois, roi["name"],
+                    (roi["x"], roi["y"] - 5),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, roi["color"], 2)
+
+        # Prüfen, ob die ROI innerhalb des Bildes liegt
+        if (roi["x"] >= 0 and roi["y"] >= 0 and
+            roi["x"] + roi["w"] <= image.shape[1] and
+            roi["y"] + roi["h"] <= image.shape[0]):
+
+            # ROI extrahieren
+            roi_img = gray_image[roi["y"]:roi["y"]+roi["h"], roi["x"]:roi["x"]+roi["w"]]
+
+            # Prüfen, ob ROI nicht leer ist
+            if roi_img.size > 0:
+                roi_images.append(roi_img)
+                roi_names.append(roi["name"])
+            else:
+                print(f"Warnung: ROI {roi['name']} ist leer oder außerhalb des Bildes.")
+        else:
+            print(f"Warnung: ROI {roi['name']} liegt außerhalb des Bildes und wird übersprungen.")
+
+    # Alle ROIs gemeinsam verarbeiten
+    preprocessing_start = time.perf_counter()
+    roi_processed_images = preprocess_rois(roi_images) if roi_images else []
+    for roi_processed, name in zip(roi_processed_images, roi_names):
+        roi_processed["roi"] = name
+    preprocessing_duration = time.perf_counter() - preprocessing_start
+
+    # Optional: Speichern der ROIs als separate Bilder (im Hintergrund, siehe DEBUG_IMAGE_MODE)
+    debug_sink = DebugSink(DEBUG_IMAGE_MODE, DEBUG_SAMPLE_EVERY)
+    debug_sink.begin_frame()
+    for roi, roi_processed in zip(rois, roi_processed_images):
+        for key in ("original", "adaptive", "minimal", "resized"):
+            debug_sink.write(f'{roi["name"].replace(" ", "_")}_{key}.png', roi_processed[key])
+
+    # Speichern des Bildes mit allen ROIs
+    debug_sink.write('image_with_all_rois.png', image_with_rois)
+
+    # OCR-Cache laden (enthält die Ergebnisse vorheriger Aufnahmen)
+    ocr_cache = None
+    if OCR_CACHE_ENABLED:
+        ocr_cache = DigitOCRCache.load(OCR_CACHE_FILE, max_entries=OCR_CACHE_MAX_ENTRIES,
+                                       max_hamming=OCR_CACHE_MAX_HAMMING)
+    cache_hits_before = ocr_cache.hits if ocr_cache is not None else 0
+
+    # Sammeln aller Erkennungsergebnisse
+    all_recognition_results = []
+
+    try:
+        for roi in rois[len(roi_processed_images):]:
+            print(f"Überspringe ROI {roi['name']}, da sie nicht erfolgreich verarbeitet wurde.")
+
+        variant_stats = VariantWinStats.load(VARIANT_STATS_FILE, explore_every=CASCADE_EXPLORE_EVERY)
+
+        # Letzter Zählerstand: liefert die erwarteten Ziffern für die Kaskade
+        counter_decoder = None
+        expected_digits = None
+        if COUNTER_DECODER_ENABLED and len(roi_processed_images) == len(rois):
+            counter_decoder = RollingCounterDecoder(len(rois), COUNTER_STATE_FILE, COUNTER_MAX_INCREASE)
+            expected_digits = counter_decoder.expected_digits()
+
+        ocr_start = time.perf_counter()
+        if OCR_PARALLEL:
+            with ThreadPoolExecutor(max_workers=OCR_MAX_WORKERS) as ocr_executor:
+                recognitions = recognize_rois(roi_processed_images, ocr_cache, ocr_executor, variant_stats,
+                                              expected_digits)
+        else:
+            recognitions = recognize_rois(roi_processed_images, ocr_cache, variant_stats=variant_stats,
+                                          expected_digits=expected_digits)
+        ocr_duration = time.perf_counter() - ocr_start
+
+        # Ergebnisse speichern
+        for roi, recognition in zip(rois, recognitions):
+            all_recognition_results.append(dict(recognition, roi_name=roi["name"]))
+
+    except pytesseract.TesseractNotFoundError:
+        print("Fehler: Tesseract wurde nicht gefunden.")
+        print("Stellen Sie sicher, dass Tesseract OCR installiert ist und der Pfad ggf.")
+        print("in der Variable 'pytesseract.pytesseract.tesseract_cmd' oben im Skript korrekt gesetzt ist.")
+        exit()
+    except Exception as e:
+        print(f"Ein Fehler ist während der OCR-Verarbeitung aufgetreten: {e}")
+        exit()
+
+    if ocr_cache is not None:
+        try:
+            ocr_cache.save(OCR_CACHE_FILE)
+        except OSError as e:
+            print(f"WARNUNG: OCR-Cache konnte nicht gespeichert werden: {e}")
+    try:
+        variant_stats.save(VARIANT_STATS_FILE)
+    except OSError as e:
+        print(f"WARNUNG: Varianten-Statistik konnte nicht gespeichert werden: {e}")
+
+    # --- Ergebnisse ausgeben ---
+    print("\n--- OCR-Erkennungsergebnisse für alle ROIs ---")
+    for result in all_recognition_results:
+        print(f"\n{result['roi_name']}:")
+        print(f"  Erkannter Text: '{result['detected_text']}'")
+        print(f"  Extrahierte Ziffern: '{result['extracted_digits']}'")
+        print(f"  Beste Methode: {result['best_method']}")
+        print(f"  Konfidenz: {result['best_confidence']:.2f}%")
+        if result["from_cache"]:
+            print("  (Aus dem Cache - ROI unverändert)")
+
+        print("  Detaillierte Ergebnisse je Methode:")
+        for method, res in result["results"].items():
+            print(f"    - {method}: '{res['text']}' (Konfidenz: {res['conf']:.2f}%)")
+
+    # --- Optional: Zusammenfassung aller erkannten Zahlen mit Konfidenz ---
+    all_digits = [(result["extracted_digits"], result["best_confidence"]) for result in all_recognition_results]
+    print("\n--- Zusammenfassung aller erkannten Ziffern mit Konfidenz ---")
+    for i, (digits, conf) in enumerate(all_digits):
+        if i < len(all_recognition_results):
+            print(f"{all_recognition_results[i]['roi_name']}: {digits} (Konfidenz: {conf:.2f}%)")
+
+    # --- Plausibilisierter Zählerstand ---
+    if counter_decoder is not None:
+        candidates = [digit_candidates(result["results"]) for result in all_recognition_results]
+        reading, status, score = counter_decoder.decode(candidates)
+        try:
+            counter_decoder.save()
+        except OSError as e:
+            print(f"WARNUNG: Zählerstand konnte nicht gespeichert werden: {e}")
+        if reading is not None:
+            print(f"\n---> Plausibler Zählerstand: {reading} (Status: {status}, Evidenz: {score:.2f}) <---")
+        else:
+            last = counter_decoder.last_value
+            previous = counter_decoder.format(last) if last is not None else "unbekannt"
+            print(f"\n---> Lesung verworfen (Evidenz: {score:.2f}), letzter Stand bleibt {previous} <---")
+
+    mode = f"parallel, {OCR_MAX_WORKERS} Threads" if OCR_PARALLEL else "sequentiell"
+    print(f"\nOCR-Dauer: {ocr_duration * 1000:.0f} ms ({mode}, Strategie '{OCR_STRATEGY}')")
+    print(f"Varianten-Statistik: {variant_stats.summary()}")
+    print(f"Vorverarbeitung: {preprocessing_duration * 1000:.1f} ms für {len(roi_processed_images)} ROIs "
+          f"({preprocessing_timing_summary()})")
+    ocr_calls = sum(len(result["results"]) for result in all_recognition_results if not result["from_cache"])
+    if ocr_cache is not None:
+        run_hits = ocr_cache.hits - cache_hits_before
+        print(f"\nOCR-Cache: {run_hits}/{len(all_recognition_results)} Ziffern aus dem Cache, "
+              f"{ocr_calls} OCR-Aufrufe. Gesamt: {ocr_cache.stats()}")
+
+    # --- Bilder anzeigen ---
+    # Zeige das Originalbild mit allen ROIs
+    cv2.imshow("Originalbild mit allen ROIs", image_with_rois)
 
     # Erstelle ein Gitter zum Anzeigen aller ROI-Bilder
-    rows = 2
-    cols = 6
-    grid_h = rows * roi_images[0].shape[0]
-    grid_w = cols * roi_images[0].shape[1]
-    grid_image = np.zeros((grid_h, grid_w, 3), dtype=np.uint8)
-
-    # Platziere die Bilder im Gitter
-    for i, img in enumerate(roi_display_images):
-        if i >= rows * cols:
-            break
-        r, c = divmod(i, cols)
-        h, w = roi_images[0].shape[:2]
-        y, x = r * h, c * w
-        
-        # Resize falls nötig
-        if img.shape[:2] != (h, w):
-            img = cv2.resize(img, (w, h))
-        
-        # BGR konvertieren falls Grayscale
-        if len(img.shape) == 2:
-            img = cv2.cvtColor(img, cv2.COLOR_GRAY2BGR)
-        
-        grid_image[y:y+h, x:x+w] = img
-
-    cv2.imshow("Alle ROIs mit Erkennungen und Konfidenz", grid_image)
-    cv2.imwrite("all_rois_grid_with_confidence.png", grid_image)
-
-cv2.waitKey(0)  # Warte auf eine Taste
-cv2.destroyAllWindows()  # Schließe alle Fenster 
\ No newline at end of file
+    if roi_images:  # Nur fortfahren, wenn wir ROIs haben
+        # ROIs in einer Reihe anzeigen
+        roi_display_images = []
+        for i, roi_processed in enumerate(roi_processed_images):
+            # Originales ROI anzeigen
+            img = roi_processed["original"]
+            h, w = img.shape
+            # Text hinzufügen mit erkannten Ziffern und Konfidenz
+            img_color = cv2.cvtColor(img, cv2.COLOR_GRAY2BGR)
+            text = f"{all_recognition_results[i]['extracted_digits']} ({all_recognition_results[i]['best_confidence']:.1f}%)"
+            cv2.putText(img_color, text, (5, h-10), cv2.FONT_HERSHEY_SIMPLEX, 0.4, (0, 255, 0), 1)
+            roi_display_images.append(img_color)
+
+            # Adaptive Threshold anzeigen
+            img_adapt_color = cv2.cvtColor(roi_processed["adaptive"], cv2.COLOR_GRAY2BGR)
+            cv2.putText(img_adapt_color, text, (5, h-10), cv2.FONT_HERSHEY_SIMPLEX, 0.4, (0, 255, 0), 1)
+            roi_display_images.append(img_adapt_color)
+
+        # Erstelle ein Gitter zum Anzeigen aller ROI-Bilder
+        rows = 2
+        cols = 6
+        grid_h = rows * roi_images[0].shape[0]
+        grid_w = cols * roi_images[0].shape[1]
+        grid_image = np.zeros((grid_h, grid_w, 3), dtype=np.uint8)
+
+        # Platziere die Bilder im Gitter
+        for i, img in enumerate(roi_display_images):
+            if i >= rows * cols:
+                break
+            r, c = divmod(i, cols)
+            h, w = roi_images[0].shape[:2]
+            y, x = r * h, c * w
+
+            # Resize falls nötig
+            if img.shape[:2] != (h, w):
+                img = cv2.resize(img, (w, h))
+
+            # BGR konvertieren falls Grayscale
+            if len(img.shape) == 2:
+                img = cv2.cvtColor(img, cv2.COLOR_GRAY2BGR)
+
+            grid_image[y:y+h, x:x+w] = img
+
+        cv2.imshow("Alle ROIs mit Erkennungen und Konfidenz", grid_image)
+        debug_sink.write("all_rois_grid_with_confidence.png", grid_image)
+
+    cv2.waitKey(0)  # Warte auf eine Taste
+    cv2.destroyAllWindows()  # Schließe alle Fenster
+    debug_sink.close()  # Restliche Debug-Bilder fertig schreiben
@@ -2,6 +2,7 @@ import cv2
 import pytesseract
 import re
 import os # Modul zum Prüfen, ob die Datei existiert
+from ocr_backends import get_ocr_backend # pytesseract oder tesserocr
 
 # --- Konfiguration ---
 
@@ -16,6 +17,10 @@ import os # Modul zum Prüfen, ob die Datei existiert
 # !!! ÄNDERN SIE DIES ZU IHREM BILDNAMEN/PFAD !!!
 image_path = 'received_original.jpg' # Ersetzen Sie dies mit dem Pfad zu Ihrem Bild
 
+# OCR Engine: 'tesseract' (pytesseract, ein Prozess pro Aufruf) oder
+# 'tesserocr' (Tesseract im Prozess geladen, pip install tesserocr)
+OCR_ENGINE = 'tesseract'
+
 # --- Vorbereitung ---
 # Prüfen, ob das Bild existiert
 if not os.path.exists(image_path):
@@ -44,6 +49,14 @@ ROI_Y = 65  # Pixel von oben
 ROI_W = 35  # Breite des Bereichs
 ROI_H = 55  # Höhe des Bereichs
 
+# Alternativ: ROI automatisch bestimmen (erste Ziffernzelle, siehe roi_calibration.py)
+ROI_AUTO_CALIBRATE = False
+if ROI_AUTO_CALIBRATE:
+    from roi_calibration import ROICalibrator
+    cells = ROICalibrator().rois('default', gray_image)
+    if cells:
+        ROI_X, ROI_Y, ROI_W, ROI_H = cells[0]
+
 # ROI in Originalbild einzeichnen
 image_with_roi = image.copy()
 # Rechteck zeichnen (Bild, Start-Punkt, End-Punkt, Farbe (BGR), Dicke)
@@ -94,14 +107,16 @@ config_single_line = r'--oem 3 --psm 7 -c tessedit_char_whitelist=0123456789'
 config_single_word = r'--oem 3 --psm 8 -c tessedit_char_whitelist=0123456789'
 
 try:
+    ocr_backend = get_ocr_backend(OCR_ENGINE)
+
     # OCR auf verschiedene verarbeitete ROIs anwenden
-    text_original = pytesseract.image_to_string(roi_original, config=config_single_char)
-    text_adapt = pytesseract.image_to_string(roi_adapt, config=config_single_char)
-    text_min = pytesseract.image_to_string(roi_min_thresh, config=config_single_char)
-    text_resized = pytesseract.image_to_string(roi_resized_thresh, config=config_single_char)
+    text_original = ocr_backend.image_to_string(roi_original, config=config_single_char)
+    text_adapt = ocr_backend.image_to_string(roi_adapt, config=config_single_char)
+    text_min = ocr_backend.image_to_string(roi_min_thresh, config=config_single_char)
+    text_resized = ocr_backend.image_to_string(roi_resized_thresh, config=config_single_char)
     
     # Alternative Konfigurationen testen
-    text_original_line = pytesseract.image_to_string(roi_original, config=config_single_line)
+    text_original_line = ocr_backend.image_to_string(roi_original, config=config_single_line)
     
     # Ergebnis mit der besten Erkennung verwenden
     results = {
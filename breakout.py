@@ -1,6 +1,9 @@
 import pygame
 import sys
 import random
+from breakout_bricks import BrickField # Bricks mit Gitter-Index und Kollisionsauflösung
+import breakout_entities as entities # Bälle, Power-Ups und Laser in Objekt-Pools
+import breakout_levels # Levelformat (.npz), Generator und Brick-Fläche
 
 # --- Konstanten ---
 SCREEN_WIDTH = 800
@@ -11,7 +14,15 @@ BALL_RADIUS = 10
 BRICK_WIDTH = 75
 BRICK_HEIGHT = 20
 BRICK_ROWS = 5
-BRICK_COLS = SCREEN_WIDTH // (BRICK_WIDTH + 5) # Spalten basierend auf Bildschirmbreite
+BRICK_GAP = 5 # Abstand zwischen den Bricks
+BRICK_COLS = SCREEN_WIDTH // (BRICK_WIDTH + BRICK_GAP) # Spalten basierend auf Bildschirmbreite
+BRICK_OFFSET = (5, 40) # Abstand vom linken und oberen Rand
+GENERATED_LEVEL_ROWS = 8 # Zeilen eines zufälligen Levels
+
+# Level: 'python breakout.py' = klassisches Raster, 'python breakout.py level.npz' = Leveldatei,
+# 'python breakout.py 42' = zufälliges Level mit Seed 42
+LEVEL_ARG = sys.argv[1] if len(sys.argv) > 1 else None
+USAGE = "Aufruf: python breakout.py [level.npz | seed]"
 
 # Farben (RGB)
 BLACK = (0, 0, 0)
@@ -29,6 +40,20 @@ BRICK_COLORS = [RED, ORANGE, YELLOW, GREEN, BLUE] # Farben pro Reihe
 PADDLE_SPEED = 8
 BALL_SPEED_X_INITIAL = 4 # Startgeschwindigkeit X
 BALL_SPEED_Y_INITIAL = -4 # Startgeschwindigkeit Y (nach oben)
+SERVE_DELAY_MS = 500 # Pause nach verlorenem Leben, der Ball liegt solange auf dem Paddel
+
+# Power-Ups
+LASER_DURATION_MS = 8000 # So lange kann nach dem Einsammeln mit SPACE geschossen werden
+LASER_COLOR = RED
+POWERUP_COLORS = {'multiball': GREEN, 'laser': RED}
+
+# Zeitschritt: Die Simulation läuft immer mit SIMULATION_HZ Schritten pro Sekunde
+# (Geschwindigkeiten oben sind Pixel pro Schritt), unabhängig von der Bildrate.
+# Gezeichnet wird bis MAX_FPS, Ball und Paddel zwischen zwei Schritten interpoliert.
+SIMULATION_HZ = 60
+SIMULATION_STEP_MS = 1000 / SIMULATION_HZ
+MAX_FPS = 144 # 0 = unbegrenzt
+MAX_STEPS_PER_FRAME = 5 # Bei sehr langsamen Frames lieber Zeit verwerfen als immer weiter zurückfallen
 
 # --- Spiel Setup ---
 pygame.init()
@@ -37,6 +62,15 @@ pygame.display.set_caption("Breakout")
 clock = pygame.time.Clock()
 font = pygame.font.Font(None, 36) # Standard-Schriftart
 
+# Soundeffekt für den Laser (optional)
+try:
+    pygame.mixer.init()
+    laser_sound = pygame.mixer.Sound("laser.wav")
+    sound_enabled = True
+except pygame.error:
+    print("Warnung: laser.wav nicht gefunden oder Mixer konnte nicht initialisiert werden.")
+    sound_enabled = False
+
 # --- Spielobjekte ---
 
 # Paddel (Schläger)
@@ -45,31 +79,63 @@ paddle_rect = pygame.Rect(SCREEN_WIDTH // 2 - PADDLE_WIDTH // 2,
                           SCREEN_HEIGHT - PADDLE_HEIGHT - 10,
                           PADDLE_WIDTH, PADDLE_HEIGHT)
 
-# Ball
-ball_rect = pygame.Rect(SCREEN_WIDTH // 2 - BALL_RADIUS,
-                       paddle_rect.top - BALL_RADIUS * 2 - 5, # Start über dem Paddel
-                       BALL_RADIUS * 2, BALL_RADIUS * 2)
-ball_dx = random.choice([BALL_SPEED_X_INITIAL, -BALL_SPEED_X_INITIAL]) # Zufällige Startrichtung X
-ball_dy = BALL_SPEED_Y_INITIAL
+# Bälle, Power-Ups und Laserschüsse: alle Objekte werden einmal angelegt und wiederverwendet
+balls = entities.Pool(entities.Ball, entities.BALL_POOL_SIZE)
+powerups = entities.Pool(entities.PowerUp, entities.POWERUP_POOL_SIZE)
+lasers = entities.Pool(entities.Laser, entities.LASER_POOL_SIZE)
+
+# Sprites einmal vorzeichnen, dann pro Frame mit einem blits()-Aufruf zeichnen
+ball_sprite = entities.make_ball_sprite(BALL_RADIUS, BALL_COLOR)
+laser_sprite = entities.make_rect_sprite(entities.LASER_SIZE, LASER_COLOR)
+powerup_sprites = {kind: entities.make_rect_sprite(entities.POWERUP_SIZE, color, border_radius=4)
+                   for kind, color in POWERUP_COLORS.items()}
+
+
+def serve_ball():
+    """Neuer Ball über dem Paddel, alle Power-Ups und Schüsse verschwinden."""
+    balls.clear()
+    powerups.clear()
+    lasers.clear()
+    entities.spawn_ball(balls, paddle_rect.centerx, paddle_rect.top - BALL_RADIUS - 5, # Start über dem Paddel
+                        random.choice([BALL_SPEED_X_INITIAL, -BALL_SPEED_X_INITIAL]), # Zufällige Startrichtung X
+                        BALL_SPEED_Y_INITIAL)
+
+serve_ball()
 
 # Bricks (Ziegelsteine)
-bricks = []
+bricks = BrickField()
+brick_surface = None # Alle Bricks vorgezeichnet, pro Frame nur ein blit()
+
+
+def load_level(arg):
+    """Level zum Kommandozeilenargument (siehe LEVEL_ARG). ValueError bei ungültigem Argument."""
+    if arg is None:
+        return breakout_levels.classic_level(BRICK_ROWS, BRICK_COLS, len(BRICK_COLORS))
+    if arg.endswith(".npz"):
+        return breakout_levels.load_level(arg)
+    try:
+        seed = int(arg)
+    except ValueError:
+        raise ValueError(f"'{arg}' ist weder eine .npz-Leveldatei noch ein Seed") from None
+    return breakout_levels.generate_level(GENERATED_LEVEL_ROWS, BRICK_COLS, seed, len(BRICK_COLORS))
+
+
 def create_bricks():
-    bricks.clear() # Alte Bricks löschen, falls vorhanden (für Neustart)
-    y_offset = 40 # Abstand vom oberen Rand
-    for row in range(BRICK_ROWS):
-        x_offset = 5 # Abstand vom linken Rand
-        for col in range(BRICK_COLS):
-            brick_x = x_offset + col * (BRICK_WIDTH + 5)
-            brick_y = y_offset + row * (BRICK_HEIGHT + 5)
-            brick_rect = pygame.Rect(brick_x, brick_y, BRICK_WIDTH, BRICK_HEIGHT)
-            # Farbe basierend auf der Reihe zuweisen
-            color_index = row % len(BRICK_COLORS)
-            bricks.append({'rect': brick_rect, 'color': BRICK_COLORS[color_index]})
-            x_offset += 0 # Kein zusätzlicher Offset hier nötig
-        y_offset += 0 # Kein zusätzlicher Offset hier nötig
-
-create_bricks() # Bricks initial erstellen
+    """Baut das Level neu auf (auch für Neustart) und zeichnet die Brick-Fläche."""
+    global brick_surface
+    # Bricks nur oberhalb des Paddels, sonst sind sie nicht erreichbar
+    breakout_levels.build_bricks(level, bricks, BRICK_COLORS, BRICK_WIDTH, BRICK_HEIGHT, BRICK_GAP, *BRICK_OFFSET,
+                                 bounds=(SCREEN_WIDTH, paddle_rect.top))
+    brick_surface = breakout_levels.render_bricks((SCREEN_WIDTH, SCREEN_HEIGHT), bricks, BLACK)
+
+try:
+    level = load_level(LEVEL_ARG)
+    create_bricks() # Bricks initial erstellen
+except (ValueError, OSError) as e:
+    print(f"Fehler: {e}")
+    print(USAGE)
+    pygame.quit()
+    sys.exit(2)
 
 # Spielvariablen
 score = 0
@@ -77,10 +143,98 @@ lives = 3
 game_over = False
 game_won = False
 paused = False
+serve_timer_ms = 0 # Aufschlag-Countdown, die Schleife läuft dabei weiter
+laser_timer_ms = 0 # Restzeit des Laser-Power-Ups
+caught_powerups = [] # Pro Schritt eingesammelte Power-Up-Arten (wird wiederverwendet)
+
+# Position des Paddels vor dem letzten Simulationsschritt (zum Interpolieren beim Zeichnen).
+# Bälle, Power-Ups und Schüsse merken sich ihre vorherige Position selbst (prev_x, prev_y).
+paddle_prev = paddle_rect.topleft
+
+
+def store_previous_positions():
+    """Merkt sich die Positionen vor einem Simulationsschritt."""
+    global paddle_prev
+    paddle_prev = paddle_rect.topleft
+    for pool in (balls, powerups, lasers):
+        for obj in pool.active:
+            obj.prev_x, obj.prev_y = obj.x, obj.y
+
+
+def interpolated(rect, prev_topleft, alpha):
+    """Rechteck an der Zwischenposition alpha (0..1) zwischen letztem und aktuellem Schritt."""
+    drawn = rect.copy()
+    drawn.x = round(prev_topleft[0] + (rect.x - prev_topleft[0]) * alpha)
+    drawn.y = round(prev_topleft[1] + (rect.y - prev_topleft[1]) * alpha)
+    return drawn
+
+
+def update():
+    """Ein Simulationsschritt (1 / SIMULATION_HZ Sekunden), nur wenn nicht pausiert/game over/won."""
+    global score, lives, game_over, game_won, serve_timer_ms, laser_timer_ms
+
+    store_previous_positions()
+
+    # --- Spiel Logik ---
+
+    # Paddel Bewegung
+    keys = pygame.key.get_pressed()
+    if keys[pygame.K_LEFT] and paddle_rect.left > 0:
+        paddle_rect.x -= PADDLE_SPEED
+    if keys[pygame.K_RIGHT] and paddle_rect.right < SCREEN_WIDTH:
+        paddle_rect.x += PADDLE_SPEED
+
+    if laser_timer_ms > 0:
+        laser_timer_ms -= SIMULATION_STEP_MS
+
+    # Ball Bewegung (während des Aufschlag-Countdowns folgt der Ball dem Paddel)
+    if serve_timer_ms > 0:
+        serve_timer_ms -= SIMULATION_STEP_MS
+        for ball in balls.active:
+            ball.x = paddle_rect.centerx
+        return
+
+    # Alle Bälle in einem Durchlauf: Bricks entlang der Bahn (Seite aus dem ersten
+    # Kontakt, gleichzeitig getroffene Bricks zählen alle), Wände, Paddel und Boden
+    hit_bricks, _ = entities.update_balls(balls, bricks, paddle_rect, SCREEN_WIDTH, SCREEN_HEIGHT, BALL_RADIUS)
+    entities.update_lasers(lasers, bricks, hit_bricks)
+    hit_bricks = entities.unique_bricks(hit_bricks) # Jeder Brick zählt pro Schritt einmal
+    score += 10 * len(hit_bricks) # Punkte für getroffene Bricks
+    for brick in hit_bricks:
+        breakout_levels.update_brick(brick_surface, brick, BLACK) # Nur diesen Brick neu zeichnen
+        entities.maybe_drop_powerup(powerups, brick)
+
+    # Power-Ups einsammeln
+    entities.update_powerups(powerups, paddle_rect, SCREEN_HEIGHT, caught_powerups)
+    for kind in caught_powerups:
+        if kind == 'multiball':
+            entities.split_balls(balls)
+        elif kind == 'laser':
+            laser_timer_ms = LASER_DURATION_MS
+    caught_powerups.clear()
+
+    # Leben verlieren erst, wenn der letzte Ball den Boden erreicht hat
+    if not balls.active:
+        lives -= 1
+        laser_timer_ms = 0
+        if lives <= 0:
+            game_over = True
+        else:
+            serve_ball() # Ball zurücksetzen über dem Paddel
+            serve_timer_ms = SERVE_DELAY_MS # Kurze Pause, ohne die Schleife anzuhalten
+
+    # Überprüfen, ob alle Bricks zerstört wurden
+    if not bricks:
+        game_won = True
+
 
 # --- Spiel Loop ---
+accumulator_ms = 0.0 # Noch nicht simulierte Zeit
 running = True
 while running:
+    # Framerate begrenzen (MAX_FPS) und vergangene Zeit messen
+    accumulator_ms += clock.tick(MAX_FPS)
+
     # --- Event Handling ---
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
@@ -90,6 +244,9 @@ while running:
                  running = False
             if event.key == pygame.K_p: # Spiel pausieren/fortsetzen mit P
                  paused = not paused
+            if event.key == pygame.K_SPACE and laser_timer_ms > 0 and not (paused or game_over or game_won):
+                if entities.fire_lasers(lasers, paddle_rect) and sound_enabled:
+                    laser_sound.play()
             if (game_over or game_won) and event.key == pygame.K_RETURN: # Neustart mit Enter
                 # Spiel zurücksetzen
                 game_over = False
@@ -97,100 +254,52 @@ while running:
                 score = 0
                 lives = 3
                 paddle_rect.centerx = SCREEN_WIDTH // 2
-                ball_rect.centerx = SCREEN_WIDTH // 2
-                ball_rect.centery = paddle_rect.top - BALL_RADIUS * 2 - 5
-                ball_dx = random.choice([BALL_SPEED_X_INITIAL, -BALL_SPEED_X_INITIAL])
-                ball_dy = BALL_SPEED_Y_INITIAL
+                serve_ball()
+                serve_timer_ms = 0
+                laser_timer_ms = 0
                 create_bricks() # Bricks neu erstellen
+                store_previous_positions()
 
 
     if paused or game_over or game_won:
          # Wenn pausiert, Game Over oder gewonnen, nur Events verarbeiten
          # und den entsprechenden Bildschirm anzeigen (siehe Drawing-Sektion)
-         pass # Gehe direkt zum Zeichnen
+         accumulator_ms = 0.0 # Pausenzeit nicht nachholen
+         store_previous_positions() # Stillstand: nichts zu interpolieren
     else:
-        # --- Spiel Logik (nur wenn nicht pausiert/game over/won) ---
-
-        # Paddel Bewegung
-        keys = pygame.key.get_pressed()
-        if keys[pygame.K_LEFT] and paddle_rect.left > 0:
-            paddle_rect.x -= PADDLE_SPEED
-        if keys[pygame.K_RIGHT] and paddle_rect.right < SCREEN_WIDTH:
-            paddle_rect.x += PADDLE_SPEED
-
-        # Ball Bewegung
-        ball_rect.x += ball_dx
-        ball_rect.y += ball_dy
-
-        # Ball Kollision mit Wänden
-        if ball_rect.left <= 0 or ball_rect.right >= SCREEN_WIDTH:
-            ball_dx *= -1 # Richtung umkehren
-        if ball_rect.top <= 0:
-            ball_dy *= -1 # Richtung umkehren
-
-        # Ball Kollision mit Boden (Leben verlieren)
-        if ball_rect.bottom >= SCREEN_HEIGHT:
-            lives -= 1
-            if lives <= 0:
-                game_over = True
-            else:
-                # Ball zurücksetzen über dem Paddel
-                ball_rect.centerx = paddle_rect.centerx
-                ball_rect.centery = paddle_rect.top - BALL_RADIUS - 5
-                ball_dy = BALL_SPEED_Y_INITIAL # Wieder nach oben starten
-                ball_dx = random.choice([BALL_SPEED_X_INITIAL, -BALL_SPEED_X_INITIAL]) # Zufällige X-Richtung
-                pygame.time.wait(500) # Kurze Pause
-
-        # Ball Kollision mit Paddel
-        if ball_rect.colliderect(paddle_rect) and ball_dy > 0: # Nur abprallen, wenn Ball nach unten fliegt
-            # Differenz berechnen, um den Abprallwinkel leicht zu ändern
-            # diff = ball_rect.centerx - paddle_rect.centerx
-            # ball_dx = diff * 0.1 # Beeinflusst die X-Richtung (kann angepasst werden)
-
-            # Sicherstellen, dass dy negativ wird
-            ball_dy *= -1
-            # Verhindern, dass der Ball im Paddel "stecken bleibt"
-            ball_rect.bottom = paddle_rect.top
-
-
-        # Ball Kollision mit Bricks
-        brick_hit_index = -1
-        for i, brick_data in enumerate(bricks):
-            brick_rect = brick_data['rect']
-            if ball_rect.colliderect(brick_rect):
-                brick_hit_index = i
-                # Kollisionslogik (einfach: Y-Richtung umkehren)
-                # Genauere Kollisionserkennung (wo hat der Ball getroffen?) ist komplexer
-                ball_dy *= -1
-                score += 10 # Punkte für getroffenen Brick
-                break # Nur einen Brick pro Frame treffen
-
-        if brick_hit_index != -1:
-            del bricks[brick_hit_index] # Getroffenen Brick entfernen
-
-        # Überprüfen, ob alle Bricks zerstört wurden
-        if not bricks:
-            game_won = True
+        # --- Simulation in festen Schritten ---
+        steps = 0
+        while accumulator_ms >= SIMULATION_STEP_MS and steps < MAX_STEPS_PER_FRAME:
+            update()
+            accumulator_ms -= SIMULATION_STEP_MS
+            steps += 1
+        if steps == MAX_STEPS_PER_FRAME:
+            accumulator_ms = min(accumulator_ms, SIMULATION_STEP_MS) # Rückstand verwerfen
+    alpha = accumulator_ms / SIMULATION_STEP_MS
 
 
     # --- Zeichnen ---
     screen.fill(BLACK) # Hintergrund löschen
 
     # Paddel zeichnen
-    pygame.draw.rect(screen, PADDLE_COLOR, paddle_rect, border_radius=5)
+    pygame.draw.rect(screen, PADDLE_COLOR, interpolated(paddle_rect, paddle_prev, alpha), border_radius=5)
 
-    # Ball zeichnen
-    pygame.draw.ellipse(screen, BALL_COLOR, ball_rect) # Ellipse für runden Ball
+    # Bälle, Power-Ups und Laserschüsse zeichnen (je ein blits()-Aufruf für alle Objekte)
+    entities.draw_pool(screen, balls, ball_sprite, alpha)
+    entities.draw_powerups(screen, powerups, powerup_sprites, alpha)
+    entities.draw_pool(screen, lasers, laser_sprite, alpha)
 
     # Bricks zeichnen
-    for brick_data in bricks:
-        pygame.draw.rect(screen, brick_data['color'], brick_data['rect'], border_radius=3)
+    screen.blit(brick_surface, (0, 0))
 
     # Score und Leben anzeigen
     score_text = font.render(f"Score: {score}", True, WHITE)
     lives_text = font.render(f"Lives: {lives}", True, WHITE)
     screen.blit(score_text, (10, 10))
     screen.blit(lives_text, (SCREEN_WIDTH - lives_text.get_width() - 10, 10))
+    if laser_timer_ms > 0:
+        laser_text = font.render(f"Laser: {laser_timer_ms / 1000:.0f}s (SPACE)", True, LASER_COLOR)
+        screen.blit(laser_text, laser_text.get_rect(midtop=(SCREEN_WIDTH // 2, 10)))
 
     # Pausen-, Game Over- oder Gewonnen-Bildschirm
     if paused:
@@ -216,9 +325,6 @@ while running:
     # Bildschirm aktualisieren
     pygame.display.flip()
 
-    # Framerate begrenzen
-    clock.tick(60) # 60 Frames pro Sekunde
-
 # --- Spiel beenden ---
 pygame.quit()
 sys.exit() 
\ No newline at end of file
@@ -0,0 +1,116 @@
+import math
+
+from collision import swept_circle_rect, reflect
+
+# --- Konfiguration ---
+GRID_CELL_SIZE = 80        # Kantenlänge einer Gitterzelle des räumlichen Index in Pixeln
+MAX_CONTACTS_PER_STEP = 4  # So oft darf der Ball in einem Schritt abprallen (schneller Ball, enge Lücken)
+SIMULTANEOUS_EPSILON = 1e-6  # Kontakte mit (fast) gleichem t gelten als gleichzeitig
+
+
+class BrickField:
+    """Bricks mit räumlichem Gitter-Index und Kollisionsauflösung für den Ball.
+
+    Jeder Brick ist ein dict mit mindestens 'rect' (pygame.Rect) und optional
+    'hits' (verbleibende Treffer, Standard 1). Der Index
+    ordnet jeden Brick den Gitterzellen zu, die er überdeckt; eine Abfrage
+    prüft nur die Zellen entlang der Ballbahn. Die Kosten pro Schritt hängen
+    so von der Ballgeschwindigkeit ab, nicht von der Anzahl der Bricks.
+    """
+
+    def __init__(self, cell_size=GRID_CELL_SIZE):
+        self.cell_size = cell_size
+        self._cells = {}   # (Spalte, Zeile) -> Liste der Bricks
+        self._bricks = {}  # id -> Brick, in Reihenfolge zum Zeichnen (Entfernen in O(1))
+
+    def __len__(self):
+        return len(self._bricks)
+
+    def __iter__(self):
+        return iter(self._bricks.values())
+
+    def _cell_range(self, left, top, right, bottom):
+        size = self.cell_size
+        for col in range(int(left // size), int(right // size) + 1):
+            for row in range(int(top // size), int(bottom // size) + 1):
+                yield col, row
+
+    def clear(self):
+        self._cells.clear()
+        self._bricks.clear()
+
+    def add(self, brick):
+        rect = brick['rect']
+        for cell in self._cell_range(rect.left, rect.top, rect.right - 1, rect.bottom - 1):
+            self._cells.setdefault(cell, []).append(brick)
+        self._bricks[id(brick)] = brick
+
+    def remove(self, brick):
+        rect = brick['rect']
+        for cell in self._cell_range(rect.left, rect.top, rect.right - 1, rect.bottom - 1):
+            bricks = self._cells.get(cell)
+            if bricks is not None:
+                bricks.remove(brick)
+                if not bricks:
+                    del self._cells[cell]
+        del self._bricks[id(brick)]
+
+    def hit(self, brick):
+        """Zieht einen Treffer ab und entfernt den Brick bei 0. Gibt True zurück, wenn er zerstört wurde."""
+        brick['hits'] = brick.get('hits', 1) - 1
+        if brick['hits'] <= 0:
+            self.remove(brick)
+            return True
+        return False
+
+    def query(self, left, top, right, bottom):
+        """Alle Bricks in den Zellen, die den Bereich überdecken (ohne Duplikate)."""
+        found = {}
+        for cell in self._cell_range(left, top, right, bottom):
+            for brick in self._cells.get(cell, ()):
+                found[id(brick)] = brick
+        return found.values()
+
+    def move_ball(self, x, y, dx, dy, radius, max_contacts=MAX_CONTACTS_PER_STEP):
+        """Bewegt den Ball (Mitte x, y) um (dx, dy) und löst Brick-Kontakte auf.
+
+        Der früheste Kontakt entlang der Bahn bestimmt die getroffene Seite. Treffen
+        mehrere Bricks gleichzeitig (z.B. an der Fuge zweier Bricks), wird an der
+        gemittelten Normale gespiegelt und alle werden getroffen. Danach läuft der
+        Ball mit der neuen Richtung weiter. Getroffene Bricks verlieren einen
+        Treffer (siehe hit()), bei 0 werden sie entfernt.
+        Gibt (x, y, dx, dy, [getroffene Bricks]) zurück.
+        """
+        hit_bricks = []
+        remaining = 1.0
+        for _ in range(max_contacts):
+            step_dx, step_dy = dx * remaining, dy * remaining
+            candidates = self.query(min(x, x + step_dx) - radius, min(y, y + step_dy) - radius,
+                                    max(x, x + step_dx) + radius, max(y, y + step_dy) + radius)
+            earliest = None
+            contacts = []
+            for brick in candidates:
+                hit = swept_circle_rect(x, y, step_dx, step_dy, radius, brick['rect'])
+                if hit is None:
+                    continue
+                if earliest is None or hit.t < earliest - SIMULTANEOUS_EPSILON:
+                    earliest, contacts = hit.t, [(brick, hit)]
+                elif hit.t <= earliest + SIMULTANEOUS_EPSILON:
+                    contacts.append((brick, hit))
+            if earliest is None:
+                break
+
+            x += step_dx * earliest
+            y += step_dy * earliest
+            normal_x = sum(hit.normal_x for _, hit in contacts)
+            normal_y = sum(hit.normal_y for _, hit in contacts)
+            length = math.hypot(normal_x, normal_y)
+            if length > 0 and dx * normal_x + dy * normal_y < 0:
+                dx, dy = reflect(dx, dy, normal_x / length, normal_y / length)
+            for brick, _ in contacts:
+                self.hit(brick)
+                hit_bricks.append(brick)
+            remaining *= 1.0 - earliest
+        else:
+            return x, y, dx, dy, hit_bricks # Kontakte aufgebraucht, Rest der Bewegung verfällt
+        return x + dx * remaining, y + dy * remaining, dx, dy, hit_bricks
@@ -0,0 +1,226 @@
+import math
+import random
+
+import pygame
+
+# --- Konfiguration ---
+BALL_POOL_SIZE = 64       # Höchstzahl gleichzeitiger Bälle
+POWERUP_POOL_SIZE = 16
+LASER_POOL_SIZE = 32
+
+POWERUP_CHANCE = 0.12     # Wahrscheinlichkeit, dass ein zerstörter Brick ein Power-Up fallen lässt
+POWERUP_FALL_SPEED = 3    # Pixel pro Simulationsschritt
+POWERUP_SIZE = (30, 14)
+POWERUP_KINDS = ('multiball', 'laser')
+MULTIBALL_SPLIT_ANGLES = (-0.35, 0.35)  # Jeder Ball teilt sich in zusätzliche Bälle mit diesen Winkeln (rad)
+
+LASER_SPEED = 10          # Pixel pro Simulationsschritt (nach oben)
+LASER_SIZE = (4, 12)
+
+
+# --- Entitäten ---
+# Feste Attribute (__slots__) statt dict pro Objekt: weniger Speicher, schnellerer
+# Zugriff. x, y ist immer die Mitte; prev_x, prev_y die Position vor dem letzten
+# Simulationsschritt (für die Interpolation beim Zeichnen, setzt der Aufrufer vor
+# jedem Schritt). index ist die Position in Pool.active (None, solange frei).
+
+class Ball:
+    __slots__ = ('x', 'y', 'dx', 'dy', 'prev_x', 'prev_y', 'index')
+
+
+class PowerUp:
+    __slots__ = ('x', 'y', 'kind', 'prev_x', 'prev_y', 'index')
+
+
+class Laser:
+    __slots__ = ('x', 'y', 'prev_x', 'prev_y', 'index')
+
+
+class Pool:
+    """Vorab angelegte Objekte einer Klasse, die wiederverwendet werden.
+
+    spawn() nimmt ein freies Objekt, release() gibt es zurück. Aktive Objekte
+    liegen lückenlos in .active (Freigeben tauscht das letzte Objekt an die
+    frei gewordene Stelle). Beim Durchlaufen mit Freigeben daher rückwärts
+    iterieren. Im Spiel wird so nach dem Start kein Objekt mehr erzeugt.
+    """
+
+    def __init__(self, cls, capacity):
+        self.capacity = capacity
+        self.active = []
+        self._free = [cls() for _ in range(capacity)]
+        for obj in self._free:
+            obj.index = None
+        self.dropped = 0 # spawn() bei vollem Pool
+
+    def __len__(self):
+        return len(self.active)
+
+    def spawn(self, x, y):
+        """Aktiviert ein Objekt an (x, y). Gibt None zurück, wenn der Pool erschöpft ist."""
+        if not self._free:
+            self.dropped += 1
+            return None
+        obj = self._free.pop()
+        obj.x = obj.prev_x = x
+        obj.y = obj.prev_y = y
+        obj.index = len(self.active)
+        self.active.append(obj)
+        return obj
+
+    def release(self, obj):
+        """Gibt ein aktives Objekt frei. ValueError bei doppelter Freigabe."""
+        index = obj.index
+        if index is None or index >= len(self.active) or self.active[index] is not obj:
+            raise ValueError("Objekt ist nicht aktiv (doppelt freigegeben?)")
+        last = self.active.pop()
+        if last is not obj:
+            self.active[index] = last
+            last.index = index
+        obj.index = None
+        self._free.append(obj)
+
+    def clear(self):
+        for obj in self.active:
+            obj.index = None
+        self._free.extend(self.active)
+        self.active.clear()
+
+
+# --- Erzeugen ---
+def spawn_ball(balls, x, y, dx, dy):
+    ball = balls.spawn(x, y)
+    if ball is not None:
+        ball.dx, ball.dy = dx, dy
+    return ball
+
+
+def split_balls(balls, angles=MULTIBALL_SPLIT_ANGLES):
+    """Multi-Ball: jeder vorhandene Ball bekommt zusätzliche Bälle mit gedrehter Richtung."""
+    for i in range(len(balls.active)): # Nur die bisherigen Bälle, neue liegen dahinter
+        ball = balls.active[i]
+        for angle in angles:
+            cos_a, sin_a = math.cos(angle), math.sin(angle)
+            spawn_ball(balls, ball.x, ball.y, ball.dx * cos_a - ball.dy * sin_a, ball.dx * sin_a + ball.dy * cos_a)
+
+
+def maybe_drop_powerup(powerups, brick, chance=POWERUP_CHANCE):
+    """Nur zerstörte Bricks (keine Treffer mehr übrig) können ein Power-Up fallen lassen."""
+    if brick.get('hits', 0) <= 0 and random.random() < chance:
+        powerup = powerups.spawn(brick['rect'].centerx, brick['rect'].centery)
+        if powerup is not None:
+            powerup.kind = random.choice(POWERUP_KINDS)
+
+
+def unique_bricks(hit_bricks):
+    """Getroffene Bricks ohne Duplikate, in der Reihenfolge der Treffer.
+
+    Ein Brick mit mehreren Treffern kann im selben Schritt von Ball und Laser (oder
+    zwei Bällen) getroffen werden. Punkte und Power-Up-Chance gibt es nur einmal.
+    """
+    return list({id(brick): brick for brick in hit_bricks}.values())
+
+
+def fire_lasers(lasers, paddle_rect):
+    """Zwei Laserschüsse von den Enden des Paddels. Gibt True zurück, wenn geschossen wurde."""
+    fired = lasers.spawn(paddle_rect.left + 6, paddle_rect.top) is not None
+    fired = lasers.spawn(paddle_rect.right - 6, paddle_rect.top) is not None or fired
+    return fired
+
+
+# --- Simulationsschritt ---
+def update_balls(balls, bricks, paddle_rect, width, height, radius):
+    """Bewegt alle Bälle (Bricks, Wände, Paddel). Gibt (getroffene Bricks, verlorene Bälle) zurück."""
+    hit_bricks = []
+    lost = 0
+    active = balls.active
+    for i in range(len(active) - 1, -1, -1):
+        ball = active[i]
+        ball.x, ball.y, ball.dx, ball.dy, hit = bricks.move_ball(ball.x, ball.y, ball.dx, ball.dy, radius)
+        if hit:
+            hit_bricks.extend(hit)
+
+        # Wände (nur umkehren, wenn der Ball auf die Wand zufliegt)
+        if (ball.x - radius <= 0 and ball.dx < 0) or (ball.x + radius >= width and ball.dx > 0):
+            ball.dx *= -1
+        if ball.y - radius <= 0 and ball.dy < 0:
+            ball.dy *= -1
+
+        # Paddel: nur abprallen, wenn der Ball nach unten fliegt
+        if (ball.dy > 0 and paddle_rect.left - radius < ball.x < paddle_rect.right + radius
+                and paddle_rect.top - radius <= ball.y <= paddle_rect.bottom):
+            ball.dy *= -1
+            ball.y = paddle_rect.top - radius # Nicht im Paddel stecken bleiben
+
+        # Boden: Ball verloren
+        if ball.y + radius >= height:
+            balls.release(ball)
+            lost += 1
+    return hit_bricks, lost
+
+
+def update_powerups(powerups, paddle_rect, height, caught):
+    """Lässt Power-Ups fallen. Vom Paddel gefangene Arten werden an caught angehängt."""
+    half_w, half_h = POWERUP_SIZE[0] / 2, POWERUP_SIZE[1] / 2
+    active = powerups.active
+    for i in range(len(active) - 1, -1, -1):
+        powerup = active[i]
+        powerup.y += POWERUP_FALL_SPEED
+        if (powerup.y + half_h >= paddle_rect.top and powerup.y - half_h <= paddle_rect.bottom
+                and powerup.x + half_w >= paddle_rect.left and powerup.x - half_w <= paddle_rect.right):
+            caught.append(powerup.kind)
+            powerups.release(powerup)
+        elif powerup.y - half_h > height:
+            powerups.release(powerup)
+
+
+def update_lasers(lasers, bricks, hit_bricks):
+    """Bewegt die Laserschüsse. Der erste Brick auf der Bahn wird getroffen und an hit_bricks angehängt."""
+    half_w, half_h = LASER_SIZE[0] / 2, LASER_SIZE[1] / 2
+    active = lasers.active
+    for i in range(len(active) - 1, -1, -1):
+        laser = active[i]
+        laser.y -= LASER_SPEED
+        # Ganze Bahn dieses Schritts prüfen, damit der Laser dünne Bricks nicht überspringt
+        top, bottom = laser.y - half_h, laser.y + LASER_SPEED + half_h
+        first = None
+        for brick in bricks.query(laser.x - half_w, top, laser.x + half_w, bottom):
+            rect = brick['rect']
+            if (rect.left <= laser.x + half_w and rect.right >= laser.x - half_w
+                    and rect.top <= bottom and rect.bottom >= top
+                    and (first is None or rect.bottom > first['rect'].bottom)):
+                first = brick
+        if first is not None:
+            bricks.hit(first)
+            hit_bricks.append(first)
+            lasers.release(laser)
+        elif laser.y + half_h < 0:
+            lasers.release(laser)
+
+
+# --- Zeichnen ---
+def make_ball_sprite(radius, color):
+    sprite = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+    pygame.draw.circle(sprite, color, (radius, radius), radius)
+    return sprite
+
+
+def make_rect_sprite(size, color, border_radius=0):
+    sprite = pygame.Surface(size, pygame.SRCALPHA)
+    pygame.draw.rect(sprite, color, sprite.get_rect(), border_radius=border_radius)
+    return sprite
+
+
+def draw_pool(surface, pool, sprite, alpha=1.0):
+    """Zeichnet alle aktiven Objekte mit einem blits()-Aufruf, interpoliert mit alpha (0..1)."""
+    half_w, half_h = sprite.get_width() / 2, sprite.get_height() / 2
+    surface.blits([(sprite, (round(o.prev_x + (o.x - o.prev_x) * alpha - half_w),
+                             round(o.prev_y + (o.y - o.prev_y) * alpha - half_h)))
+                   for o in pool.active], False)
+
+
+def draw_powerups(surface, powerups, sprites, alpha=1.0):
+    """Wie draw_pool, aber mit einem Sprite pro Power-Up-Art (alle gleich groß, POWERUP_SIZE)."""
+    half_w, half_h = POWERUP_SIZE[0] / 2, POWERUP_SIZE[1] / 2
+    surface.blits([(sprites[p.kind], (round(p.x - half_w), round(p.prev_y + (p.y - p.prev_y) * alpha - half_h)))
+                   for p in powerups.active], False)
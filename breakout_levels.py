@@ -0,0 +1,126 @@
+from collections import namedtuple
+
+import numpy as np
+import pygame
+
+# --- Levelformat ---
+# Ein Level ist ein Raster (Zeilen x Spalten). Pro Zelle:
+#   types: 0 = leer, 1..15 = Brick-Art (bestimmt die Farbe)
+#   hits:  Treffer, bis der Brick zerstört ist (1..15)
+# In der Datei (.npz, komprimiert) liegen beide in einem Byte pro Zelle:
+# untere 4 Bit Art, obere 4 Bit Treffer. Position und Größe der Bricks legt
+# das Spiel fest, nicht die Datei.
+Level = namedtuple("Level", "types hits")
+
+LEVEL_FORMAT_VERSION = 1
+MAX_TYPE = 15
+MAX_HITS = 15
+
+# --- Generator ---
+GENERATOR_DENSITY = 0.85     # Anteil belegter Zellen
+GENERATOR_HARD_CHANCE = 0.2  # Anteil Bricks mit mehr als einem Treffer
+GENERATOR_MAX_HITS = 3
+GENERATOR_BAND_ROWS = 2      # So viele Zeilen haben jeweils dieselbe Brick-Art
+
+
+def classic_level(rows, cols, n_types=5):
+    """Volles Raster wie bisher: Art nach Zeile, jeder Brick hält einen Treffer."""
+    types = np.empty((rows, cols), dtype=np.uint8)
+    types[:] = (np.arange(rows) % n_types + 1)[:, None]
+    return Level(types, np.ones((rows, cols), dtype=np.uint8))
+
+
+def generate_level(rows, cols, seed=None, n_types=5, density=GENERATOR_DENSITY,
+                   hard_chance=GENERATOR_HARD_CHANCE, max_hits=GENERATOR_MAX_HITS):
+    """Zufälliges, links-rechts symmetrisches Level. Gleicher seed = gleiches Level.
+
+    Alles wird auf ganzen Arrays berechnet (keine Schleife pro Brick), daher
+    auch für Millionen Zellen schnell.
+    """
+    rng = np.random.default_rng(seed)
+    half = (cols + 1) // 2
+    mask = rng.random((rows, half)) < density
+    extra_hits = (rng.random((rows, half)) < hard_chance) * rng.integers(1, max(max_hits, 2), size=(rows, half))
+    mask = np.concatenate([mask, mask[:, :cols - half][:, ::-1]], axis=1)
+    extra_hits = np.concatenate([extra_hits, extra_hits[:, :cols - half][:, ::-1]], axis=1)
+
+    band = (np.arange(rows) // GENERATOR_BAND_ROWS + rng.integers(n_types)) % n_types + 1
+    types = np.where(mask, band[:, None], 0).astype(np.uint8)
+    hits = np.where(mask, np.minimum(1 + extra_hits, max_hits), 0).astype(np.uint8)
+    return Level(types, hits)
+
+
+def save_level(path, level):
+    """Speichert das Level komprimiert (ein Byte pro Zelle, siehe oben)."""
+    if level.types.max(initial=0) > MAX_TYPE or level.hits.max(initial=0) > MAX_HITS:
+        raise ValueError(f"Art und Treffer müssen <= {MAX_TYPE} bzw. {MAX_HITS} sein")
+    cells = (level.hits.astype(np.uint8) << 4) | level.types.astype(np.uint8)
+    np.savez_compressed(path, cells=cells, version=np.uint8(LEVEL_FORMAT_VERSION))
+
+
+def load_level(path):
+    """Lädt ein mit save_level gespeichertes Level. ValueError bei fremdem Format."""
+    with np.load(path) as data:
+        if "version" not in data or "cells" not in data:
+            raise ValueError(f"{path} ist keine Leveldatei")
+        version = int(data["version"])
+        if version != LEVEL_FORMAT_VERSION:
+            raise ValueError(f"Levelformat {version} wird nicht unterstützt (erwartet {LEVEL_FORMAT_VERSION})")
+        cells = data["cells"]
+    types = cells & 0x0F
+    hits = np.where(types > 0, cells >> 4, 0).astype(np.uint8)
+    return Level(types, hits)
+
+
+def build_bricks(level, field, colors, brick_width, brick_height, gap, offset_x, offset_y, bounds=None):
+    """Legt alle Bricks des Levels in einem Durchlauf in field (BrickField) an.
+
+    colors[art - 1] ist die Farbe einer Brick-Art. Gibt die Anzahl der Bricks zurück.
+    bounds: (Breite, Höhe) des Spielfelds. Ragt ein Brick darüber hinaus, kann der Ball
+    ihn nie treffen und das Level wäre nicht zu gewinnen -> ValueError, field bleibt unverändert.
+    """
+    rows, cols = np.nonzero(level.types)
+    if bounds is not None and len(rows):
+        right = offset_x + (int(cols.max()) + 1) * (brick_width + gap) - gap
+        bottom = offset_y + (int(rows.max()) + 1) * (brick_height + gap) - gap
+        if right > bounds[0] or bottom > bounds[1]:
+            raise ValueError(f"Level braucht {right}x{bottom} Pixel, Spielfeld ist nur {bounds[0]}x{bounds[1]}")
+    field.clear()
+    xs = (offset_x + cols * (brick_width + gap)).tolist()
+    ys = (offset_y + rows * (brick_height + gap)).tolist()
+    types = level.types[rows, cols].tolist()
+    hits = level.hits[rows, cols].tolist()
+    for x, y, brick_type, brick_hits in zip(xs, ys, types, hits):
+        field.add({'rect': pygame.Rect(x, y, brick_width, brick_height),
+                   'color': colors[(brick_type - 1) % len(colors)],
+                   'hits': max(1, brick_hits)})
+    return len(xs)
+
+
+# --- Zeichnen ---
+def draw_brick(surface, brick):
+    """Zeichnet einen Brick. Bricks mit mehreren Treffern bekommen einen hellen Rand."""
+    pygame.draw.rect(surface, brick['color'], brick['rect'], border_radius=3)
+    if brick.get('hits', 1) > 1:
+        pygame.draw.rect(surface, (255, 255, 255), brick['rect'], width=2, border_radius=3)
+
+
+def render_bricks(size, bricks, background=(0, 0, 0)):
+    """Zeichnet alle Bricks einmal auf eine eigene Fläche (Farbschlüssel = background).
+
+    Pro Frame wird dann nur diese Fläche geblittet; nach einem Treffer reicht
+    update_brick() für den einen Brick.
+    """
+    surface = pygame.Surface(size)
+    surface.fill(background)
+    surface.set_colorkey(background)
+    for brick in bricks:
+        draw_brick(surface, brick)
+    return surface
+
+
+def update_brick(surface, brick, background=(0, 0, 0)):
+    """Zeichnet einen getroffenen Brick neu bzw. löscht ihn, wenn er zerstört ist."""
+    surface.fill(background, brick['rect'])
+    if brick.get('hits', 0) > 0:
+        draw_brick(surface, brick)
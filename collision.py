@@ -0,0 +1,102 @@
+import math
+from collections import namedtuple
+
+# --- Kontinuierliche Kollisionserkennung ---
+# Statt nur zu prüfen, ob sich Ball und Rechteck nach einem Schritt überlappen,
+# wird die ganze Bahn des Balls in diesem Schritt geprüft. So kann auch ein sehr
+# schneller Ball nicht durch ein dünnes Paddel "tunneln".
+#
+# Ein Kreis mit Radius r, der ein Rechteck trifft, entspricht einem Punkt (dem
+# Kreismittelpunkt), der das um r vergrößerte Rechteck mit abgerundeten Ecken
+# trifft. Geprüft wird daher ein Strahl gegen das vergrößerte Rechteck und, falls
+# der Treffer in einem Eckbereich liegt, gegen den Eckkreis.
+
+# t: Anteil der Bewegung (0..1) bis zum Kontakt. normal_x/normal_y: Normale der
+# getroffenen Fläche (zeigt vom Rechteck weg), z.B. (1, 0) für die rechte Kante.
+Hit = namedtuple("Hit", "t normal_x normal_y")
+
+
+def _ray_circle(ox, oy, dx, dy, cx, cy, r):
+    """Kleinstes t in [0, 1], bei dem o + t*d den Kreis (c, r) erreicht, sonst None."""
+    fx, fy = ox - cx, oy - cy
+    a = dx * dx + dy * dy
+    b = 2 * (fx * dx + fy * dy)
+    c = fx * fx + fy * fy - r * r
+    if a == 0:
+        return None
+    discriminant = b * b - 4 * a * c
+    if discriminant < 0:
+        return None
+    t = (-b - math.sqrt(discriminant)) / (2 * a)
+    return t if 0.0 <= t <= 1.0 else None
+
+
+def swept_circle_rect(x, y, dx, dy, radius, rect):
+    """Erster Kontakt eines Kreises (Mitte x, y), der sich um (dx, dy) bewegt, mit rect.
+
+    rect braucht nur left/top/right/bottom (z.B. pygame.Rect). Gibt Hit oder None
+    zurück. Überlappt der Kreis das Rechteck schon zu Beginn und bewegt sich in es
+    hinein, ist t = 0 und die Normale zeigt zur nächstgelegenen Kante.
+    """
+    left, top = rect.left - radius, rect.top - radius
+    right, bottom = rect.right + radius, rect.bottom + radius
+
+    if left < x < right and top < y < bottom:
+        nearest_x = min(max(x, rect.left), rect.right)
+        nearest_y = min(max(y, rect.top), rect.bottom)
+        if (x - nearest_x) ** 2 + (y - nearest_y) ** 2 < radius * radius:
+            # Überlappt schon: Kante mit der geringsten Eindringtiefe
+            depths = [(x - left, -1, 0), (right - x, 1, 0), (y - top, 0, -1), (bottom - y, 0, 1)]
+            _, nx, ny = min(depths)
+            if dx * nx + dy * ny < 0: # Bewegt sich in das Rechteck hinein
+                return Hit(0.0, nx, ny)
+            return None
+        # Im Eckbereich des vergrößerten Rechtecks, aber außerhalb der abgerundeten
+        # Ecke: der erste Kontakt kann nur der Eckkreis sein (nearest ist die Ecke)
+        return _corner_hit(x, y, dx, dy, nearest_x, nearest_y, radius)
+
+    # Strahl gegen das vergrößerte Rechteck (Slab-Verfahren)
+    t_enter, t_exit = -math.inf, 1.0 # Auch Eintritt genau bei t = 0 (Ball berührt schon) zählt
+    normal = None
+    for origin, delta, low, high, axis_normal in ((x, dx, left, right, (1, 0)), (y, dy, top, bottom, (0, 1))):
+        if delta == 0:
+            if not low <= origin <= high:
+                return None
+            continue
+        t_low, t_high = (low - origin) / delta, (high - origin) / delta
+        sign = -1 if delta > 0 else 1 # Eintritt über die Seite, die der Bewegung entgegen zeigt
+        if t_low > t_high:
+            t_low, t_high = t_high, t_low
+        if t_low > t_enter:
+            t_enter = t_low
+            normal = (axis_normal[0] * sign, axis_normal[1] * sign)
+        t_exit = min(t_exit, t_high)
+        if t_enter > t_exit:
+            return None
+    if normal is None or t_enter < 0: # Keine Bewegung oder Eintritt läge hinter dem Start
+        return None
+
+    # Liegt der Eintrittspunkt neben einer Ecke, trifft der Kreis die abgerundete Ecke
+    hit_x, hit_y = x + dx * t_enter, y + dy * t_enter
+    corner_x = rect.left if hit_x < rect.left else rect.right if hit_x > rect.right else None
+    corner_y = rect.top if hit_y < rect.top else rect.bottom if hit_y > rect.bottom else None
+    if corner_x is None or corner_y is None:
+        return Hit(t_enter, *normal)
+    return _corner_hit(x, y, dx, dy, corner_x, corner_y, radius)
+
+
+def _corner_hit(x, y, dx, dy, corner_x, corner_y, radius):
+    """Kontakt des Kreises mit der Ecke (corner_x, corner_y) oder None."""
+    t = _ray_circle(x, y, dx, dy, corner_x, corner_y, radius)
+    if t is None:
+        return None
+    nx, ny = x + dx * t - corner_x, y + dy * t - corner_y
+    length = math.hypot(nx, ny) or 1.0
+    return Hit(t, nx / length, ny / length)
+
+
+def reflect(dx, dy, normal_x, normal_y):
+    """Spiegelt die Geschwindigkeit an der Fläche mit der (normierten) Normale."""
+    dot = dx * normal_x + dy * normal_y
+    return dx - 2 * dot * normal_x, dy - 2 * dot * normal_y
+
@@ -0,0 +1,162 @@
+import json
+import os
+import re
+import time
+
+# --- Konfiguration ---
+COUNTER_MAX_INCREASE = 500   # Maximal plausibler Anstieg zwischen zwei Aufnahmen (in Einheiten der letzten Stelle)
+COUNTER_MIN_SCORE = 0.5      # Mindest-Durchschnittsevidenz pro Stelle (0-1) für eine Übernahme
+COUNTER_REBASE_AFTER = 5     # So viele sichere, aber unplausible Lesungen in Folge setzen den Zähler neu
+COUNTER_REBASE_CONF = 90.0   # Konfidenz (0-100), ab der eine Stelle als "sicher" gilt
+ROLLING_EVIDENCE = 0.3       # Evidenz für eine halb gedrehte Stelle (zwischen alter und nächster Ziffer)
+
+
+def digit_candidates(results):
+    """Sammelt aus den OCR-Ergebnissen eines ROI {Ziffer: beste Konfidenz}.
+
+    results: {Methode: {"text": ..., "conf": ...}} wie in bild_ausewrtung_multiple_numbers.py
+    """
+    candidates = {}
+    for result in results.values():
+        digits = re.sub(r'\D', '', result["text"])
+        if len(digits) == 1:
+            candidates[digits] = max(candidates.get(digits, 0.0), float(result["conf"]))
+    return candidates
+
+
+class RollingCounterDecoder:
+    """Plausibilisiert Zählerstände eines mechanischen Rollenzählwerks.
+
+    Ein Zähler kann nur steigen, und zwischen zwei Aufnahmen nur um einen
+    begrenzten Betrag. Statt jede Stelle einzeln zu übernehmen, werden alle
+    Werte von letzter_Stand bis letzter_Stand + max_increase gegen die
+    OCR-Evidenz aller Stellen bewertet. Halb gedrehte Ziffern (OCR unsicher
+    oder leer) werden so über die Nachbarstellen und den Vorwert aufgelöst.
+    """
+
+    def __init__(self, num_digits, state_file=None, max_increase=COUNTER_MAX_INCREASE,
+                 min_score=COUNTER_MIN_SCORE, rebase_after=COUNTER_REBASE_AFTER):
+        self.num_digits = num_digits
+        self.state_file = state_file
+        self.max_increase = max_increase
+        self.min_score = min_score
+        self.rebase_after = rebase_after
+        self.last_value = None
+        self.last_timestamp = None
+        self.implausible_streak = []  # Letzte sichere, aber unplausible Lesungen
+        if state_file:
+            self._load()
+
+    # --- Zustand ---
+    def _load(self):
+        if not os.path.exists(self.state_file):
+            return
+        try:
+            with open(self.state_file, encoding="utf-8") as f:
+                state = json.load(f)
+            if state.get("num_digits") == self.num_digits:
+                self.last_value = state.get("last_value")
+                self.last_timestamp = state.get("last_timestamp")
+                self.implausible_streak = state.get("implausible_streak", [])
+        except (OSError, ValueError) as e:
+            print(f"WARNUNG: Zählerstand-Datei {self.state_file} konnte nicht gelesen werden: {e}")
+
+    def save(self):
+        if not self.state_file:
+            return
+        state = {"num_digits": self.num_digits, "last_value": self.last_value,
+                 "last_timestamp": self.last_timestamp, "implausible_streak": self.implausible_streak}
+        tmp_path = self.state_file + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp_path, self.state_file)
+
+    def format(self, value):
+        return str(value).zfill(self.num_digits)
+
+    def expected_digits(self):
+        """Je Stelle die Ziffern, die ohne Überlauf der tieferen Stellen zu erwarten sind.
+
+        Gibt eine Liste von Mengen zurück (alte Ziffer und nächste Ziffer), oder None
+        ohne bekannten Vorwert. Wird von der OCR-Kaskade für einen früheren Abbruch genutzt.
+        """
+        if self.last_value is None:
+            return None
+        last = self.format(self.last_value)
+        return [{digit, str((int(digit) + 1) % 10)} for digit in last]
+
+    # --- Dekodierung ---
+    def _score(self, digits, candidates, previous):
+        """Durchschnittliche Evidenz (0-1) eines Kandidatenwerts über alle Stellen."""
+        total = 0.0
+        for position, digit in enumerate(digits):
+            position_candidates = candidates[position]
+            if digit in position_candidates:
+                total += position_candidates[digit] / 100.0
+            elif previous is not None and not any(conf >= COUNTER_REBASE_CONF for conf in position_candidates.values()):
+                # Keine sichere Lesung an dieser Stelle: halb gedrehte Rolle zwischen
+                # alter und nächster Ziffer ist plausibel
+                old_digit = previous[position]
+                if digit in (old_digit, str((int(old_digit) + 1) % 10)):
+                    total += ROLLING_EVIDENCE
+        return total / self.num_digits
+
+    def decode(self, candidates, timestamp=None):
+        """Bestimmt den plausibelsten Zählerstand.
+
+        candidates: Liste (eine pro Stelle, höchstwertige zuerst) von {Ziffer: Konfidenz 0-100}.
+        Gibt (Zählerstand als Text oder None, Status, Score) zurück. Status ist
+        'accepted', 'unchanged', 'initial', 'rebased' oder 'rejected'.
+        """
+        if len(candidates) != self.num_digits:
+            raise ValueError(f"{len(candidates)} Stellen übergeben, erwartet {self.num_digits}")
+        timestamp = timestamp if timestamp is not None else time.time()
+
+        # Direkte Lesung: pro Stelle die Ziffer mit der höchsten Konfidenz
+        direct = []
+        for position_candidates in candidates:
+            if position_candidates:
+                direct.append(max(position_candidates.items(), key=lambda item: item[1]))
+        direct_complete = len(direct) == self.num_digits
+        direct_confident = direct_complete and all(conf >= COUNTER_REBASE_CONF for _, conf in direct)
+        direct_value = int("".join(digit for digit, _ in direct)) if direct_complete else None
+
+        if self.last_value is None:
+            # Ohne Vorwert nur eine vollständige, sichere Lesung übernehmen (jede Stelle >= COUNTER_REBASE_CONF)
+            score = self._score(self.format(direct_value), candidates, None) if direct_complete else 0.0
+            if direct_confident and score >= self.min_score:
+                self._accept(direct_value, timestamp)
+                return self.format(direct_value), 'initial', score
+            return None, 'rejected', score
+
+        previous = self.format(self.last_value)
+        best_value, best_score = None, -1.0
+        modulus = 10 ** self.num_digits
+        for increase in range(self.max_increase + 1):
+            value = (self.last_value + increase) % modulus  # Überlauf 999999 -> 000000
+            score = self._score(self.format(value), candidates, previous)
+            if score > best_score:  # Bei Gleichstand gewinnt der kleinere Anstieg
+                best_value, best_score = value, score
+
+        if best_score >= self.min_score:
+            self.implausible_streak = []
+            status = 'unchanged' if best_value == self.last_value else 'accepted'
+            self._accept(best_value, timestamp)
+            return self.format(best_value), status, best_score
+
+        # Keine plausible Erklärung. Sichere Lesungen, die wiederholt dasselbe zeigen,
+        # deuten auf einen falschen Vorwert (z.B. Zählertausch) -> neu aufsetzen.
+        if direct_confident:
+            self.implausible_streak = (self.implausible_streak + [direct_value])[-self.rebase_after:]
+            streak = self.implausible_streak
+            # Neu aufsetzen, wenn die Lesungen untereinander einen plausiblen Verlauf zeigen
+            if len(streak) == self.rebase_after and all(b >= a for a, b in zip(streak, streak[1:])) \
+                    and streak[-1] - streak[0] <= self.max_increase:
+                self.implausible_streak = []
+                self._accept(direct_value, timestamp)
+                return self.format(direct_value), 'rebased', 1.0
+        return None, 'rejected', best_score
+
+    def _accept(self, value, timestamp):
+        self.last_value = value
+        self.last_timestamp = timestamp
@@ -0,0 +1,127 @@
+import atexit
+import os
+import queue
+import threading
+from collections import OrderedDict
+
+# --- Konfiguration ---
+# 'off':     Keine Debug-Bilder (Dauerbetrieb)
+# 'sampled': Nur jedes DEBUG_SAMPLE_EVERY-te Bild speichern
+# 'always':  Jedes Bild speichern (Einrichtung, Fehlersuche)
+DEBUG_MODES = ('off', 'sampled', 'always')
+DEBUG_SAMPLE_EVERY = 10
+DEBUG_DIR = '.'                    # Zielordner der PNGs
+DEBUG_KEEP_HISTORY = False         # True: Bildnummer im Dateinamen statt Überschreiben
+DEBUG_MAX_FILES = 200              # Obergrenzen für den Ordner, älteste Dateien werden gelöscht
+DEBUG_MAX_BYTES = 50 * 1024 * 1024
+DEBUG_QUEUE_SIZE = 64              # Volle Warteschlange -> Bild wird verworfen statt zu warten
+
+
+class DebugSink:
+    """Schreibt Debug-Bilder in einem Hintergrund-Thread.
+
+    Der Aufrufer übergibt nur eine Kopie des Bildes an eine Warteschlange;
+    PNG-Kodierung und Schreiben laufen im Hintergrund. Ist die Warteschlange
+    voll, wird das Bild verworfen, damit die Erkennung nie auf die Platte wartet.
+
+    Pro Aufnahme einmal begin_frame() aufrufen, danach write() für jedes Bild.
+    """
+
+    def __init__(self, mode='always', sample_every=DEBUG_SAMPLE_EVERY, directory=DEBUG_DIR,
+                 keep_history=DEBUG_KEEP_HISTORY, max_files=DEBUG_MAX_FILES, max_bytes=DEBUG_MAX_BYTES,
+                 queue_size=DEBUG_QUEUE_SIZE):
+        if mode not in DEBUG_MODES:
+            raise ValueError(f"Unbekannter Debug-Modus '{mode}' (erlaubt: {', '.join(DEBUG_MODES)})")
+        self.mode = mode
+        self.sample_every = max(1, sample_every)
+        self.directory = directory
+        self.keep_history = keep_history
+        self.max_files = max_files
+        self.max_bytes = max_bytes
+        self.frame = -1
+        self.capture_frame = False
+        self.written = 0
+        self.dropped = 0
+        self.deleted = 0
+        self._files = OrderedDict()  # Pfad -> Größe, älteste zuerst
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = None
+        if mode != 'off':
+            os.makedirs(directory, exist_ok=True)
+            self._thread = threading.Thread(target=self._worker, name="debug-sink", daemon=True)
+            self._thread.start()
+            atexit.register(self.close)
+
+    @property
+    def enabled(self):
+        return self.mode != 'off'
+
+    def begin_frame(self):
+        """Beginnt eine neue Aufnahme. Gibt True zurück, wenn ihre Bilder gespeichert werden."""
+        self.frame += 1
+        if self.mode == 'always':
+            self.capture_frame = True
+        elif self.mode == 'sampled':
+            self.capture_frame = self.frame % self.sample_every == 0
+        else:
+            self.capture_frame = False
+        return self.capture_frame
+
+    def write(self, name, image):
+        """Übergibt ein Bild (wird kopiert) zum Speichern, falls die aktuelle Aufnahme gespeichert wird."""
+        if not self.capture_frame or image is None:
+            return False
+        filename = f"{self.frame:06d}_{name}" if self.keep_history else name
+        try:
+            # Kopie, da Puffer (z.B. der Vorverarbeitung) beim nächsten Bild überschrieben werden
+            self._queue.put_nowait((os.path.join(self.directory, filename), image.copy()))
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def _worker(self):
+        import cv2 # Erst hier, damit DEBUG_IMAGE_MODE='off' kein OpenCV lädt
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                path, image = item
+                try:
+                    if cv2.imwrite(path, image):
+                        self.written += 1
+                        self._track(path)
+                except Exception as e:
+                    print(f"WARNUNG: Debug-Bild {path} konnte nicht gespeichert werden: {e}")
+            finally:
+                self._queue.task_done()
+
+    def _track(self, path):
+        """Begrenzt Anzahl und Größe der Debug-Bilder (älteste werden gelöscht)."""
+        self._files.pop(path, None)
+        self._files[path] = os.path.getsize(path)
+        total = sum(self._files.values())
+        while len(self._files) > 1 and (len(self._files) > self.max_files or total > self.max_bytes):
+            old_path, size = self._files.popitem(last=False)
+            total -= size
+            try:
+                os.remove(old_path)
+                self.deleted += 1
+            except OSError:
+                pass
+
+    def flush(self):
+        """Wartet, bis alle übergebenen Bilder geschrieben sind."""
+        if self._thread is not None:
+            self._queue.join()
+
+    def close(self):
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(timeout=5.0)
+        self._thread = None
+
+    def summary(self):
+        return (f"Debug-Bilder ({self.mode}): {self.written} geschrieben, {self.dropped} verworfen, "
+                f"{self.deleted} rotiert")
@@ -0,0 +1,169 @@
+import argparse
+import os
+import re
+import sys
+
+import cv2
+import numpy as np
+
+# --- Konfiguration ---
+# Zählerziffern haben eine feste Schrift in festen ROIs. Statt Tesseract reicht
+# ein Vergleich mit gelernten Beispielen (k-NN über normalisierte Binärbilder).
+NORMALIZED_SIZE = (16, 24)   # (Breite, Höhe) nach der Normalisierung
+TEMPLATE_FILE = 'digit_templates.npz'
+CONFIDENCE_MARGIN = 0.15     # Abstand bester/zweitbester Ziffer, ab dem die Konfidenz voll zählt
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp')
+
+
+def normalize_roi(roi_img):
+    """Binarisiert ein ROI, skaliert es auf NORMALIZED_SIZE und gibt einen Einheitsvektor zurück."""
+    if len(roi_img.shape) == 3:
+        roi_img = cv2.cvtColor(roi_img, cv2.COLOR_BGR2GRAY)
+    blurred = cv2.GaussianBlur(roi_img, (3, 3), 0)
+    _, binary = cv2.threshold(blurred, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+    small = cv2.resize(binary, NORMALIZED_SIZE, interpolation=cv2.INTER_AREA)
+    vector = small.astype(np.float32).ravel() / 255.0
+    vector -= vector.mean()
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm > 0 else vector
+
+
+class TemplateDigitClassifier:
+    """k-NN Ziffernerkennung (k=1 pro Ziffer) mit Kosinus-Ähnlichkeit.
+
+    Alle ROIs eines Bildes werden in einer einzigen Matrixmultiplikation
+    gegen alle gelernten Beispiele verglichen.
+    """
+
+    def __init__(self, samples=None, labels=None):
+        self.samples = samples if samples is not None else np.zeros((0, NORMALIZED_SIZE[0] * NORMALIZED_SIZE[1]), np.float32)
+        self.labels = labels if labels is not None else np.zeros(0, np.int8)
+
+    @property
+    def is_trained(self):
+        return len(self.labels) > 0
+
+    def add_samples(self, roi_images, digits):
+        vectors = np.stack([normalize_roi(img) for img in roi_images]).astype(np.float32)
+        self.samples = np.concatenate([self.samples, vectors])
+        self.labels = np.concatenate([self.labels, np.asarray(digits, dtype=np.int8)])
+
+    def classify(self, roi_images):
+        """Erkennt alle ROIs auf einmal. Gibt eine Liste von (Ziffer als Text, Konfidenz 0-100) zurück."""
+        if not self.is_trained:
+            raise RuntimeError("Keine Ziffern-Templates geladen (erst 'python digit_templates.py train' ausführen).")
+        if len(roi_images) == 0:
+            return []
+        vectors = np.stack([normalize_roi(img) for img in roi_images])
+        return self.classify_vectors(vectors)
+
+    def classify_vectors(self, vectors):
+        similarities = vectors @ self.samples.T            # (ROIs, Beispiele)
+        # Beste Ähnlichkeit je Ziffer 0-9 (fehlende Ziffern bleiben bei -1)
+        scores = np.full((len(vectors), 10), -1.0, dtype=np.float32)
+        for digit in np.unique(self.labels):
+            scores[:, digit] = similarities[:, self.labels == digit].max(axis=1)
+        order = np.argsort(scores, axis=1)
+        best = order[:, -1]
+        rows = np.arange(len(vectors))
+        best_score = scores[rows, best]
+        second_score = scores[rows, order[:, -2]]
+        # Konfidenz: hohe Ähnlichkeit UND deutlicher Abstand zur zweitbesten Ziffer
+        margin = np.clip((best_score - second_score) / CONFIDENCE_MARGIN, 0.0, 1.0)
+        confidence = 100.0 * np.clip(best_score, 0.0, 1.0) * margin
+        return [(str(int(digit)), float(conf)) for digit, conf in zip(best, confidence)]
+
+    def save(self, path=TEMPLATE_FILE):
+        np.savez_compressed(path, samples=self.samples, labels=self.labels,
+                            size=np.asarray(NORMALIZED_SIZE))
+
+    @classmethod
+    def load(cls, path=TEMPLATE_FILE):
+        data = np.load(path)
+        if tuple(data["size"]) != NORMALIZED_SIZE:
+            raise ValueError(f"{path} wurde mit anderer NORMALIZED_SIZE erstellt, bitte neu trainieren.")
+        return cls(data["samples"].astype(np.float32), data["labels"].astype(np.int8))
+
+
+_CLASSIFIERS = {}
+
+
+def get_classifier(path=TEMPLATE_FILE):
+    """Lädt die Templates einmal pro Prozess."""
+    classifier = _CLASSIFIERS.get(path)
+    if classifier is None:
+        classifier = _CLASSIFIERS[path] = TemplateDigitClassifier.load(path)
+    return classifier
+
+
+# --- Trainingsdaten ---
+def load_labeled_rois(directory, rois=None):
+    """Lädt beschriftete Ziffern.
+
+    Variante A: Unterordner 0-9 mit ausgeschnittenen Ziffern-ROIs.
+    Variante B: Ganze Aufnahmen, deren Dateiname mit dem Zählerstand beginnt
+                (z.B. '012345_2024-01-01.jpg'); die Ziffern werden mit 'rois' ausgeschnitten.
+    """
+    images, digits = [], []
+    digit_dirs = [d for d in map(str, range(10)) if os.path.isdir(os.path.join(directory, d))]
+    if digit_dirs:
+        for digit in digit_dirs:
+            folder = os.path.join(directory, digit)
+            for name in sorted(os.listdir(folder)):
+                if name.lower().endswith(IMAGE_EXTENSIONS):
+                    img = cv2.imread(os.path.join(folder, name), cv2.IMREAD_GRAYSCALE)
+                    if img is not None:
+                        images.append(img)
+                        digits.append(int(digit))
+        return images, digits
+
+    if rois is None:
+        raise ValueError("Für ganze Aufnahmen wird die ROI-Liste benötigt.")
+    for name in sorted(os.listdir(directory)):
+        match = re.match(r"(\d+)", name)
+        if not name.lower().endswith(IMAGE_EXTENSIONS) or match is None:
+            continue
+        label = match.group(1)
+        if len(label) != len(rois):
+            print(f"Überspringe {name}: {len(label)} Ziffern im Namen, aber {len(rois)} ROIs.")
+            continue
+        gray = cv2.imread(os.path.join(directory, name), cv2.IMREAD_GRAYSCALE)
+        if gray is None:
+            continue
+        for roi, digit in zip(rois, label):
+            roi_img = gray[roi["y"]:roi["y"] + roi["h"], roi["x"]:roi["x"] + roi["w"]]
+            if roi_img.shape == (roi["h"], roi["w"]):
+                images.append(roi_img)
+                digits.append(int(digit))
+    return images, digits
+
+
+# --- Hauptteil des Skripts ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ziffern-Templates trainieren oder prüfen.")
+    parser.add_argument("command", choices=("train", "eval"))
+    parser.add_argument("directory", help="Ordner mit beschrifteten Aufnahmen oder Unterordnern 0-9")
+    parser.add_argument("--templates", default=TEMPLATE_FILE)
+    args = parser.parse_args()
+
+    from bild_ausewrtung_multiple_numbers import rois as default_rois
+    images, digits = load_labeled_rois(args.directory, default_rois)
+    if not images:
+        print(f"Keine beschrifteten Ziffern in '{args.directory}' gefunden.")
+        sys.exit(1)
+
+    if args.command == "train":
+        classifier = TemplateDigitClassifier()
+        classifier.add_samples(images, digits)
+        classifier.save(args.templates)
+        counts = np.bincount(classifier.labels, minlength=10)
+        print(f"{len(digits)} Beispiele gespeichert in {args.templates} (pro Ziffer: {counts.tolist()})")
+    else:
+        import time
+        classifier = TemplateDigitClassifier.load(args.templates)
+        start = time.perf_counter()
+        predictions = classifier.classify(images)
+        duration = time.perf_counter() - start
+        correct = sum(int(text) == digit for (text, _), digit in zip(predictions, digits))
+        print(f"Genauigkeit: {correct}/{len(digits)} ({correct / len(digits) * 100:.1f}%), "
+              f"{duration / len(digits) * 1e6:.1f} µs pro Ziffer")
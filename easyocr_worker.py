@@ -0,0 +1,246 @@
+import argparse
+import os
+import queue
+import secrets
+import threading
+import time
+from concurrent.futures import Future
+from multiprocessing.connection import Client, Listener
+
+import numpy as np
+
+# --- Konfiguration ---
+# Lang laufender OCR-Prozess: lädt das EasyOCR-Modell einmal (mehrere Sekunden)
+# und beantwortet danach Anfragen der Skripte über einen lokalen Socket.
+WORKER_ADDRESS = ('127.0.0.1', 6011)
+# Gemeinsamer Schlüssel für Client und Worker. Die Verbindung überträgt Pickles, wer den
+# Schlüssel kennt, kann im Worker Code ausführen. Deshalb zufällig pro Benutzer erzeugt
+# und nur für ihn lesbar gespeichert (oder als Hex-Text in der Umgebungsvariable).
+WORKER_AUTHKEY_FILE = os.path.join(os.path.expanduser('~'), '.beamer-games-ocr.key')
+WORKER_AUTHKEY_ENV = 'BEAMER_GAMES_OCR_KEY'
+EASYOCR_LANG = ['en']
+EASYOCR_GPU = False
+ALLOWLIST = '0123456789'
+BATCH_MAX_ROIS = 32        # Höchstens so viele ROIs in einem readtext-Aufruf
+BATCH_MAX_WAIT_S = 0.02    # So lange auf weitere Anfragen warten, bevor ein Stapel startet
+
+
+# --- Schlüssel ---
+def load_authkey(path=WORKER_AUTHKEY_FILE, create=False):
+    """Liest den Schlüssel aus WORKER_AUTHKEY_ENV oder der Schlüsseldatei.
+
+    create=True (Worker) erzeugt die Datei mit 32 Zufallsbytes und Rechten 0600, falls sie
+    fehlt. Ohne Schlüssel wirft der Client FileNotFoundError. Eine Datei, die andere
+    Benutzer lesen können, wird abgelehnt (PermissionError).
+    """
+    env_key = os.environ.get(WORKER_AUTHKEY_ENV)
+    if env_key:
+        return bytes.fromhex(env_key)
+    if create and not os.path.exists(path):
+        # O_EXCL: nie eine fremde, gleichzeitig angelegte Datei überschreiben
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, 'w') as f:
+            f.write(secrets.token_bytes(32).hex())
+        print(f"INFO: Neuer Schlüssel für den OCR-Worker in {path}")
+    if os.name == 'posix' and os.stat(path).st_mode & 0o077:
+        raise PermissionError(f"Schlüsseldatei {path} ist für andere lesbar, bitte 'chmod 600 {path}'")
+    with open(path) as f:
+        return bytes.fromhex(f.read().strip())
+
+
+# --- Stapelverarbeitung ---
+def readtext_stitched(reader, images, allowlist=ALLOWLIST):
+    """Erkennt mehrere ROIs mit einem einzigen readtext-Aufruf.
+
+    Die ROIs werden nebeneinander auf eine Leinwand gesetzt (mit Abstand,
+    damit die Texterkennung sie nicht verbindet). Jede gefundene Textbox
+    wird über ihre Mitte dem ROI zugeordnet. Gibt [(Text, Konfidenz 0-100), ...] zurück.
+    """
+    images = [np.dstack([img] * 3) if img.ndim == 2 else img for img in images]
+    height = max(img.shape[0] for img in images)
+    gap = height // 2 + 10
+    width = sum(img.shape[1] for img in images) + gap * (len(images) + 1)
+    # Hintergrund in der typischen Helligkeit der ROIs, damit an den Rändern keine Kanten entstehen
+    background = int(np.median(np.concatenate([img.ravel() for img in images])))
+    canvas = np.full((height + 2 * gap, width, 3), background, dtype=np.uint8)
+    spans = []
+    x = gap
+    for img in images:
+        h, w = img.shape[:2]
+        canvas[gap:gap + h, x:x + w] = img
+        spans.append((x, x + w))
+        x += w + gap
+
+    detections = [[] for _ in images]
+    for box, text, conf in reader.readtext(canvas, allowlist=allowlist, detail=1, paragraph=False):
+        center_x = sum(point[0] for point in box) / len(box)
+        for index, (left, right) in enumerate(spans):
+            if left - gap / 2 <= center_x < right + gap / 2:
+                detections[index].append((center_x, text, conf))
+                break
+    results = []
+    for found in detections:
+        found.sort()
+        text = " ".join(t for _, t, _ in found)
+        conf = sum(c for _, _, c in found) / len(found) * 100 if found else 0.0
+        results.append((text, conf))
+    return results
+
+
+class BatchingOCRServer:
+    """Sammelt ROIs gleichzeitiger Anfragen und erkennt sie gemeinsam."""
+
+    def __init__(self, reader, max_batch_rois=BATCH_MAX_ROIS, max_wait_s=BATCH_MAX_WAIT_S):
+        self.reader = reader
+        self.max_batch_rois = max_batch_rois
+        self.max_wait_s = max_wait_s
+        self.requests = queue.Queue()
+        self._held = None   # Anfrage mit anderer allowlist, beginnt den nächsten Stapel
+        self.batches = 0
+        self.rois = 0
+        self.ocr_seconds = 0.0
+        self._stats_lock = threading.Lock()
+        threading.Thread(target=self._batch_loop, name="ocr-batches", daemon=True).start()
+
+    def submit(self, images, allowlist=ALLOWLIST):
+        future = Future()
+        self.requests.put((images, allowlist, future))
+        return future
+
+    def _next_batch(self):
+        # Nur der Stapel-Thread greift auf _held zu
+        if self._held is not None:
+            batch, self._held = [self._held], None
+        else:
+            batch = [self.requests.get()]
+        count = len(batch[0][0])
+        deadline = time.monotonic() + self.max_wait_s
+        while count < self.max_batch_rois:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                request = self.requests.get(timeout=remaining)
+            except queue.Empty:
+                break
+            # Unterschiedliche allowlists nicht mischen; die Anfrage behält ihren Platz
+            # in der Reihenfolge, statt hinten in die Warteschlange zu rutschen
+            if request[1] != batch[0][1]:
+                self._held = request
+                break
+            batch.append(request)
+            count += len(request[0])
+        return batch
+
+    def _batch_loop(self):
+        while True:
+            batch = self._next_batch()
+            images = [img for request_images, _, _ in batch for img in request_images]
+            start = time.perf_counter()
+            try:
+                results = readtext_stitched(self.reader, images, batch[0][1]) if images else []
+            except Exception as e:
+                for _, _, future in batch:
+                    future.set_exception(e)
+                continue
+            with self._stats_lock:
+                self.batches += 1
+                self.rois += len(images)
+                self.ocr_seconds += time.perf_counter() - start
+            offset = 0
+            for request_images, _, future in batch:
+                future.set_result(results[offset:offset + len(request_images)])
+                offset += len(request_images)
+
+    def stats(self):
+        with self._stats_lock:
+            return {"batches": self.batches, "rois": self.rois,
+                    "rois_per_batch": self.rois / self.batches if self.batches else 0.0,
+                    "ms_per_roi": self.ocr_seconds / self.rois * 1000 if self.rois else 0.0}
+
+    def handle(self, conn):
+        """Beantwortet Anfragen einer Verbindung, bis der Client sie schließt."""
+        try:
+            while True:
+                request = conn.recv()
+                try:
+                    if request.get("op") == "readtext":
+                        future = self.submit(request["images"], request.get("allowlist", ALLOWLIST))
+                        conn.send({"results": future.result()})
+                    elif request.get("op") == "stats":
+                        conn.send({"stats": self.stats()})
+                    else:
+                        conn.send({"error": f"Unbekannte Operation {request.get('op')!r}"})
+                except Exception as e:
+                    conn.send({"error": f"{type(e).__name__}: {e}"})
+        except (EOFError, OSError):
+            pass
+        finally:
+            conn.close()
+
+
+def serve(address=WORKER_ADDRESS, authkey=None):
+    authkey = authkey or load_authkey(create=True)
+    import easyocr
+    print("INFO: Initialisiere EasyOCR Reader (einmalig)...")
+    start = time.perf_counter()
+    reader = easyocr.Reader(EASYOCR_LANG, gpu=EASYOCR_GPU)
+    print(f"INFO: EasyOCR Reader geladen in {time.perf_counter() - start:.1f}s")
+    server = BatchingOCRServer(reader)
+    with Listener(address, authkey=authkey) as listener:
+        print(f"OCR-Worker bereit auf {address[0]}:{address[1]}")
+        while True:
+            try:
+                conn = listener.accept()
+            except KeyboardInterrupt:
+                break
+            except Exception as e: # z.B. falscher Schlüssel
+                print(f"WARNUNG: Verbindung abgelehnt: {e}")
+                continue
+            threading.Thread(target=server.handle, args=(conn,), daemon=True).start()
+    print(f"OCR-Worker beendet. Statistik: {server.stats()}")
+
+
+# --- Client ---
+class EasyOCRClient:
+    """Verbindung zum OCR-Worker. Wiederverwendbar und threadsicher."""
+
+    def __init__(self, address=WORKER_ADDRESS, authkey=None):
+        # FileNotFoundError ohne Schlüssel, ConnectionRefusedError, wenn kein Worker läuft
+        self.conn = Client(address, authkey=authkey or load_authkey())
+        self._lock = threading.Lock()
+
+    def _request(self, request):
+        with self._lock:
+            self.conn.send(request)
+            response = self.conn.recv()
+        if "error" in response:
+            raise RuntimeError(f"OCR-Worker: {response['error']}")
+        return response
+
+    def readtext(self, images, allowlist=ALLOWLIST):
+        """Erkennt ROIs (NumPy-Bilder). Gibt [(Text, Konfidenz 0-100), ...] zurück."""
+        return self._request({"op": "readtext", "images": list(images), "allowlist": allowlist})["results"]
+
+    def stats(self):
+        return self._request({"op": "stats"})["stats"]
+
+    def close(self):
+        self.conn.close()
+
+
+# --- Hauptteil des Skripts ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="EasyOCR-Worker mit einmal geladenem Modell.")
+    parser.add_argument("--port", type=int, default=WORKER_ADDRESS[1])
+    parser.add_argument("--stats", action="store_true", help="Statistik eines laufenden Workers abfragen")
+    args = parser.parse_args()
+    worker_address = (WORKER_ADDRESS[0], args.port)
+    if args.stats:
+        client = EasyOCRClient(worker_address)
+        stats = client.stats()
+        client.close()
+        print(f"{stats['batches']} Stapel, {stats['rois']} ROIs (Ø {stats['rois_per_batch']:.1f} pro Stapel), "
+              f"{stats['ms_per_roi']:.1f} ms pro ROI")
+    else:
+        serve(worker_address)
@@ -0,0 +1,250 @@
+import re
+import threading
+import time
+from collections import deque
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# --- Grundlegende Konfiguration ---
+# Standardwerte passend zur ESP32-CAM Beispiel-Firmware (CameraWebServer):
+# Einzelbilder unter /capture auf Port 80, MJPEG-Stream unter /stream auf Port 81.
+DEFAULT_CAPTURE_PATH = "/capture"
+DEFAULT_STREAM_PORT = 81
+DEFAULT_STREAM_PATH = "/stream"
+CONNECT_TIMEOUT = 10  # Sekunden für Verbindungsaufbau
+READ_TIMEOUT = 15     # Sekunden für Datenempfang
+
+# Verbindungs-Pool: Die ESP32-CAM verkraftet nur wenige parallele Verbindungen,
+# daher reichen kleine Werte. Keep-Alive spart den TCP-Aufbau pro Bild.
+POOL_CONNECTIONS = 1
+POOL_MAXSIZE = 2
+
+# Ringpuffer für den Stream-Modus: Anzahl der zuletzt empfangenen Bilder
+STREAM_RING_BUFFER_SIZE = 8
+STREAM_CHUNK_SIZE = 4096
+
+JPEG_SOI = b"\xff\xd8"  # Start of Image
+JPEG_EOI = b"\xff\xd9"  # End of Image
+_CONTENT_LENGTH_RE = re.compile(rb"content-length:\s*(\d+)", re.IGNORECASE)
+
+
+def create_session(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE):
+    """Erstellt eine requests.Session mit Keep-Alive Verbindungs-Pool."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+# --- MJPEG Parser ---
+class MJPEGStreamParser:
+    """Zerlegt einen multipart/x-mixed-replace MJPEG-Bytestrom in einzelne JPEGs.
+
+    Nutzt den Content-Length Header eines Teils, falls vorhanden, und fällt
+    sonst auf die Suche nach den JPEG-Markern (SOI/EOI) zurück.
+    """
+
+    def __init__(self, max_buffer_size=2 * 1024 * 1024):
+        self.buffer = bytearray()
+        self.max_buffer_size = max_buffer_size
+        self.expected_length = None  # Länge des aktuellen Teils laut Header
+
+    def feed(self, chunk):
+        """Fügt empfangene Bytes hinzu und gibt alle vollständigen Bilder zurück."""
+        self.buffer.extend(chunk)
+        frames = []
+        while True:
+            frame = self._next_frame()
+            if frame is None:
+                break
+            frames.append(frame)
+
+        # Schutz gegen unbegrenztes Wachstum bei kaputtem Stream
+        if len(self.buffer) > self.max_buffer_size:
+            print("WARNUNG: MJPEG-Puffer übergelaufen, verwerfe Daten.")
+            self.buffer.clear()
+            self.expected_length = None
+        return frames
+
+    def _next_frame(self):
+        if self.expected_length is None:
+            soi = self.buffer.find(JPEG_SOI)
+            if soi < 0:
+                return None
+            # Teil-Header vor dem Bild auswerten (falls vorhanden)
+            header_end = self.buffer.rfind(b"\r\n\r\n", 0, soi + 1)
+            if header_end >= 0:
+                match = None
+                for match in _CONTENT_LENGTH_RE.finditer(self.buffer, 0, header_end):
+                    pass
+                if match is not None:
+                    self.expected_length = int(match.group(1))
+            del self.buffer[:soi]
+
+        if self.expected_length is not None:
+            if len(self.buffer) < self.expected_length:
+                return None
+            frame = bytes(self.buffer[:self.expected_length])
+            del self.buffer[:self.expected_length]
+            self.expected_length = None
+            if frame.startswith(JPEG_SOI):
+                return frame
+            print("WARNUNG: MJPEG-Teil ohne gültigen JPEG-Start, wird verworfen.")
+            return self._next_frame()
+
+        eoi = self.buffer.find(JPEG_EOI, len(JPEG_SOI))
+        if eoi < 0:
+            return None
+        frame = bytes(self.buffer[:eoi + len(JPEG_EOI)])
+        del self.buffer[:eoi + len(JPEG_EOI)]
+        return frame
+
+
+# --- Capture Client ---
+class ESP32CamClient:
+    """Holt Bilder von einer ESP32-CAM über eine wiederverwendete HTTP-Session.
+
+    Einzelbilder kommen von /capture (Keep-Alive statt neuer Verbindung pro Bild).
+    Im Stream-Modus liest ein Hintergrund-Thread den MJPEG-Stream und legt die
+    letzten Bilder in einem Ringpuffer ab.
+    """
+
+    def __init__(self, host, capture_url=None, stream_url=None,
+                 conn_timeout=CONNECT_TIMEOUT, read_timeout=READ_TIMEOUT,
+                 ring_buffer_size=STREAM_RING_BUFFER_SIZE, session=None):
+        self.host = host
+        self.capture_url = capture_url or f"http://{host}{DEFAULT_CAPTURE_PATH}"
+        self.stream_url = stream_url or f"http://{host}:{DEFAULT_STREAM_PORT}{DEFAULT_STREAM_PATH}"
+        self.timeout = (conn_timeout, read_timeout)
+        self.session = session or create_session()
+
+        # Stream-Zustand
+        self.frames = deque(maxlen=ring_buffer_size)  # (Zeitstempel, JPEG-Bytes)
+        self.frames_received = 0
+        self._frame_lock = threading.Lock()
+        self._new_frame = threading.Condition(self._frame_lock)
+        self._stream_thread = None
+        self._stop_event = threading.Event()
+        self._stream_response = None
+
+    # Einzelbild
+    def capture(self):
+        """Holt ein Einzelbild. Gibt die JPEG-Bytes zurück oder None bei Fehler."""
+        try:
+            response = self.session.get(self.capture_url, timeout=self.timeout)
+            response.raise_for_status()
+            content_type = response.headers.get('Content-Type', '')
+            if 'image/jpeg' not in content_type:
+                print(f"Unerwarteter Content-Type: {content_type}")
+                return None
+            if not response.content:
+                print("FEHLER: Keine Bilddaten empfangen, obwohl Status OK war.")
+                return None
+            return response.content
+        except requests.exceptions.Timeout:
+            print(f"Fehler: Timeout beim Zugriff auf {self.capture_url} "
+                  f"(Connect: {self.timeout[0]}s, Read: {self.timeout[1]}s)")
+        except requests.exceptions.RequestException as e:
+            print(f"Fehler beim Abrufen des Bildes: {e}")
+        return None
+
+    # Stream-Modus
+    def iter_stream(self, chunk_size=STREAM_CHUNK_SIZE):
+        """Liest den MJPEG-Stream und liefert die einzelnen JPEG-Bilder als Generator."""
+        parser = MJPEGStreamParser()
+        with self.session.get(self.stream_url, timeout=self.timeout, stream=True) as response:
+            response.raise_for_status()
+            self._stream_response = response
+            try:
+                for chunk in response.iter_content(chunk_size=chunk_size):
+                    if self._stop_event.is_set():
+                        break
+                    if chunk:
+                        yield from parser.feed(chunk)
+            finally:
+                self._stream_response = None
+
+    def start_stream(self, reconnect_delay=1.0):
+        """Startet den Hintergrund-Thread, der den Ringpuffer füllt."""
+        if self._stream_thread is not None and self._stream_thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._stream_thread = threading.Thread(
+            target=self._stream_loop, args=(reconnect_delay,), name="esp32-mjpeg", daemon=True)
+        self._stream_thread.start()
+
+    def stop_stream(self, timeout=2.0):
+        """Beendet den Stream-Thread."""
+        self._stop_event.set()
+        response = self._stream_response
+        if response is not None:
+            response.close()  # Unterbricht ein blockierendes Lesen
+        if self._stream_thread is not None:
+            self._stream_thread.join(timeout)
+            self._stream_thread = None
+
+    def _stream_loop(self, reconnect_delay):
+        while not self._stop_event.is_set():
+            try:
+                for frame in self.iter_stream():
+                    with self._new_frame:
+                        self.frames.append((time.time(), frame))
+                        self.frames_received += 1
+                        self._new_frame.notify_all()
+            except requests.exceptions.RequestException as e:
+                if not self._stop_event.is_set():
+                    print(f"Stream unterbrochen ({e}), neuer Versuch in {reconnect_delay}s...")
+            except Exception as e:
+                if not self._stop_event.is_set():
+                    print(f"Unerwarteter Fehler im Stream: {e}")
+            self._stop_event.wait(reconnect_delay)
+
+    def latest_frame(self, wait_timeout=None, newer_than=None):
+        """Gibt (Zeitstempel, JPEG-Bytes) des neuesten Bildes im Ringpuffer zurück.
+
+        Mit wait_timeout wird bis zu so viele Sekunden auf ein Bild gewartet,
+        das neuer als newer_than ist.
+        """
+        with self._new_frame:
+            def available():
+                return self.frames and (newer_than is None or self.frames[-1][0] > newer_than)
+            if wait_timeout is not None:
+                self._new_frame.wait_for(available, wait_timeout)
+            if not available():
+                return None
+            return self.frames[-1]
+
+    def close(self):
+        """Stoppt den Stream und schließt die HTTP-Session."""
+        self.stop_stream()
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+# --- Kurzer Test gegen eine echte Kamera ---
+if __name__ == "__main__":
+    import sys
+
+    host = sys.argv[1] if len(sys.argv) > 1 else "192.168.178.178"
+    with ESP32CamClient(host) as client:
+        start = time.perf_counter()
+        for i in range(5):
+            t0 = time.perf_counter()
+            data = client.capture()
+            size = len(data) if data else 0
+            print(f"Capture {i + 1}: {size} Bytes in {(time.perf_counter() - t0) * 1000:.0f} ms")
+        print(f"Gesamt (Keep-Alive): {time.perf_counter() - start:.2f}s")
+
+        print("\nStarte Stream-Modus für 5 Sekunden...")
+        client.start_stream()
+        time.sleep(5)
+        client.stop_stream()
+        print(f"Empfangene Stream-Bilder: {client.frames_received} "
+              f"(im Ringpuffer: {len(client.frames)})")
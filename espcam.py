@@ -1,18 +1,20 @@
-import requests
-import cv2
-import numpy as np
 import time
-from PIL import Image
-import io
 import re # Für die Bereinigung des OCR-Ergebnisses
 import sys # Für sys.exit()
 import os # Für Pfadoperationen (Tesseract)
+from jpeg_decode import jpeg_info # Header lesen (reines Python, dekodiert nichts)
+from ocr_backends import TESSERACT_ENGINES, get_ocr_backend # pytesseract oder tesserocr
+# Schwere Abhängigkeiten (requests, cv2, numpy, pytesseract, easyocr) werden erst
+# in den Funktionen importiert, die sie brauchen. So lädt SAVE_IMAGE_ONLY nur
+# requests, und ein Cron-Aufruf startet ohne OpenCV/NumPy (siehe startup_benchmark.py).
 
 # --- Grundlegende Konfiguration ---
 esp32_cam_ip = "192.168.178.178"  # IP-Adresse deiner ESP32-CAM
 capture_url = f"http://{esp32_cam_ip}/capture"
 connect_timeout = 10  # Sekunden für Verbindungsaufbau
 read_timeout = 15     # Sekunden für Datenempfang
+# MJPEG-Stream der ESP32-CAM (für esp32_capture.ESP32CamClient im Stream-Modus)
+stream_url = f"http://{esp32_cam_ip}:81/stream"
 
 # --- ROI DEFINITION (Region of Interest) ---
 # WICHTIG: Passe diese Werte EXAKT an deinen Zähler und dein Kamerabild an!
@@ -25,20 +27,53 @@ ROI_W = 35  # Breite des Bereichs
 ROI_H = 55   # Höhe des Bereichs
 roi_definition = (ROI_X, ROI_Y, ROI_W, ROI_H)
 
+# --- Automatische ROI-Kalibrierung ---
+# Statt ROI_X/ROI_Y/... von Hand auszumessen, wird das Ziffernfenster im Bild
+# gesucht und in Ziffernzellen geteilt (siehe roi_calibration.py). Das Ergebnis
+# wird pro Kamera gespeichert und nur neu bestimmt, wenn sich das Bild verschiebt.
+ROI_AUTO_CALIBRATE = False
+ROI_CALIBRATION_FILE = 'roi_calibration.json'
+ROI_CALIBRATION_DIGITS = 6 # Anzahl Ziffern im Zählwerk
+ROI_CALIBRATION_INDEX = 0  # Welche Ziffernzelle erkannt wird (0 = ganz links, wie ROI_X oben)
+
 # --- Bildspeicher-Option ---
 # Setze auf True, um nur das Originalbild von der Kamera zu holen, es als
 # 'received_original.jpg' zu speichern und das Skript zu beenden.
-# Nützlich, um die ROI-Werte oben korrekt einzustellen.
+# Nützlich, um die ROI-Werte oben korrekt einzustellen
+# (oder automatisch: python roi_calibration.py received_original.jpg).
 SAVE_IMAGE_ONLY = False
 
+# --- JPEG-Dekodierung ---
+# 'full': Ganzes Farbbild dekodieren (für die Anzeige mit ROI-Rahmen).
+# 'roi':  Nur den ROI-Bereich dekodieren, bei PREPROCESSING_USE_GRAYSCALE direkt
+#         in Graustufen (mit PyTurboJPEG als echter Teil-Dekodierung). Es wird
+#         dann kein Anzeigebild zurückgegeben. Im Dauerbetrieb automatisch 'roi'.
+JPEG_DECODE_MODE = 'full'
+
+# --- Debug-Ausgaben ---
+# Speichert das vorverarbeitete ROI als 'processed_roi.png' (im Hintergrund, siehe debug_sink.py).
+# 'off', 'sampled' (jedes DEBUG_SAMPLE_EVERY-te Bild) oder 'always'.
+# Im Dauerbetrieb (meter_daemon.py) standardmäßig 'off'.
+DEBUG_IMAGE_MODE = 'always'
+DEBUG_SAMPLE_EVERY = 10
+
 # --- OCR Engine Auswahl ---
-# Wähle die zu verwendende OCR-Engine: 'tesseract' oder 'easyocr'
+# Wähle die zu verwendende OCR-Engine: 'tesseract', 'tesserocr', 'easyocr' oder 'template'
 # 'tesseract': Kostenlos, lokal, oft gut nach Vorverarbeitung, Konfiguration wichtig.
+# 'tesserocr': Gleiche Tesseract-Engine, aber direkt im Prozess geladen (pip install tesserocr).
+#             Kein neuer Prozess und keine temporären Dateien pro Aufruf -> deutlich schneller.
 # 'easyocr': Oft einfacher zu verwenden, gute Ergebnisse, benötigt separate Installation
 #             (pip install easyocr torch torchvision torchaudio - oder mit tensorflow)
-OCR_ENGINE = 'tesseract' # Wähle 'tesseract' oder 'easyocr'
+# 'template': Vergleich mit gelernten Ziffern (siehe digit_templates.py), Mikrosekunden statt
+#             Tesseract-Aufruf. Nur für ein ROI mit genau einer Ziffer geeignet.
+OCR_ENGINE = 'tesseract' # Wähle 'tesseract', 'tesserocr', 'easyocr' oder 'template'
 
-# --- TESSERACT Konfiguration (Nur wenn OCR_ENGINE = 'tesseract') ---
+# --- Template Konfiguration (Nur wenn OCR_ENGINE = 'template') ---
+TEMPLATE_FILE = 'digit_templates.npz' # Erstellen mit: python digit_templates.py train <Ordner>
+TEMPLATE_MIN_CONFIDENCE = 60.0 # Darunter wird zusätzlich Tesseract verwendet
+TEMPLATE_FALLBACK_ENGINE = 'tesseract' # 'tesseract' oder 'tesserocr'
+
+# --- TESSERACT Konfiguration (Nur wenn OCR_ENGINE = 'tesseract' oder 'tesserocr') ---
 TESSERACT_LANG = 'eng' # Sprache für Tesseract ('eng' oft gut für Zahlen, 'deu' auch möglich)
 # Tesseract Page Segmentation Mode (PSM): Experimentiere hiermit!
 # 6: Assume a single uniform block of text. (Oft gut)
@@ -51,22 +86,31 @@ TESSERACT_PSM = '7'
 TESSERACT_WHITELIST = '0123456789'
 TESSERACT_CUSTOM_CONFIG = f'--oem 3 --psm {TESSERACT_PSM} -c tessedit_char_whitelist={TESSERACT_WHITELIST}'
 
-# Versuche, Tesseract automatisch zu finden. Unter Windows musst du ggf. den Pfad manuell setzen.
-try:
-    import pytesseract
-    # Beispiel für manuelle Pfadsetzung unter Windows (einkommentieren und anpassen):
-    # if os.name == 'nt': # Nur für Windows
-    #    pytesseract.pytesseract.tesseract_cmd = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
-    tesseract_path = pytesseract.pytesseract.tesseract_cmd
-    print(f"INFO: Tesseract gefunden unter: {tesseract_path}")
-except ImportError:
-    if OCR_ENGINE == 'tesseract':
+# Tesseract wird erst beim ersten Tesseract-Aufruf gesucht (pytesseract lädt PIL).
+class TesseractNotFoundError(Exception):
+    """Platzhalter, bis init_tesseract() die Klasse aus pytesseract einsetzt."""
+
+TESSERACT_CHECKED = False
+
+def init_tesseract():
+    """Prüft beim ersten Aufruf, ob pytesseract und Tesseract verfügbar sind."""
+    global TESSERACT_CHECKED, TesseractNotFoundError
+    if TESSERACT_CHECKED:
+        return
+    try:
+        import pytesseract
+    except ImportError:
         print("FEHLER: Pytesseract Modul nicht gefunden. Installiere es mit 'pip install pytesseract'.")
-        sys.exit(1)
-    else:
-        print("INFO: Pytesseract nicht gefunden, wird aber nicht benötigt (OCR_ENGINE != 'tesseract').")
-except Exception as e:
-    if OCR_ENGINE == 'tesseract':
+        raise
+    TESSERACT_CHECKED = True
+    TesseractNotFoundError = pytesseract.TesseractNotFoundError
+    try:
+        # Beispiel für manuelle Pfadsetzung unter Windows (einkommentieren und anpassen):
+        # if os.name == 'nt': # Nur für Windows
+        #    pytesseract.pytesseract.tesseract_cmd = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
+        tesseract_path = pytesseract.pytesseract.tesseract_cmd
+        print(f"INFO: Tesseract gefunden unter: {tesseract_path}")
+    except Exception as e:
         print(f"WARNUNG: Konnte Tesseract nicht automatisch finden: {e}")
         print("Stelle sicher, dass Tesseract im System PATH ist oder setze 'pytesseract.pytesseract.tesseract_cmd' manuell im Code.")
         # Beispiel: pytesseract.pytesseract.tesseract_cmd = r'PFAD_ZU_DEINER_TESSERACT.EXE'
@@ -74,25 +118,54 @@ except Exception as e:
 
 # --- EasyOCR Konfiguration (Nur wenn OCR_ENGINE = 'easyocr') ---
 EASYOCR_LANG = ['en'] # Sprachen für EasyOCR (z.B. ['en'], ['de'], ['en', 'de'])
-EASYOCR_READER = None # Wird später initialisiert, wenn benötigt
-
-if OCR_ENGINE == 'easyocr':
-    try:
-        import easyocr
+EASYOCR_READER = None # Wird beim ersten EasyOCR-Aufruf initialisiert
+# Das Laden des Modells dauert mehrere Sekunden. Läuft 'python easyocr_worker.py',
+# wird stattdessen dieser bereits geladene Worker verwendet (sonst lokaler Reader).
+EASYOCR_USE_WORKER = True
+EASYOCR_CLIENT = None
+
+def get_easyocr_reader():
+    """Initialisiert den EasyOCR Reader beim ersten Aufruf (einmal pro Prozess)."""
+    global EASYOCR_READER
+    if EASYOCR_READER is None:
+        try:
+            import easyocr
+        except ImportError:
+            print("FEHLER: EasyOCR Modul nicht gefunden.")
+            print("Installiere es mit 'pip install easyocr torch torchvision torchaudio' (für CPU/GPU)")
+            print("oder 'pip install easyocr tensorflow' (für CPU/Tensorflow).")
+            print("Setze OCR_ENGINE auf 'tesseract' oder installiere EasyOCR.")
+            raise
         print("INFO: Initialisiere EasyOCR Reader...")
-        # Initialisiere den Reader einmal beim Start
         # gpu=True verwenden, wenn eine unterstützte GPU und CUDA/PyTorch vorhanden sind
         EASYOCR_READER = easyocr.Reader(EASYOCR_LANG, gpu=False)
         print("INFO: EasyOCR Reader erfolgreich initialisiert.")
-    except ImportError:
-        print("FEHLER: EasyOCR Modul nicht gefunden.")
-        print("Installiere es mit 'pip install easyocr torch torchvision torchaudio' (für CPU/GPU)")
-        print("oder 'pip install easyocr tensorflow' (für CPU/Tensorflow).")
-        print("Setze OCR_ENGINE auf 'tesseract' oder installiere EasyOCR.")
-        sys.exit(1)
-    except Exception as e:
-        print(f"FEHLER bei der Initialisierung von EasyOCR: {e}")
-        sys.exit(1)
+    return EASYOCR_READER
+
+def get_easyocr_client():
+    """Verbindung zum EasyOCR-Worker oder None, wenn keiner läuft."""
+    global EASYOCR_CLIENT, EASYOCR_USE_WORKER
+    if EASYOCR_CLIENT is None and EASYOCR_USE_WORKER:
+        from multiprocessing import AuthenticationError
+        from easyocr_worker import EasyOCRClient
+        try:
+            EASYOCR_CLIENT = EasyOCRClient()
+            print("INFO: Verwende laufenden EasyOCR-Worker.")
+        except (OSError, ValueError, AuthenticationError) as e:
+            print(f"INFO: Kein EasyOCR-Worker erreichbar ({e}), lade das Modell lokal.")
+            EASYOCR_USE_WORKER = False # Nicht bei jedem Bild erneut versuchen
+    return EASYOCR_CLIENT
+
+def drop_easyocr_client(error):
+    """Verwirft die Verbindung zu einem abgestürzten Worker, weitere Bilder laufen lokal."""
+    global EASYOCR_CLIENT, EASYOCR_USE_WORKER
+    print(f"WARNUNG: Verbindung zum EasyOCR-Worker verloren ({error}), lade das Modell lokal.")
+    try:
+        EASYOCR_CLIENT.close()
+    except OSError:
+        pass
+    EASYOCR_CLIENT = None
+    EASYOCR_USE_WORKER = False
 
 
 # --- Bildvorverarbeitungs-Optionen ---
@@ -120,12 +193,96 @@ PREPROCESSING_MORPH_OPERATION = 'close'
 PREPROCESSING_MORPH_KERNEL_SIZE = (2, 2) # (Breite, Höhe) des Kernels
 
 
+# --- Debug-Bilder ---
+DEBUG_SINK = None # Wird beim ersten Bild aus DEBUG_IMAGE_MODE erstellt
+
+def get_debug_sink():
+    """Gibt den gemeinsamen Debug-Sink zurück (schreibt im Hintergrund-Thread)."""
+    global DEBUG_SINK
+    if DEBUG_SINK is None:
+        from debug_sink import DebugSink # Debug-Bilder im Hintergrund speichern
+        DEBUG_SINK = DebugSink(DEBUG_IMAGE_MODE, DEBUG_SAMPLE_EVERY)
+    return DEBUG_SINK
+
+
+# --- Vorverarbeitungs-Pipeline ---
+PREPROCESSING_PIPELINE = None # Wird beim ersten Bild aus der Konfiguration oben gebaut
+
+def build_preprocessing_pipeline():
+    """Baut die Vorverarbeitungs-Stufen aus den PREPROCESSING_* Werten."""
+    import cv2
+    from preprocessing_pipeline import (PreprocessingPipeline, ScaleStage, GrayscaleStage, BlurStage,
+                                        ThresholdStage, MorphologyStage) # Vorverarbeitung mit wiederverwendeten Puffern
+    stages = []
+    # 1. Skalieren (optional, kann Erkennung verbessern)
+    if PREPROCESSING_SCALE_FACTOR > 1.0:
+        stages.append(ScaleStage(PREPROCESSING_SCALE_FACTOR, cv2.INTER_CUBIC)) # INTER_CUBIC oder INTER_LINEAR testen
+    # 2. Graustufenkonvertierung
+    if PREPROCESSING_USE_GRAYSCALE:
+        stages.append(GrayscaleStage())
+    # 3. Rauschunterdrückung (optional) - oft besser auf Graustufenbild
+    if PREPROCESSING_USE_BLUR:
+        stages.append(BlurStage(PREPROCESSING_BLUR_METHOD, PREPROCESSING_BLUR_KERNEL_SIZE))
+    # 4. Thresholding (Schwarz/Weiß-Bild)
+    threshold_applied = PREPROCESSING_THRESHOLD_METHOD in ('adaptive', 'otsu', 'binary')
+    if threshold_applied:
+        if not PREPROCESSING_USE_GRAYSCALE:
+            stages.append(GrayscaleStage()) # Thresholding braucht Graustufen
+        stages.append(ThresholdStage(PREPROCESSING_THRESHOLD_METHOD, PREPROCESSING_INVERT_THRESHOLD,
+                                     PREPROCESSING_ADAPTIVE_BLOCK_SIZE, PREPROCESSING_ADAPTIVE_C,
+                                     PREPROCESSING_BINARY_THRESHOLD_VALUE))
+    else:
+        print("INFO: Kein Thresholding angewendet.")
+    # 5. Morphologische Operationen (optional) - nur auf binärem Bild sinnvoll
+    if PREPROCESSING_USE_MORPHOLOGY and threshold_applied:
+        stages.append(MorphologyStage(PREPROCESSING_MORPH_OPERATION, PREPROCESSING_MORPH_KERNEL_SIZE))
+    elif PREPROCESSING_USE_MORPHOLOGY:
+        print("WARNUNG: Morphologie übersprungen, da kein Thresholding angewendet wurde.")
+    return PreprocessingPipeline(stages)
+
+def get_preprocessing_pipeline():
+    """Gibt die gemeinsame Vorverarbeitungs-Pipeline zurück."""
+    global PREPROCESSING_PIPELINE
+    if PREPROCESSING_PIPELINE is None:
+        PREPROCESSING_PIPELINE = build_preprocessing_pipeline()
+        print(f"INFO: Vorverarbeitung: {PREPROCESSING_PIPELINE.describe()}")
+    return PREPROCESSING_PIPELINE
+
+
+# --- ROI-Kalibrierung ---
+ROI_CALIBRATOR = None # Wird beim ersten Bild erstellt, wenn ROI_AUTO_CALIBRATE aktiv ist
+
+def calibrated_roi_rect(img_bgr, fallback_rect):
+    """Gibt das automatisch kalibrierte ROI zurück, sonst das manuell definierte."""
+    import cv2
+    global ROI_CALIBRATOR
+    if ROI_CALIBRATOR is None:
+        from roi_calibration import ROICalibrator
+        ROI_CALIBRATOR = ROICalibrator(ROI_CALIBRATION_FILE, ROI_CALIBRATION_DIGITS)
+    cells = ROI_CALIBRATOR.rois(esp32_cam_ip, cv2.cvtColor(img_bgr, cv2.COLOR_BGR2GRAY))
+    if not cells:
+        print(f"WARNUNG: Kalibrierung fehlgeschlagen, verwende manuelles ROI {fallback_rect}")
+        return fallback_rect
+    return cells[ROI_CALIBRATION_INDEX]
+
+
 # --- Funktion zum Abrufen des Bildes ---
+HTTP_SESSION = None # Wird beim ersten Abruf erstellt und danach wiederverwendet
+
+def get_http_session():
+    """Gibt die gemeinsame HTTP-Session zurück (Keep-Alive über mehrere Abrufe)."""
+    global HTTP_SESSION
+    if HTTP_SESSION is None:
+        from esp32_capture import create_session # Wiederverwendete HTTP-Session (Keep-Alive)
+        HTTP_SESSION = create_session()
+    return HTTP_SESSION
+
 def get_image_from_esp32(url, conn_timeout, read_t):
     """Holt ein Einzelbild von der ESP32-CAM."""
+    import requests
     try:
         print(f"Versuche Bild von {url} abzurufen...")
-        response = requests.get(url, timeout=(conn_timeout, read_t), stream=True) # stream=True kann helfen
+        response = get_http_session().get(url, timeout=(conn_timeout, read_t), stream=True) # stream=True kann helfen
         response.raise_for_status()
         if 'image/jpeg' in response.headers.get('Content-Type', ''):
             print("JPEG Bild erfolgreich empfangen.")
@@ -161,149 +318,94 @@ def get_image_from_esp32(url, conn_timeout, read_t):
 # --- Funktion zur Zählerstanderkennung ---
 def recognize_meter_reading(image_bytes, roi_rect):
     """Erkennt den Zählerstand im definierten ROI eines Bildes."""
+    text, image_with_roi, _ = recognize_meter_reading_with_confidence(image_bytes, roi_rect)
+    return text, image_with_roi
+
+def recognize_meter_reading_with_confidence(image_bytes, roi_rect):
+    """Wie recognize_meter_reading, liefert zusätzlich die OCR-Konfidenz (0-100) zurück."""
     if image_bytes is None:
-        return None, None # Kein Bild, kein Ergebnis
+        return None, None, None # Kein Bild, kein Ergebnis
 
+    import cv2
+    from jpeg_decode import decode as decode_jpeg, decode_region # Teilbereich dekodieren
+    from preprocessing_pipeline import ThresholdStage
     full_image_for_display = None # Zum Anzeigen am Ende
 
     try:
-        # Bild mit OpenCV laden
-        np_arr = np.frombuffer(image_bytes, np.uint8)
-        img_bgr = cv2.imdecode(np_arr, cv2.IMREAD_COLOR)
-        if img_bgr is None:
-            print("Fehler: OpenCV konnte das Bild nicht dekodieren.")
-            # Versuche PIL als Fallback
-            try:
-                pil_img = Image.open(io.BytesIO(image_bytes))
-                img_bgr = cv2.cvtColor(np.array(pil_img), cv2.COLOR_RGB2BGR)
-                if img_bgr is None:
-                     raise ValueError("Konvertierung von PIL zu OpenCV fehlgeschlagen")
-                print("INFO: Bild erfolgreich mit PIL geladen und zu OpenCV konvertiert.")
-            except Exception as pil_err:
-                print(f"Fehler: Konnte Bild weder mit OpenCV noch mit PIL laden: {pil_err}")
-                return None, None
-
-        full_image_for_display = img_bgr.copy() # Kopie für die Anzeige mit ROI-Box
-        print(f"Bildauflösung: {img_bgr.shape[1]}x{img_bgr.shape[0]}")
+        # --- Dekodierung (genau einmal pro Bild) ---
+        # Die Bildgröße steht im JPEG-Header, dafür muss nichts dekodiert werden
+        jpeg_header = jpeg_info(image_bytes)
+        decode_roi_only = JPEG_DECODE_MODE == 'roi' and not ROI_AUTO_CALIBRATE and jpeg_header is not None
+        if decode_roi_only:
+            img_width, img_height = jpeg_header["width"], jpeg_header["height"]
+            print(f"Bildauflösung: {img_width}x{img_height} (nur ROI wird dekodiert)")
+        else:
+            img_bgr = decode_jpeg(image_bytes) # OpenCV, bei Bedarf PIL als Fallback
+            if img_bgr is None:
+                return None, None, None
+            full_image_for_display = img_bgr.copy() # Kopie für die Anzeige mit ROI-Box
+            img_height, img_width = img_bgr.shape[:2]
+            print(f"Bildauflösung: {img_width}x{img_height}")
 
         # --- ROI Extraktion ---
+        if ROI_AUTO_CALIBRATE:
+            roi_rect = calibrated_roi_rect(img_bgr, roi_rect)
         x, y, w, h = roi_rect
-        img_height, img_width = img_bgr.shape[:2]
 
         # Überprüfe ROI Grenzen
         if x < 0 or y < 0 or w <= 0 or h <= 0 or x + w > img_width or y + h > img_height:
             print(f"FEHLER: ROI {roi_rect} ist ungültig oder liegt außerhalb der Bildgrenzen ({img_width}x{img_height})!")
             # Zeichne das ganze Bild als Fallback, damit man was sieht
-            cv2.putText(full_image_for_display, "FEHLER: Ungueltiges ROI", (10, 30),
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
-            return None, full_image_for_display # Gib das Originalbild zurück
-
-        roi = img_bgr[y:y+h, x:x+w]
+            if full_image_for_display is not None:
+                cv2.putText(full_image_for_display, "FEHLER: Ungueltiges ROI", (10, 30),
+                            cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
+            return None, full_image_for_display, None # Gib das Originalbild zurück
+
+        if decode_roi_only:
+            # Graustufen direkt aus dem Helligkeitskanal, ohne Farbumwandlung
+            roi = decode_region(image_bytes, roi_rect, grayscale=PREPROCESSING_USE_GRAYSCALE, info=jpeg_header)
+            if roi is None:
+                return None, None, None
+        else:
+            roi = img_bgr[y:y+h, x:x+w]
         print(f"ROI extrahiert: Position ({x},{y}), Größe ({w}x{h})")
 
         # --- Vorverarbeitung des ROI für OCR ---
-        processed_roi = roi.copy() # Arbeite auf einer Kopie des ROI
-
-        # 1. Skalieren (optional, kann Erkennung verbessern)
-        if PREPROCESSING_SCALE_FACTOR > 1.0:
-            print(f"INFO: Skaliere ROI um Faktor {PREPROCESSING_SCALE_FACTOR}")
-            new_w = int(w * PREPROCESSING_SCALE_FACTOR)
-            new_h = int(h * PREPROCESSING_SCALE_FACTOR)
-            processed_roi = cv2.resize(processed_roi, (new_w, new_h), interpolation=cv2.INTER_CUBIC) # INTER_CUBIC oder INTER_LINEAR testen
-
-        # 2. Graustufenkonvertierung
-        if PREPROCESSING_USE_GRAYSCALE:
-            print("INFO: Konvertiere ROI zu Graustufen")
-            processed_roi = cv2.cvtColor(processed_roi, cv2.COLOR_BGR2GRAY)
-        else:
-             # Falls keine Graustufen, braucht Tesseract BGR
-             if OCR_ENGINE == 'tesseract' and len(processed_roi.shape) == 2:
-                 processed_roi = cv2.cvtColor(processed_roi, cv2.COLOR_GRAY2BGR)
-
-
-        # 3. Rauschunterdrückung (optional) - oft besser auf Graustufenbild
-        if PREPROCESSING_USE_BLUR:
-            if PREPROCESSING_BLUR_KERNEL_SIZE % 2 == 0 or PREPROCESSING_BLUR_KERNEL_SIZE < 1 :
-                 print("WARNUNG: Blur Kernel Size muss ungerade und >= 1 sein. Setze auf 3.")
-                 ksize = 3
-            else:
-                 ksize = PREPROCESSING_BLUR_KERNEL_SIZE
-
-            if PREPROCESSING_BLUR_METHOD == 'median':
-                print(f"INFO: Wende Median Blur an (Kernel: {ksize}x{ksize})")
-                processed_roi = cv2.medianBlur(processed_roi, ksize)
-            elif PREPROCESSING_BLUR_METHOD == 'gaussian':
-                print(f"INFO: Wende Gaussian Blur an (Kernel: {ksize}x{ksize})")
-                processed_roi = cv2.GaussianBlur(processed_roi, (ksize, ksize), 0)
-
-        # 4. Thresholding (Schwarz/Weiß-Bild)
-        threshold_applied = False
-        if PREPROCESSING_THRESHOLD_METHOD == 'adaptive':
-            print(f"INFO: Wende adaptives Thresholding an (Block: {PREPROCESSING_ADAPTIVE_BLOCK_SIZE}, C: {PREPROCESSING_ADAPTIVE_C}, Invertiert: {PREPROCESSING_INVERT_THRESHOLD})")
-            thresh_type = cv2.THRESH_BINARY_INV if PREPROCESSING_INVERT_THRESHOLD else cv2.THRESH_BINARY
-            if len(processed_roi.shape) == 3: # Falls noch BGR, erst Graustufen
-                 gray_for_thresh = cv2.cvtColor(processed_roi, cv2.COLOR_BGR2GRAY)
-            else:
-                 gray_for_thresh = processed_roi
-            processed_roi = cv2.adaptiveThreshold(gray_for_thresh, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
-                                                  thresh_type, PREPROCESSING_ADAPTIVE_BLOCK_SIZE, PREPROCESSING_ADAPTIVE_C)
-            threshold_applied = True
-        elif PREPROCESSING_THRESHOLD_METHOD == 'otsu':
-            print(f"INFO: Wende Otsu Thresholding an (Invertiert: {PREPROCESSING_INVERT_THRESHOLD})")
-            thresh_type = cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU if PREPROCESSING_INVERT_THRESHOLD else cv2.THRESH_BINARY + cv2.THRESH_OTSU
-            if len(processed_roi.shape) == 3: # Falls noch BGR, erst Graustufen
-                 gray_for_thresh = cv2.cvtColor(processed_roi, cv2.COLOR_BGR2GRAY)
-            else:
-                 gray_for_thresh = processed_roi
-            ret, processed_roi = cv2.threshold(gray_for_thresh, PREPROCESSING_OTSU_THRESHOLD_VALUE, 255, thresh_type)
-            print(f"INFO: Otsu Schwellwert gefunden: {ret}")
-            threshold_applied = True
-        elif PREPROCESSING_THRESHOLD_METHOD == 'binary':
-             print(f"INFO: Wende binäres Thresholding an (Wert: {PREPROCESSING_BINARY_THRESHOLD_VALUE}, Invertiert: {PREPROCESSING_INVERT_THRESHOLD})")
-             thresh_type = cv2.THRESH_BINARY_INV if PREPROCESSING_INVERT_THRESHOLD else cv2.THRESH_BINARY
-             if len(processed_roi.shape) == 3: # Falls noch BGR, erst Graustufen
-                 gray_for_thresh = cv2.cvtColor(processed_roi, cv2.COLOR_BGR2GRAY)
-             else:
-                 gray_for_thresh = processed_roi
-             ret, processed_roi = cv2.threshold(gray_for_thresh, PREPROCESSING_BINARY_THRESHOLD_VALUE, 255, thresh_type)
-             threshold_applied = True
-        else:
-            print("INFO: Kein Thresholding angewendet.")
-
+        # Die Pipeline wird einmal aus den PREPROCESSING_* Werten gebaut und
+        # verwendet ihre Puffer für jedes weitere Bild wieder.
+        pipeline = get_preprocessing_pipeline()
+        processed_roi = pipeline.run([roi])[0]
+        threshold_stage = next((stage for stage in pipeline.stages if isinstance(stage, ThresholdStage)), None)
+        if threshold_stage is not None and threshold_stage.method == 'otsu':
+            print(f"INFO: Otsu Schwellwert gefunden: {threshold_stage.last_otsu_values[0]}")
+        print(f"INFO: Vorverarbeitung {pipeline.timing_summary()}")
 
-        # 5. Morphologische Operationen (optional) - nur auf binärem Bild sinnvoll
-        if PREPROCESSING_USE_MORPHOLOGY and threshold_applied:
-            k_w, k_h = PREPROCESSING_MORPH_KERNEL_SIZE
-            if k_w <=0 or k_h <=0:
-                 print("WARNUNG: Morph Kernel Size ungültig. Setze auf (2,2).")
-                 kernel = np.ones((2,2), np.uint8)
-            else:
-                 kernel = np.ones(PREPROCESSING_MORPH_KERNEL_SIZE, np.uint8)
-
-            if PREPROCESSING_MORPH_OPERATION == 'open':
-                print(f"INFO: Wende Morphological Opening an (Kernel: {PREPROCESSING_MORPH_KERNEL_SIZE})")
-                processed_roi = cv2.morphologyEx(processed_roi, cv2.MORPH_OPEN, kernel)
-            elif PREPROCESSING_MORPH_OPERATION == 'close':
-                print(f"INFO: Wende Morphological Closing an (Kernel: {PREPROCESSING_MORPH_KERNEL_SIZE})")
-                processed_roi = cv2.morphologyEx(processed_roi, cv2.MORPH_CLOSE, kernel)
-        elif PREPROCESSING_USE_MORPHOLOGY and not threshold_applied:
-             print("WARNUNG: Morphologie übersprungen, da kein Thresholding angewendet wurde.")
 
-
-        # Speichere das endgültig bearbeitete ROI für Debugging
-        try:
-            cv2.imwrite("processed_roi.png", processed_roi)
-            print("INFO: Bearbeitetes ROI gespeichert als processed_roi.png")
-        except Exception as save_err:
-            print(f"WARNUNG: Konnte processed_roi.png nicht speichern: {save_err}")
+        # Speichere das endgültig bearbeitete ROI für Debugging (blockiert nicht)
+        debug_sink = get_debug_sink()
+        if debug_sink.begin_frame() and debug_sink.write("processed_roi.png", processed_roi):
+            print("INFO: Bearbeitetes ROI wird als processed_roi.png gespeichert")
 
         # --- OCR Durchführung ---
         print(f"\n--- Starte OCR mit {OCR_ENGINE} ---")
         ocr_text_raw = ""
         cleaned_text = ""
+        ocr_confidence = None
 
         try:
-            if OCR_ENGINE == 'tesseract':
+            template_ok = False
+            if OCR_ENGINE == 'template':
+                # Template-Vergleich auf dem unbearbeiteten ROI (die Templates normalisieren selbst)
+                from digit_templates import get_classifier
+                ocr_text_raw, ocr_confidence = get_classifier(TEMPLATE_FILE).classify([roi])[0]
+                template_ok = ocr_confidence >= TEMPLATE_MIN_CONFIDENCE
+                if not template_ok:
+                    print(f"INFO: Template-Konfidenz {ocr_confidence:.1f}% zu niedrig, verwende {TEMPLATE_FALLBACK_ENGINE}.")
+
+            if OCR_ENGINE in TESSERACT_ENGINES or (OCR_ENGINE == 'template' and not template_ok):
+                tesseract_engine = OCR_ENGINE if OCR_ENGINE in TESSERACT_ENGINES else TEMPLATE_FALLBACK_ENGINE
+                if tesseract_engine == 'tesseract':
+                    init_tesseract()
                 # Tesseract erwartet oft ein BGR Bild, auch wenn es intern Graustufen verwendet
                 # Wenn unser processed_roi nur 1 Kanal hat (Grau/Binär), konvertiere es
                 if len(processed_roi.shape) == 2:
@@ -311,17 +413,17 @@ def recognize_meter_reading(image_bytes, roi_rect):
                 else:
                     ocr_input_image = processed_roi
 
-                ocr_text_raw = pytesseract.image_to_string(
+                # Liefert neben dem Text auch die Konfidenz (pytesseract: image_to_data)
+                ocr_text_raw, ocr_confidence = get_ocr_backend(tesseract_engine).recognize(
                     ocr_input_image,
-                    lang=TESSERACT_LANG,
-                    config=TESSERACT_CUSTOM_CONFIG
+                    config=TESSERACT_CUSTOM_CONFIG,
+                    lang=TESSERACT_LANG
                 )
 
-            elif OCR_ENGINE == 'easyocr':
-                if EASYOCR_READER is None:
-                    print("FEHLER: EasyOCR Reader ist nicht initialisiert.")
-                    return None, full_image_for_display
+            elif OCR_ENGINE == 'template':
+                pass # Bereits oben sicher erkannt
 
+            elif OCR_ENGINE == 'easyocr':
                 # EasyOCR erwartet ein BGR Bild (numpy array) oder einen Dateipfad
                 # Es kann auch mit Graustufenbildern umgehen
                 if len(processed_roi.shape) == 2:
@@ -329,15 +431,32 @@ def recognize_meter_reading(image_bytes, roi_rect):
                 else:
                     ocr_input_image = processed_roi
 
-                # Führe Erkennung durch
-                # allowlist: Nur Ziffern erlauben
-                results = EASYOCR_READER.readtext(ocr_input_image, allowlist='0123456789', detail=0, paragraph=False)
-                # detail=0 gibt nur den Text zurück, paragraph=False verhindert das Zusammenfassen von Zeilen
-                ocr_text_raw = " ".join(results) # Füge erkannte Teile zusammen
+                worker_result = None
+                easyocr_client = get_easyocr_client()
+                if easyocr_client is not None:
+                    # Modell ist im Worker bereits geladen, ROIs mehrerer Anfragen werden dort gebündelt
+                    try:
+                        worker_result = easyocr_client.readtext([ocr_input_image])[0]
+                    except (OSError, EOFError) as e:
+                        drop_easyocr_client(e)
+                if worker_result is not None:
+                    ocr_text_raw, ocr_confidence = worker_result
+                else:
+                    try:
+                        reader = get_easyocr_reader()
+                    except ImportError:
+                        return None, full_image_for_display, None
+                    # Führe Erkennung durch
+                    # allowlist: Nur Ziffern erlauben
+                    results = reader.readtext(ocr_input_image, allowlist='0123456789', detail=1, paragraph=False)
+                    # detail=1 liefert (Box, Text, Konfidenz), paragraph=False verhindert das Zusammenfassen von Zeilen
+                    ocr_text_raw = " ".join(text for _, text, _ in results) # Füge erkannte Teile zusammen
+                    # EasyOCR liefert Konfidenzen von 0-1, auf 0-100 wie bei Tesseract skalieren
+                    ocr_confidence = (sum(conf for _, _, conf in results) / len(results) * 100) if results else 0.0
 
             else:
                 print(f"FEHLER: Unbekannte OCR_ENGINE '{OCR_ENGINE}'")
-                return None, full_image_for_display
+                return None, full_image_for_display, None
 
             # Bereinige das Ergebnis für beide Engines
             # Entferne alles, was keine Ziffer ist (inkl. Leerzeichen, Sonderzeichen)
@@ -345,29 +464,32 @@ def recognize_meter_reading(image_bytes, roi_rect):
 
             print(f"OCR Roh-Ergebnis: '{ocr_text_raw.strip()}'")
             print(f"OCR Bereinigtes Ergebnis (nur Ziffern): '{cleaned_text}'")
+            print(f"OCR Konfidenz: {ocr_confidence:.1f}%")
 
-        except pytesseract.TesseractNotFoundError:
+        except TesseractNotFoundError:
             print("FEHLER: Tesseract wurde nicht gefunden oder der Pfad ist falsch konfiguriert.")
             print("Bitte stelle sicher, dass Tesseract installiert ist und der Pfad in")
             print("pytesseract.pytesseract.tesseract_cmd korrekt gesetzt ist (besonders unter Windows).")
-            return None, full_image_for_display # Gib Originalbild zurück
+            return None, full_image_for_display, None # Gib Originalbild zurück
         except Exception as ocr_err:
             print(f"Fehler während der OCR mit {OCR_ENGINE}: {ocr_err}")
             # Versuche trotzdem, das Bild zurückzugeben
             # Zeichne ROI Rechteck in das Originalbild zur Visualisierung
-            cv2.rectangle(full_image_for_display, (x, y), (x + w, y + h), (0, 0, 255), 2) # Rotes Rechteck bei Fehler
-            cv2.putText(full_image_for_display, "OCR Error", (x, y - 10),
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 0, 255), 2)
-            return None, full_image_for_display
+            if full_image_for_display is not None:
+                cv2.rectangle(full_image_for_display, (x, y), (x + w, y + h), (0, 0, 255), 2) # Rotes Rechteck bei Fehler
+                cv2.putText(full_image_for_display, "OCR Error", (x, y - 10),
+                            cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 0, 255), 2)
+            return None, full_image_for_display, None
 
 
         # Zeichne das ROI Rechteck (grün bei Erfolg) in das Originalbild
-        cv2.rectangle(full_image_for_display, (x, y), (x + w, y + h), (0, 255, 0), 2)
-        # Füge erkannten Text hinzu (optional)
-        cv2.putText(full_image_for_display, f"Erkannt: {cleaned_text}", (x, y - 10),
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 2)
+        if full_image_for_display is not None:
+            cv2.rectangle(full_image_for_display, (x, y), (x + w, y + h), (0, 255, 0), 2)
+            # Füge erkannten Text hinzu (optional)
+            cv2.putText(full_image_for_display, f"Erkannt: {cleaned_text}", (x, y - 10),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 2)
 
-        return cleaned_text, full_image_for_display # Gib den erkannten Text und das Bild mit ROI zurück
+        return cleaned_text, full_image_for_display, ocr_confidence # Gib den erkannten Text und das Bild mit ROI zurück
 
     except cv2.error as cv_err:
          print(f"OpenCV Fehler bei der Bildverarbeitung: {cv_err}")
@@ -376,9 +498,9 @@ def recognize_meter_reading(image_bytes, roi_rect):
              # Zeichne Fehlermeldung ins Bild
              cv2.putText(full_image_for_display, "OpenCV Error", (10, 30),
                         cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
-             return None, full_image_for_display
+             return None, full_image_for_display, None
          else:
-             return None, None # Kein Bild vorhanden
+             return None, None, None # Kein Bild vorhanden
     except Exception as e:
         print(f"Allgemeiner Fehler bei der Bildverarbeitung: {e}")
         import traceback
@@ -387,9 +509,9 @@ def recognize_meter_reading(image_bytes, roi_rect):
         if full_image_for_display is not None:
              cv2.putText(full_image_for_display, "Processing Error", (10, 30),
                         cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
-             return None, full_image_for_display
+             return None, full_image_for_display, None
         else:
-            return None, None
+            return None, None, None
 
 
 # --- Hauptteil des Skripts ---
@@ -397,7 +519,7 @@ if __name__ == "__main__":
     print("--- Starte Zählerstand-Erkennung ---")
     print(f"Verbinde mit ESP32-CAM: {esp32_cam_ip}")
     print(f"Verwendete OCR Engine: {OCR_ENGINE}")
-    if OCR_ENGINE == 'tesseract':
+    if OCR_ENGINE in TESSERACT_ENGINES:
         print(f"Tesseract Config: Lang='{TESSERACT_LANG}', PSM='{TESSERACT_PSM}', Whitelist='{TESSERACT_WHITELIST}'")
     if OCR_ENGINE == 'easyocr':
         print(f"EasyOCR Config: Lang='{EASYOCR_LANG}'")
@@ -413,10 +535,10 @@ if __name__ == "__main__":
                 f.write(image_data)
             print("Originalbild gespeichert als received_original.jpg")
 
-            # Lade das Bild direkt nach dem Speichern, um Auflösung zu prüfen (optional)
-            temp_img = cv2.imdecode(np.frombuffer(image_data, np.uint8), cv2.IMREAD_COLOR)
-            if temp_img is not None:
-                h, w = temp_img.shape[:2]
+            # Auflösung aus dem JPEG-Header prüfen (ohne das Bild ein zweites Mal zu dekodieren)
+            jpeg_header = jpeg_info(image_data)
+            if jpeg_header is not None:
+                h, w = jpeg_header["height"], jpeg_header["width"]
                 print(f"Bildauflösung: {w}x{h} Pixel")
                 # Prüfe ob ROI Sinn macht
                 if ROI_X + ROI_W > w or ROI_Y + ROI_H > h:
@@ -460,6 +582,7 @@ if __name__ == "__main__":
         # Zeige das Bild mit dem markierten ROI an (falls vorhanden)
         if processed_image_with_roi is not None:
             print("\nZeige Bild mit markiertem ROI an...")
+            import cv2
             # Skaliere das Bild ggf. herunter, wenn es zu groß für den Bildschirm ist
             max_display_width = 1200
             h, w = processed_image_with_roi.shape[:2]
@@ -472,6 +595,8 @@ if __name__ == "__main__":
             cv2.imshow("Ergebnis mit ROI (Taste zum Schliessen druecken)", display_img)
             print("Drücke eine beliebige Taste im Bildfenster, um es zu schließen.")
             cv2.waitKey(0) # Warte unendlich auf Tastendruck
+            print("\nSchließe OpenCV Fenster...")
+            cv2.destroyAllWindows()
         else:
             print("Kein verarbeitetes Bild zum Anzeigen vorhanden.")
 
@@ -479,7 +604,4 @@ if __name__ == "__main__":
         print("\nFEHLER: Konnte kein Bild von der ESP32-CAM empfangen.")
         print("Überprüfe die IP-Adresse, Netzwerkverbindung und ob die ESP32-CAM läuft.")
 
-    # Aufräumen
-    print("\nSchließe OpenCV Fenster...")
-    cv2.destroyAllWindows()
     print("Skript beendet.")
\ No newline at end of file
@@ -0,0 +1,130 @@
+import cv2
+import numpy as np
+
+# --- Konfiguration ---
+# Vor der OCR wird geprüft, ob sich das Ziffernfenster seit dem letzten
+# verarbeiteten Bild überhaupt verändert hat. Nur dann lohnt sich die Erkennung.
+FRAME_GATE_METHOD = 'mad'          # 'mad' (mittlere absolute Differenz) oder 'ssim'
+FRAME_GATE_MAD_THRESHOLD = 4.0     # Graustufen (0-255); darunter gilt das Bild als unverändert
+FRAME_GATE_SSIM_THRESHOLD = 0.97   # SSIM (0-1); darüber gilt das Bild als unverändert
+FRAME_GATE_REDUCTION = 2           # JPEG direkt verkleinert dekodieren: 1, 2, 4 oder 8
+FRAME_GATE_NORMALIZE_BRIGHTNESS = True  # Helligkeitsschwankungen (Belichtung der Kamera) ignorieren
+FRAME_GATE_MAX_SKIPPED = 60        # Spätestens nach so vielen übersprungenen Bildern wieder erkennen
+
+_REDUCED_GRAYSCALE = {
+    1: cv2.IMREAD_GRAYSCALE,
+    2: cv2.IMREAD_REDUCED_GRAYSCALE_2,
+    4: cv2.IMREAD_REDUCED_GRAYSCALE_4,
+    8: cv2.IMREAD_REDUCED_GRAYSCALE_8,
+}
+
+
+def roi_union(rois):
+    """Umschließendes Rechteck (x, y, w, h) aller ROIs."""
+    left = min(x for x, _, _, _ in rois)
+    top = min(y for _, y, _, _ in rois)
+    right = max(x + w for x, _, w, _ in rois)
+    bottom = max(y + h for _, y, _, h in rois)
+    return left, top, right - left, bottom - top
+
+
+def ssim(a, b):
+    """Mittlere SSIM zweier Graustufenbilder (Gauß-Fenster 7x7, float32)."""
+    c1, c2 = (0.01 * 255) ** 2, (0.03 * 255) ** 2
+
+    def blur(img):
+        return cv2.GaussianBlur(img, (7, 7), 1.5)
+
+    mu_a, mu_b = blur(a), blur(b)
+    var_a = blur(a * a) - mu_a * mu_a
+    var_b = blur(b * b) - mu_b * mu_b
+    cov = blur(a * b) - mu_a * mu_b
+    ssim_map = ((2 * mu_a * mu_b + c1) * (2 * cov + c2)) / ((mu_a ** 2 + mu_b ** 2 + c1) * (var_a + var_b + c2))
+    return float(ssim_map.mean())
+
+
+class FrameChangeGate:
+    """Entscheidet, ob ein Bild sich genug vom zuletzt erkannten unterscheidet.
+
+    Verglichen wird nur das verkleinerte Graustufenbild der ROI-Vereinigung.
+    Das JPEG wird dafür mit IMREAD_REDUCED_GRAYSCALE_* dekodiert, was deutlich
+    billiger ist als die volle Dekodierung für die OCR.
+
+    Ablauf: sample = gate.sample(jpeg); if gate.changed(sample): OCR starten, gate.update(sample)
+
+    Bilder, die den Vergleich bestehen, dekodiert der OCR-Prozess danach noch einmal
+    selbst (nur das ROI, siehe espcam.JPEG_DECODE_MODE = 'roi'). Das ist gewollt: das
+    Vergleichsbild ist verkleinert und helligkeitsnormiert, für die OCR also nicht
+    brauchbar, und ein volles Bild an den Prozess zu übergeben kostet mehr als die
+    zweite Dekodierung. Die meisten Bilder werden übersprungen und nur einmal dekodiert.
+    """
+
+    def __init__(self, rois, method=FRAME_GATE_METHOD, mad_threshold=FRAME_GATE_MAD_THRESHOLD,
+                 ssim_threshold=FRAME_GATE_SSIM_THRESHOLD, reduction=FRAME_GATE_REDUCTION,
+                 max_skipped=FRAME_GATE_MAX_SKIPPED):
+        if method not in ('mad', 'ssim'):
+            raise ValueError(f"Unbekannte Methode '{method}' (erlaubt: 'mad', 'ssim')")
+        if reduction not in _REDUCED_GRAYSCALE:
+            raise ValueError(f"reduction muss 1, 2, 4 oder 8 sein, nicht {reduction}")
+        self.method = method
+        self.mad_threshold = mad_threshold
+        self.ssim_threshold = ssim_threshold
+        self.reduction = reduction
+        self.max_skipped = max_skipped
+        x, y, w, h = roi_union(rois)
+        r = reduction
+        self.crop = (x // r, y // r, max(1, -(-w // r)), max(1, -(-h // r)))
+        self.reference = None
+        self.last_score = None
+        self.frames = 0
+        self.skipped = 0
+        self.skipped_in_row = 0
+
+    def sample(self, image_bytes):
+        """Dekodiert verkleinert und schneidet die ROI-Vereinigung aus. None bei Fehler."""
+        gray = cv2.imdecode(np.frombuffer(image_bytes, np.uint8), _REDUCED_GRAYSCALE[self.reduction])
+        if gray is None:
+            return None
+        x, y, w, h = self.crop
+        window = gray[y:y + h, x:x + w]
+        if window.shape != (h, w):
+            return None # ROI außerhalb des Bildes -> kein Vergleich möglich
+        window = window.astype(np.float32)
+        if FRAME_GATE_NORMALIZE_BRIGHTNESS:
+            window -= window.mean()
+        return window
+
+    def score(self, sample):
+        if self.method == 'mad':
+            return float(np.abs(sample - self.reference).mean())
+        return ssim(sample, self.reference)
+
+    def changed(self, sample):
+        """True, wenn das Bild erkannt werden soll. Zählt übersprungene Bilder."""
+        self.frames += 1
+        if sample is None or self.reference is None or sample.shape != self.reference.shape:
+            self.last_score = None
+            return True
+        self.last_score = self.score(sample)
+        if self.method == 'mad':
+            unchanged = self.last_score < self.mad_threshold
+        else:
+            unchanged = self.last_score > self.ssim_threshold
+        if unchanged and (not self.max_skipped or self.skipped_in_row < self.max_skipped):
+            self.skipped += 1
+            self.skipped_in_row += 1
+            return False
+        return True
+
+    def update(self, sample):
+        """Merkt sich ein Bild als zuletzt erkanntes (erst nach Übergabe an die OCR aufrufen)."""
+        if sample is not None:
+            self.reference = sample
+        self.skipped_in_row = 0
+
+    @property
+    def skipped_fraction(self):
+        return self.skipped / self.frames if self.frames else 0.0
+
+    def summary(self):
+        return f"{self.skipped}/{self.frames} Bilder unverändert übersprungen ({self.skipped_fraction * 100:.1f}%)"
@@ -0,0 +1,120 @@
+import io
+import struct
+
+# cv2 und numpy werden erst beim Dekodieren importiert: jpeg_info() braucht
+# nur die Standardbibliothek und bleibt damit auch in schlanken Skripten schnell.
+
+# Optional: PyTurboJPEG (pip install PyTurboJPEG) kann ein JPEG verlustfrei auf
+# einen Ausschnitt zuschneiden, bevor dekodiert wird. Ohne das Paket wird das
+# ganze Bild dekodiert (bei Graustufen nur der Helligkeitskanal).
+TURBOJPEG = None # Wird beim ersten decode_region() geladen
+_TURBOJPEG_CHECKED = False
+
+
+def get_turbojpeg():
+    """Gibt die TurboJPEG-Instanz zurück oder None, wenn PyTurboJPEG/libturbojpeg fehlt."""
+    global TURBOJPEG, _TURBOJPEG_CHECKED
+    if not _TURBOJPEG_CHECKED:
+        _TURBOJPEG_CHECKED = True
+        try:
+            from turbojpeg import TurboJPEG
+            TURBOJPEG = TurboJPEG()
+        except (ImportError, OSError, RuntimeError): # Paket oder libturbojpeg nicht gefunden
+            TURBOJPEG = None
+    return TURBOJPEG
+
+
+def _imread_flag(reduction, grayscale):
+    import cv2
+    if reduction == 1:
+        return cv2.IMREAD_GRAYSCALE if grayscale else cv2.IMREAD_COLOR
+    return getattr(cv2, f"IMREAD_REDUCED_{'GRAYSCALE' if grayscale else 'COLOR'}_{reduction}")
+
+
+# --- Header lesen ohne Dekodierung ---
+def jpeg_info(data):
+    """Liest Breite, Höhe und MCU-Größe aus dem JPEG-Header (SOF-Segment).
+
+    Gibt {"width", "height", "components", "mcu_w", "mcu_h"} zurück oder None,
+    wenn es kein gültiges JPEG ist.
+    """
+    if len(data) < 4 or data[0] != 0xFF or data[1] != 0xD8:
+        return None
+    pos = 2
+    while pos + 4 <= len(data):
+        if data[pos] != 0xFF:
+            return None
+        marker = data[pos + 1]
+        if marker == 0xFF: # Füllbyte
+            pos += 1
+            continue
+        if marker in (0x01, 0xD8) or 0xD0 <= marker <= 0xD7: # Marker ohne Länge
+            pos += 2
+            continue
+        (length,) = struct.unpack(">H", data[pos + 2:pos + 4])
+        if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC): # SOF0..SOF15
+            segment = data[pos + 4:pos + 2 + length]
+            if len(segment) < 6:
+                return None
+            height, width = struct.unpack(">HH", segment[1:5])
+            components = segment[5]
+            # Größte Abtastfaktoren bestimmen die MCU-Größe (z.B. 16x16 bei 4:2:0)
+            factors = [segment[7 + 3 * i] for i in range(components) if 8 + 3 * i <= len(segment)]
+            max_h = max((f >> 4 for f in factors), default=1)
+            max_v = max((f & 0x0F for f in factors), default=1)
+            return {"width": width, "height": height, "components": components,
+                    "mcu_w": 8 * max_h, "mcu_h": 8 * max_v}
+        if marker == 0xDA: # Bilddaten beginnen, kein SOF gefunden
+            return None
+        pos += 2 + length
+    return None
+
+
+# --- Dekodierung ---
+def decode(data, grayscale=False, reduction=1):
+    """Dekodiert ein JPEG, optional direkt in Graustufen und verkleinert (1, 2, 4, 8).
+
+    Fällt auf PIL zurück, wenn OpenCV das Bild nicht lesen kann. Gibt None bei Fehler zurück.
+    """
+    import cv2
+    import numpy as np
+    image = cv2.imdecode(np.frombuffer(data, np.uint8), _imread_flag(reduction, grayscale))
+    if image is not None:
+        return image
+    try:
+        from PIL import Image
+        pil_img = Image.open(io.BytesIO(data))
+        if reduction > 1:
+            pil_img.draft('L' if grayscale else 'RGB', (pil_img.width // reduction, pil_img.height // reduction))
+        if grayscale:
+            return np.array(pil_img.convert('L'))
+        return cv2.cvtColor(np.array(pil_img.convert('RGB')), cv2.COLOR_RGB2BGR)
+    except Exception as e:
+        print(f"Fehler: Konnte Bild weder mit OpenCV noch mit PIL laden: {e}")
+        return None
+
+
+def decode_region(data, rect, grayscale=False, info=None):
+    """Dekodiert nur den Bereich rect = (x, y, w, h) und gibt ihn zurück (None bei Fehler).
+
+    Mit PyTurboJPEG wird das JPEG vorher verlustfrei auf die (an MCU-Grenzen
+    ausgerichtete) Region zugeschnitten, sonst wird das ganze Bild dekodiert
+    und ausgeschnitten.
+    """
+    x, y, w, h = rect
+    info = info or jpeg_info(data)
+    turbojpeg = get_turbojpeg()
+    if turbojpeg is not None and info is not None:
+        # Zuschnitt muss an MCU-Grenzen beginnen
+        crop_x = x - x % info["mcu_w"]
+        crop_y = y - y % info["mcu_h"]
+        crop_w = min(info["width"] - crop_x, x + w - crop_x)
+        crop_h = min(info["height"] - crop_y, y + h - crop_y)
+        try:
+            image = decode(turbojpeg.crop(data, crop_x, crop_y, crop_w, crop_h), grayscale)
+            if image is not None:
+                return image[y - crop_y:y - crop_y + h, x - crop_x:x - crop_x + w]
+        except Exception as e:
+            print(f"WARNUNG: TurboJPEG-Zuschnitt fehlgeschlagen ({e}), dekodiere ganzes Bild.")
+    image = decode(data, grayscale)
+    return image[y:y + h, x:x + w] if image is not None else None
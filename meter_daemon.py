@@ -0,0 +1,219 @@
+import argparse
+import csv
+import os
+import signal
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import espcam
+from esp32_capture import ESP32CamClient
+from frame_gate import FrameChangeGate
+
+# --- Grundlegende Konfiguration ---
+# Dauerbetrieb ohne GUI: Bild holen, Zählerstand erkennen, Ergebnis anhängen.
+CAPTURE_INTERVAL_S = 5.0   # Abstand zwischen zwei Aufnahmen in Sekunden
+WORKER_COUNT = 2           # Anzahl OCR-Prozesse
+MAX_PENDING_JOBS = WORKER_COUNT * 2  # Mehr offene Aufträge -> Aufnahme wird übersprungen
+
+# --- Ausgabe ---
+# 'sqlite': Tabelle 'readings' in einer SQLite-Datei
+# 'csv':    Zeilen werden an eine CSV-Datei angehängt
+OUTPUT_FORMAT = 'sqlite'
+OUTPUT_PATHS = {'sqlite': 'meter_readings.sqlite', 'csv': 'meter_readings.csv'}
+
+# --- Änderungserkennung ---
+# Unveränderte Bilder (gleicher Zählerstand) werden gar nicht erst erkannt.
+# Schwellwerte und Methode siehe frame_gate.py. Erkannte Bilder dekodiert der
+# OCR-Prozess danach ein zweites Mal (nur das ROI), siehe FrameChangeGate.
+FRAME_GATE_ENABLED = True
+
+# Debug-Bilder und Fenster sind im Dauerbetrieb standardmäßig aus
+# ('off', 'sampled' oder 'always', siehe debug_sink.py)
+DEBUG_IMAGE_MODE = 'off'
+
+
+# --- Zeitreihen-Ausgabe ---
+class SQLiteTimeSeries:
+    """Speichert Messwerte in einer SQLite-Tabelle."""
+
+    def __init__(self, path):
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")  # Schnelles Anhängen, robust bei Absturz
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS readings ("
+            " ts REAL NOT NULL,"           # Unix-Zeitstempel der Aufnahme
+            " reading TEXT,"               # Erkannte Ziffern (None bei Fehler)
+            " confidence REAL,"            # OCR-Konfidenz 0-100
+            " latency_ms REAL)"            # Dauer der Erkennung
+        )
+        self.conn.commit()
+
+    def append(self, ts, reading, confidence, latency_ms):
+        self.conn.execute("INSERT INTO readings VALUES (?, ?, ?, ?)",
+                          (ts, reading, confidence, latency_ms))
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+
+class CSVTimeSeries:
+    """Hängt Messwerte zeilenweise an eine CSV-Datei an."""
+
+    def __init__(self, path):
+        new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+        self.file = open(path, 'a', newline='')
+        self.writer = csv.writer(self.file)
+        if new_file:
+            self.writer.writerow(['ts', 'reading', 'confidence', 'latency_ms'])
+            self.file.flush()
+
+    def append(self, ts, reading, confidence, latency_ms):
+        self.writer.writerow([f"{ts:.3f}", reading if reading is not None else '',
+                              f"{confidence:.1f}" if confidence is not None else '',
+                              f"{latency_ms:.1f}"])
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+def open_time_series(output_format, path):
+    """Öffnet die Zeitreihen-Ausgabe im gewünschten Format."""
+    if output_format == 'sqlite':
+        return SQLiteTimeSeries(path)
+    if output_format == 'csv':
+        return CSVTimeSeries(path)
+    raise ValueError(f"Unbekanntes Ausgabeformat '{output_format}' (erlaubt: 'sqlite', 'csv')")
+
+
+# --- OCR Worker ---
+def _init_worker(debug_image_mode):
+    """Initialisiert einen OCR-Prozess (einmal pro Prozess)."""
+    espcam.DEBUG_IMAGE_MODE = debug_image_mode
+    espcam.JPEG_DECODE_MODE = 'roi'  # Kein Anzeigebild nötig -> nur den ROI dekodieren
+    # Strg+C nur im Hauptprozess behandeln
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def _recognize(ts, image_bytes, roi_rect):
+    """Läuft im Worker-Prozess: erkennt den Zählerstand eines Bildes."""
+    start = time.perf_counter()
+    text, _, confidence = espcam.recognize_meter_reading_with_confidence(image_bytes, roi_rect)
+    latency_ms = (time.perf_counter() - start) * 1000
+    return ts, text, confidence, latency_ms
+
+
+# --- Dauerbetrieb ---
+class MeterReadingDaemon:
+    """Nimmt in festem Takt Bilder auf und schreibt erkannte Zählerstände weg."""
+
+    def __init__(self, client, time_series, roi_rect, interval_s=CAPTURE_INTERVAL_S,
+                 workers=WORKER_COUNT, max_pending=MAX_PENDING_JOBS,
+                 debug_image_mode=DEBUG_IMAGE_MODE, frame_gate=None):
+        self.client = client
+        self.time_series = time_series
+        self.roi_rect = roi_rect
+        self.interval_s = interval_s
+        self.max_pending = max_pending
+        self.executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                            initargs=(debug_image_mode,))
+        self.frame_gate = frame_gate
+        self.pending = []
+        self.running = False
+        self.stats = {"captures": 0, "capture_errors": 0, "skipped_busy": 0, "skipped_unchanged": 0,
+                      "readings": 0}
+
+    def stop(self, *_):
+        self.running = False
+
+    def run(self):
+        """Hauptschleife bis stop() oder SIGINT/SIGTERM."""
+        self.running = True
+        signal.signal(signal.SIGINT, self.stop)
+        signal.signal(signal.SIGTERM, self.stop)
+        print(f"Starte Dauerbetrieb: Intervall {self.interval_s}s, Ausgabe {type(self.time_series).__name__}")
+
+        next_run = time.monotonic()
+        try:
+            while self.running:
+                self._collect_results()
+                self._capture_once()
+
+                # Fester Takt ohne Drift; verpasste Termine werden übersprungen
+                next_run += self.interval_s
+                now = time.monotonic()
+                if next_run < now:
+                    next_run = now + self.interval_s - ((now - next_run) % self.interval_s)
+                while self.running and time.monotonic() < next_run:
+                    self._collect_results()
+                    time.sleep(min(0.1, max(0.0, next_run - time.monotonic())))
+        finally:
+            self.executor.shutdown(wait=True)
+            self._collect_results()
+            self.time_series.close()
+            print(f"Dauerbetrieb beendet. Statistik: {self.stats}")
+            if self.frame_gate is not None:
+                print(f"Änderungserkennung: {self.frame_gate.summary()}")
+
+    def _capture_once(self):
+        if len(self.pending) >= self.max_pending:
+            # OCR kommt nicht hinterher -> lieber eine Aufnahme auslassen als Rückstau
+            self.stats["skipped_busy"] += 1
+            return
+        ts = time.time()
+        image_bytes = self.client.capture()
+        if image_bytes is None:
+            self.stats["capture_errors"] += 1
+            return
+        self.stats["captures"] += 1
+        sample = None
+        if self.frame_gate is not None:
+            sample = self.frame_gate.sample(image_bytes)
+            if not self.frame_gate.changed(sample):
+                self.stats["skipped_unchanged"] += 1
+                return
+        self.pending.append(self.executor.submit(_recognize, ts, image_bytes, self.roi_rect))
+        if self.frame_gate is not None:
+            self.frame_gate.update(sample)
+
+    def _collect_results(self):
+        still_pending = []
+        for future in self.pending:
+            if not future.done():
+                still_pending.append(future)
+                continue
+            try:
+                ts, text, confidence, latency_ms = future.result()
+            except Exception as e:
+                print(f"Fehler im OCR-Prozess: {e}")
+                continue
+            self.time_series.append(ts, text or None, confidence, latency_ms)
+            self.stats["readings"] += 1
+            print(f"{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(ts))} "
+                  f"Zählerstand: {text or '-'} (Konfidenz: {confidence or 0:.1f}%, {latency_ms:.0f} ms)")
+        self.pending = still_pending
+
+
+# --- Hauptteil des Skripts ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Zählerstand im Dauerbetrieb erfassen (ohne GUI).")
+    parser.add_argument("--host", default=espcam.esp32_cam_ip, help="IP-Adresse der ESP32-CAM")
+    parser.add_argument("--interval", type=float, default=CAPTURE_INTERVAL_S, help="Sekunden zwischen Aufnahmen")
+    parser.add_argument("--workers", type=int, default=WORKER_COUNT, help="Anzahl OCR-Prozesse")
+    parser.add_argument("--format", choices=("sqlite", "csv"), default=OUTPUT_FORMAT)
+    parser.add_argument("--output", help="Pfad der Ausgabedatei (Standard je nach Format)")
+    parser.add_argument("--debug-images", choices=("off", "sampled", "always"), default=DEBUG_IMAGE_MODE,
+                        help="processed_roi.png speichern: nie, stichprobenartig oder immer")
+    parser.add_argument("--no-frame-gate", action="store_true", help="Jedes Bild erkennen, auch unveränderte")
+    args = parser.parse_args()
+
+    with ESP32CamClient(args.host, conn_timeout=espcam.connect_timeout,
+                        read_timeout=espcam.read_timeout) as cam_client:
+        daemon = MeterReadingDaemon(
+            cam_client, open_time_series(args.format, args.output or OUTPUT_PATHS[args.format]), espcam.roi_definition,
+            interval_s=args.interval, workers=args.workers, max_pending=args.workers * 2,
+            debug_image_mode=args.debug_images,
+            frame_gate=None if args.no_frame_gate or not FRAME_GATE_ENABLED else FrameChangeGate([espcam.roi_definition]))
+        daemon.run()
@@ -0,0 +1,360 @@
+import asyncio
+import math
+import os
+import random
+import signal
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import espcam
+
+# --- Kamera-Liste ---
+# Eine ESP32-CAM pro Zähler. 'roi' wie in espcam.py: (x, y, Breite, Höhe)
+CAMERAS = [
+    {"name": "wasser", "host": "192.168.178.178", "port": 80, "path": "/capture", "roi": (5, 65, 35, 55)},
+    # {"name": "gas", "host": "192.168.178.179", "port": 80, "path": "/capture", "roi": (5, 65, 35, 55)},
+]
+
+# --- Abruf-Konfiguration ---
+POLL_INTERVAL_S = 5.0     # Abstand zwischen zwei Aufnahmen pro Kamera
+CAPTURE_TIMEOUT_S = 8.0   # Zeitlimit pro Aufnahme (Verbindung + Daten)
+BACKOFF_INITIAL_S = 2.0   # Wartezeit nach dem ersten Fehler
+BACKOFF_MAX_S = 120.0     # Obergrenze für exponentielles Backoff
+MAX_RESPONSE_BYTES = 2 * 1024 * 1024  # Schutz gegen kaputte Antworten
+
+# --- OCR-Pool ---
+OCR_WORKERS = os.cpu_count() or 2
+MAX_PENDING_OCR = OCR_WORKERS * 2  # Mehr offene Aufträge -> Bild wird verworfen
+
+# --- Änderungserkennung ---
+# Unveränderte Bilder werden nicht an den OCR-Pool gegeben (siehe frame_gate.py).
+# So kann POLL_INTERVAL_S sinken, ohne dass die OCR-Last steigt. Erkannte Bilder
+# dekodiert der OCR-Prozess danach ein zweites Mal (nur das ROI), siehe FrameChangeGate.
+FRAME_GATE_ENABLED = True
+GATE_WORKERS = 2           # Threads für die verkleinerte Dekodierung, damit die Event-Loop frei bleibt
+
+# --- Ausgabe ---
+OUTPUT_FORMAT = 'csv'      # 'csv' oder 'sqlite' (siehe meter_daemon.py)
+OUTPUT_DIR = 'readings'    # Eine Datei pro Kamera
+REPORT_INTERVAL_S = 60.0   # Abstand der Statistik-Ausgabe
+LATENCY_WINDOW = 100       # Anzahl Aufnahmen für Latenz-Statistik
+
+
+class CaptureError(Exception):
+    """Fehler beim Abruf eines Bildes von einer Kamera."""
+
+
+# --- Minimaler HTTP-Client auf asyncio-Basis ---
+class CameraConnection:
+    """Hält eine Keep-Alive HTTP/1.1 Verbindung zu einer Kamera offen."""
+
+    def __init__(self, host, port, path):
+        self.host = host
+        self.port = port
+        self.path = path
+        self.reader = None
+        self.writer = None
+
+    async def fetch(self):
+        """Holt ein Bild. Baut die Verbindung bei Bedarf (neu) auf."""
+        if self.writer is None or self.writer.is_closing():
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        try:
+            return await self._request()
+        except BaseException: # Auch Abbruch durch das Zeitlimit: halb gelesene Antwort nie wiederverwenden
+            self._discard()
+            raise
+
+    async def _request(self):
+        request = (f"GET {self.path} HTTP/1.1\r\n"
+                   f"Host: {self.host}\r\n"
+                   "Connection: keep-alive\r\n\r\n")
+        self.writer.write(request.encode("ascii"))
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise CaptureError("Verbindung ohne Antwort geschlossen")
+        parts = status_line.decode("latin-1").split(" ", 2)
+        if len(parts) < 2 or not parts[1].isdigit():
+            raise CaptureError(f"Ungültige Statuszeile: {status_line!r}")
+        status = int(parts[1])
+
+        headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        if "chunked" in headers.get("transfer-encoding", "").lower():
+            body = await self._read_chunked()
+        elif "content-length" in headers:
+            length = int(headers["content-length"])
+            if length > MAX_RESPONSE_BYTES:
+                raise CaptureError(f"Antwort zu groß ({length} Bytes)")
+            body = await self.reader.readexactly(length)
+        else:
+            # Ohne Längenangabe bis zum Verbindungsende lesen
+            body = await self._read_to_close()
+            await self.close()
+
+        if headers.get("connection", "").lower() == "close":
+            await self.close()
+        if status != 200:
+            raise CaptureError(f"HTTP Status {status}")
+        if "image/jpeg" not in headers.get("content-type", ""):
+            raise CaptureError(f"Unerwarteter Content-Type: {headers.get('content-type')}")
+        if not body:
+            raise CaptureError("Leere Bilddaten empfangen")
+        return body
+
+    async def _read_to_close(self):
+        chunks = []
+        total = 0
+        while True:
+            chunk = await self.reader.read(64 * 1024)
+            if not chunk:
+                return b"".join(chunks)
+            total += len(chunk)
+            if total > MAX_RESPONSE_BYTES:
+                raise CaptureError(f"Antwort zu groß (über {MAX_RESPONSE_BYTES} Bytes)")
+            chunks.append(chunk)
+
+    async def _read_chunked(self):
+        """Liest einen Body mit Transfer-Encoding: chunked (z.B. httpd_resp_send_chunk der ESP32)."""
+        chunks = []
+        total = 0
+        while True:
+            line = await self.reader.readline()
+            try:
+                size = int(line.split(b";", 1)[0].strip(), 16)
+            except ValueError:
+                raise CaptureError(f"Ungültige Chunk-Größe: {line!r}") from None
+            if size == 0:
+                while await self.reader.readline() not in (b"\r\n", b"\n", b""): # Trailer überspringen
+                    pass
+                return b"".join(chunks)
+            total += size
+            if total > MAX_RESPONSE_BYTES:
+                raise CaptureError(f"Antwort zu groß (über {MAX_RESPONSE_BYTES} Bytes)")
+            chunks.append(await self.reader.readexactly(size))
+            if await self.reader.readline() not in (b"\r\n", b"\n"):
+                raise CaptureError("Chunk nicht mit CRLF abgeschlossen")
+
+    def _discard(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader, self.writer = None, None
+
+    async def close(self):
+        writer = self.writer
+        self._discard()
+        if writer is not None:
+            try:
+                await writer.wait_closed()
+            except Exception:
+                pass
+
+
+# --- OCR Worker ---
+def _init_worker():
+    """Initialisiert einen OCR-Prozess (ohne Debug-Bilder, ohne Strg+C)."""
+    espcam.DEBUG_IMAGE_MODE = 'off'
+    espcam.JPEG_DECODE_MODE = 'roi'
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def _recognize(image_bytes, roi_rect):
+    """Läuft im Worker-Prozess: erkennt den Zählerstand eines Bildes."""
+    start = time.perf_counter()
+    text, _, confidence = espcam.recognize_meter_reading_with_confidence(image_bytes, roi_rect)
+    return text, confidence, (time.perf_counter() - start) * 1000
+
+
+def _gate_check(gate, image_bytes):
+    """Läuft im Thread: (verkleinertes Bild, hat sich das Ziffernfenster verändert?)."""
+    sample = gate.sample(image_bytes)
+    return sample, gate.changed(sample)
+
+
+# --- Statistik ---
+class CameraStats:
+    """Zählt Aufnahmen, Fehler und Latenzen einer Kamera."""
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.captures = 0
+        self.errors = 0
+        self.dropped = 0      # Bilder verworfen, weil der OCR-Pool voll war
+        self.unchanged = 0    # Bilder übersprungen, weil sich nichts verändert hat
+        self.readings = 0
+        self.bytes_received = 0
+        self.capture_latencies_ms = deque(maxlen=LATENCY_WINDOW)
+        self.ocr_latencies_ms = deque(maxlen=LATENCY_WINDOW)
+
+    def summary(self):
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        lat = sorted(self.capture_latencies_ms)
+        avg = sum(lat) / len(lat) if lat else 0.0
+        p95 = lat[math.ceil(len(lat) * 0.95) - 1] if lat else 0.0 # Nearest-Rank
+        ocr_avg = (sum(self.ocr_latencies_ms) / len(self.ocr_latencies_ms)) if self.ocr_latencies_ms else 0.0
+        return (f"{self.captures} Aufnahmen ({self.captures / elapsed * 60:.1f}/min, "
+                f"{self.bytes_received / elapsed / 1024:.1f} KiB/s), {self.errors} Fehler, "
+                f"{self.dropped} verworfen, {self.unchanged} unverändert "
+                f"({self.unchanged / self.captures * 100 if self.captures else 0:.0f}%), Latenz Ø {avg:.0f} ms / p95 {p95:.0f} ms, OCR Ø {ocr_avg:.0f} ms")
+
+
+# --- Sammler ---
+class MultiCameraCollector:
+    """Fragt viele Kameras gleichzeitig ab und übergibt die Bilder an einen OCR-Pool."""
+
+    def __init__(self, cameras, poll_interval_s=POLL_INTERVAL_S, capture_timeout_s=CAPTURE_TIMEOUT_S,
+                 ocr_workers=OCR_WORKERS, max_pending_ocr=MAX_PENDING_OCR,
+                 output_format=OUTPUT_FORMAT, output_dir=OUTPUT_DIR, frame_gate=FRAME_GATE_ENABLED):
+        self.cameras = cameras
+        self.poll_interval_s = poll_interval_s
+        self.capture_timeout_s = capture_timeout_s
+        self.ocr_workers = ocr_workers
+        self.executor = ProcessPoolExecutor(max_workers=ocr_workers, initializer=_init_worker)
+        self.max_pending_ocr = max_pending_ocr
+        self.stats = {camera["name"]: CameraStats() for camera in cameras}
+        # Eine Änderungserkennung pro Kamera (jeweils eigenes Referenzbild)
+        self.frame_gates = {}
+        self.gate_executor = None
+        if frame_gate:
+            from frame_gate import FrameChangeGate # OpenCV nur laden, wenn die Erkennung genutzt wird
+            self.frame_gates = {camera["name"]: FrameChangeGate([camera["roi"]]) for camera in cameras}
+            self.gate_executor = ThreadPoolExecutor(max_workers=GATE_WORKERS)
+        self.outputs = {}
+        if output_dir:
+            from meter_daemon import open_time_series
+            os.makedirs(output_dir, exist_ok=True)
+            extension = 'sqlite' if output_format == 'sqlite' else 'csv'
+            for camera in cameras:
+                path = os.path.join(output_dir, f"{camera['name']}.{extension}")
+                self.outputs[camera["name"]] = open_time_series(output_format, path)
+        self.ocr_tasks = set()
+        self.stop_event = asyncio.Event()
+
+    async def run(self):
+        """Startet je Kamera eine Abfrage-Schleife und läuft bis stop()."""
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, self.stop)
+            except NotImplementedError:  # Windows
+                pass
+
+        print(f"Starte Abfrage von {len(self.cameras)} Kamera(s), OCR-Pool mit {self.ocr_workers} Prozessen")
+        pollers = [asyncio.create_task(self._poll_camera(camera)) for camera in self.cameras]
+        reporter = asyncio.create_task(self._report_loop())
+        try:
+            await self.stop_event.wait()
+        finally:
+            for task in pollers + [reporter]:
+                task.cancel()
+            await asyncio.gather(*pollers, reporter, return_exceptions=True)
+            if self.ocr_tasks:
+                await asyncio.gather(*self.ocr_tasks, return_exceptions=True)
+            self.executor.shutdown(wait=True)
+            if self.gate_executor is not None:
+                self.gate_executor.shutdown(wait=True)
+            for output in self.outputs.values():
+                output.close()
+            self.report()
+
+    def stop(self):
+        self.stop_event.set()
+
+    async def _poll_camera(self, camera):
+        name = camera["name"]
+        stats = self.stats[name]
+        connection = CameraConnection(camera["host"], camera.get("port", 80), camera.get("path", "/capture"))
+        backoff = 0.0
+        next_run = time.monotonic()
+        try:
+            while True:
+                start = time.monotonic()
+                try:
+                    image_bytes = await asyncio.wait_for(connection.fetch(), self.capture_timeout_s)
+                except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, CaptureError) as e:
+                    stats.errors += 1
+                    # Exponentielles Backoff mit Zufallsanteil, damit nicht alle Kameras gleichzeitig wiederholen
+                    backoff = min(BACKOFF_MAX_S, backoff * 2 if backoff else BACKOFF_INITIAL_S)
+                    delay = backoff * random.uniform(0.8, 1.2)
+                    print(f"[{name}] Fehler beim Abruf ({type(e).__name__}: {e}), neuer Versuch in {delay:.1f}s")
+                    await asyncio.sleep(delay)
+                    next_run = time.monotonic()
+                    continue
+
+                backoff = 0.0
+                stats.captures += 1
+                stats.bytes_received += len(image_bytes)
+                stats.capture_latencies_ms.append((time.monotonic() - start) * 1000)
+                await self._submit_ocr(camera, image_bytes)
+
+                next_run += self.poll_interval_s
+                await asyncio.sleep(max(0.0, next_run - time.monotonic()))
+                if next_run < time.monotonic() - self.poll_interval_s:
+                    next_run = time.monotonic()  # Weit im Rückstand -> Takt neu ausrichten
+        finally:
+            await connection.close()
+
+    async def _submit_ocr(self, camera, image_bytes):
+        stats = self.stats[camera["name"]]
+        gate = self.frame_gates.get(camera["name"])
+        sample = None
+        if gate is not None:
+            # Verkleinerte Dekodierung, kostet nur einen Bruchteil der OCR. Läuft in einem
+            # Thread, damit Abrufe und Zeitlimits der anderen Kameras nicht warten müssen.
+            loop = asyncio.get_running_loop()
+            sample, changed = await loop.run_in_executor(self.gate_executor, _gate_check, gate, image_bytes)
+            if not changed:
+                stats.unchanged += 1
+                return
+        if len(self.ocr_tasks) >= self.max_pending_ocr:
+            stats.dropped += 1
+            return # Referenzbild bleibt, damit die Änderung beim nächsten Bild erkannt wird
+        task = asyncio.create_task(self._run_ocr(camera, image_bytes, time.time()))
+        self.ocr_tasks.add(task)
+        task.add_done_callback(self.ocr_tasks.discard)
+        if gate is not None:
+            gate.update(sample)
+
+    async def _run_ocr(self, camera, image_bytes, ts):
+        name = camera["name"]
+        stats = self.stats[name]
+        loop = asyncio.get_running_loop()
+        try:
+            text, confidence, ocr_ms = await loop.run_in_executor(
+                self.executor, _recognize, image_bytes, camera["roi"])
+        except Exception as e:
+            print(f"[{name}] Fehler im OCR-Prozess: {e}")
+            return
+        stats.readings += 1
+        stats.ocr_latencies_ms.append(ocr_ms)
+        output = self.outputs.get(name)
+        if output is not None:
+            output.append(ts, text or None, confidence, ocr_ms)
+        print(f"[{name}] Zählerstand: {text or '-'} (Konfidenz: {confidence or 0:.1f}%)")
+
+    async def _report_loop(self):
+        while True:
+            await asyncio.sleep(REPORT_INTERVAL_S)
+            self.report()
+
+    def report(self):
+        print("\n--- Kamera-Statistik ---")
+        for name, stats in self.stats.items():
+            print(f"{name}: {stats.summary()}")
+
+
+# --- Hauptteil des Skripts ---
+if __name__ == "__main__":
+    async def main():
+        await MultiCameraCollector(CAMERAS).run()
+
+    asyncio.run(main())
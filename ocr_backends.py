@@ -0,0 +1,157 @@
+import shlex
+import threading
+
+# --- OCR Backends für Tesseract ---
+# 'tesseract': pytesseract, startet pro Aufruf einen neuen tesseract-Prozess
+#              und schreibt temporäre Bilddateien (einfach, aber langsam).
+# 'tesserocr': Bindet die Tesseract-API direkt im Prozess ein (pip install tesserocr).
+#              Die Engines bleiben geladen und werden pro Konfiguration wiederverwendet.
+TESSERACT_ENGINES = ('tesseract', 'tesserocr')
+
+
+def parse_tesseract_config(config):
+    """Zerlegt einen pytesseract-Konfigurationsstring in (oem, psm, Variablen)."""
+    oem, psm, variables = None, None, {}
+    tokens = shlex.split(config or "")
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        if token == '--oem' and i + 1 < len(tokens):
+            oem = int(tokens[i + 1])
+            i += 1
+        elif token == '--psm' and i + 1 < len(tokens):
+            psm = int(tokens[i + 1])
+            i += 1
+        elif token == '-c' and i + 1 < len(tokens):
+            name, _, value = tokens[i + 1].partition('=')
+            variables[name] = value
+            i += 1
+        i += 1
+    return oem, psm, variables
+
+
+def extract_text_and_confidence(data):
+    """Extrahiert Text und durchschnittliche Konfidenz aus den OCR-Daten (image_to_data DICT)."""
+    texts = []
+    confs = []
+
+    for i in range(len(data['text'])):
+        if int(float(data['conf'][i])) > 0:  # Nur gültige Konfidenzwerte (> 0)
+            texts.append(data['text'][i])
+            confs.append(float(data['conf'][i]))
+
+    if texts:
+        text = ' '.join(texts).strip()
+        avg_conf = sum(confs) / len(confs) if confs else 0
+        return text, avg_conf
+    else:
+        return "", 0.0
+
+
+class PytesseractBackend:
+    """OCR über pytesseract (ein tesseract-Prozess pro Aufruf)."""
+
+    name = 'tesseract'
+
+    def __init__(self):
+        import pytesseract
+        self.pytesseract = pytesseract
+
+    def image_to_string(self, image, config='', lang='eng'):
+        return self.pytesseract.image_to_string(image, lang=lang, config=config)
+
+    def recognize(self, image, config='', lang='eng'):
+        """Gibt (Text, durchschnittliche Konfidenz 0-100) zurück."""
+        data = self.pytesseract.image_to_data(image, lang=lang, config=config,
+                                              output_type=self.pytesseract.Output.DICT)
+        return extract_text_and_confidence(data)
+
+
+class TesserocrBackend:
+    """OCR über tesserocr: Tesseract bleibt im Prozess geladen.
+
+    Pro Thread und Konfiguration (Sprache, OEM, PSM, Variablen) wird genau eine
+    PyTessBaseAPI angelegt und danach wiederverwendet. Die API-Objekte sind
+    nicht threadsicher, daher die Trennung pro Thread.
+    """
+
+    name = 'tesserocr'
+
+    def __init__(self):
+        import tesserocr
+        self.tesserocr = tesserocr
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._all_apis = []  # Zum Aufräumen in close()
+
+    def _get_api(self, config, lang):
+        apis = getattr(self._local, 'apis', None)
+        if apis is None:
+            apis = self._local.apis = {}
+        oem, psm, variables = parse_tesseract_config(config)
+        key = (lang, oem, psm, tuple(sorted(variables.items())))
+        api = apis.get(key)
+        if api is None:
+            kwargs = {'lang': lang}
+            if oem is not None:
+                kwargs['oem'] = oem  # tesserocr.OEM/PSM sind einfache int-Konstanten
+            if psm is not None:
+                kwargs['psm'] = psm
+            api = self.tesserocr.PyTessBaseAPI(**kwargs)
+            for name, value in variables.items():
+                api.SetVariable(name, value)
+            apis[key] = api
+            with self._lock:
+                self._all_apis.append(api)
+        return api
+
+    def _run(self, image, config, lang):
+        import numpy as np
+        api = self._get_api(config, lang)
+        image = np.ascontiguousarray(image)
+        height, width = image.shape[:2]
+        if image.ndim == 2:
+            bytes_per_pixel = 1
+        else:
+            # OpenCV liefert BGR, Tesseract erwartet RGB
+            image = np.ascontiguousarray(image[:, :, 2::-1])
+            bytes_per_pixel = 3
+        api.SetImageBytes(image.tobytes(), width, height, bytes_per_pixel, width * bytes_per_pixel)
+        return api
+
+    def image_to_string(self, image, config='', lang='eng'):
+        api = self._run(image, config, lang)
+        return api.GetUTF8Text()
+
+    def recognize(self, image, config='', lang='eng'):
+        """Gibt (Text, durchschnittliche Konfidenz 0-100) zurück."""
+        api = self._run(image, config, lang)
+        words = api.GetUTF8Text().split()
+        confs = api.AllWordConfidences()
+        return extract_text_and_confidence({'text': words, 'conf': confs[:len(words)]})
+
+    def close(self):
+        with self._lock:
+            for api in self._all_apis:
+                api.End()
+            self._all_apis.clear()
+        self._local = threading.local()
+
+
+_BACKENDS = {}
+_BACKENDS_LOCK = threading.Lock()
+
+
+def get_ocr_backend(engine='tesseract'):
+    """Gibt das (gemeinsam genutzte) Backend für OCR_ENGINE zurück."""
+    with _BACKENDS_LOCK:
+        backend = _BACKENDS.get(engine)
+        if backend is None:
+            if engine == 'tesseract':
+                backend = PytesseractBackend()
+            elif engine == 'tesserocr':
+                backend = TesserocrBackend()
+            else:
+                raise ValueError(f"Unbekannte Tesseract-Engine '{engine}' (erlaubt: {', '.join(TESSERACT_ENGINES)})")
+            _BACKENDS[engine] = backend
+        return backend
@@ -0,0 +1,241 @@
+import argparse
+import itertools
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+# --- Konfiguration ---
+# Misst Genauigkeit und Geschwindigkeit der Erkennung über einen Ordner mit
+# beschrifteten Aufnahmen. Der Dateiname beginnt mit dem Zählerstand, z.B.
+# '012345_2024-01-01.jpg' (gleiche Konvention wie digit_templates.py).
+REPORT_FILE = 'ocr_benchmark_report.json'
+ACCURACY_TARGET = 0.95          # Mindest-Ziffern-Genauigkeit für die Auswahl der schnellsten Konfiguration
+ESPCAM_LABEL_DIGITS = (0, 1)    # Welche Stellen des Zählerstands im espcam-ROI stehen (Start, Ende)
+CALIBRATION_BINS = 10           # Konfidenz-Klassen (0-10%, 10-20%, ...) für die Kalibrierung
+GRID_WORKERS = os.cpu_count() or 2
+
+# Parameter-Gitter für espcam.py: jede Kombination wird über den ganzen Ordner gemessen
+PARAMETER_GRID = {
+    "PREPROCESSING_SCALE_FACTOR": [1.0, 2.0, 3.0],
+    "PREPROCESSING_THRESHOLD_METHOD": ['adaptive', 'otsu'],
+    "PREPROCESSING_BLUR_METHOD": ['median', 'gaussian'],
+    "TESSERACT_PSM": ['7', '8', '10'],
+}
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp')
+
+
+# --- Korpus ---
+def load_corpus(directory):
+    """Gibt [(Dateiname, Zählerstand, JPEG-Bytes), ...] zurück."""
+    corpus = []
+    for name in sorted(os.listdir(directory)):
+        match = re.match(r"(\d+)", name)
+        if match is None or not name.lower().endswith(IMAGE_EXTENSIONS):
+            continue
+        with open(os.path.join(directory, name), "rb") as f:
+            corpus.append((name, match.group(1), f.read()))
+    return corpus
+
+
+def digit_accuracy(expected, recognized):
+    """Anteil der Stellen, die an der richtigen Position richtig erkannt wurden."""
+    recognized = recognized or ""
+    correct = sum(1 for a, b in zip(expected, recognized) if a == b)
+    return correct / len(expected) if expected else 0.0
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))] if values else 0.0
+
+
+def summarize(per_image):
+    latencies = [entry["latency_ms"] for entry in per_image]
+    return {
+        "images": len(per_image),
+        "digit_accuracy": sum(entry["digit_accuracy"] for entry in per_image) / len(per_image) if per_image else 0.0,
+        "exact_matches": sum(1 for entry in per_image if entry["exact"]),
+        "latency_ms_mean": sum(latencies) / len(latencies) if latencies else 0.0,
+        "latency_ms_p95": percentile(latencies, 0.95),
+    }
+
+
+# --- espcam.py (ein ROI) ---
+def apply_espcam_params(espcam, params):
+    """Setzt Konfigurationswerte in espcam und baut abhängige Werte neu auf."""
+    for name, value in params.items():
+        setattr(espcam, name, value)
+    espcam.TESSERACT_CUSTOM_CONFIG = (f'--oem 3 --psm {espcam.TESSERACT_PSM} '
+                                      f'-c tessedit_char_whitelist={espcam.TESSERACT_WHITELIST}')
+    espcam.PREPROCESSING_PIPELINE = None # Neu aus den geänderten Werten bauen
+
+
+def run_espcam(corpus, params=None):
+    """Misst recognize_meter_reading über den Korpus. Läuft auch im Worker-Prozess."""
+    import espcam
+    espcam.DEBUG_IMAGE_MODE = 'off'
+    espcam.JPEG_DECODE_MODE = 'roi' # Wie im Dauerbetrieb
+    apply_espcam_params(espcam, params or {})
+    start, end = ESPCAM_LABEL_DIGITS
+    per_image = []
+    for name, label, image_bytes in corpus:
+        expected = label[start:end]
+        t0 = time.perf_counter()
+        text, _, confidence = espcam.recognize_meter_reading_with_confidence(image_bytes, espcam.roi_definition)
+        latency_ms = (time.perf_counter() - t0) * 1000
+        per_image.append({"image": name, "expected": expected, "recognized": text,
+                          "confidence": confidence, "latency_ms": latency_ms,
+                          "digit_accuracy": digit_accuracy(expected, text), "exact": text == expected})
+    return {"params": params or {}, "per_image": per_image, "summary": summarize(per_image)}
+
+
+# --- bild_ausewrtung_multiple_numbers.py (6 ROIs, Varianten) ---
+def run_multi(corpus, strategy=None):
+    """Misst die Mehrfach-ROI-Strategie und sammelt die Konfidenz-Kalibrierung je Variante."""
+    import cv2
+    import numpy as np
+    import bild_ausewrtung_multiple_numbers as multi
+    from ocr_cascade import VariantWinStats
+
+    if strategy:
+        multi.OCR_STRATEGY = strategy
+    variant_stats = VariantWinStats()
+    # Je Variante und Konfidenz-Klasse: [richtig, gesamt]
+    calibration = {variant[0]: [[0, 0] for _ in range(CALIBRATION_BINS)] for variant in multi.OCR_VARIANTS}
+    per_image = []
+    executor = ThreadPoolExecutor(max_workers=multi.OCR_MAX_WORKERS) if multi.OCR_PARALLEL else None
+    try:
+        for name, label, image_bytes in corpus:
+            gray = cv2.imdecode(np.frombuffer(image_bytes, np.uint8), cv2.IMREAD_GRAYSCALE)
+            if gray is None or len(label) != len(multi.rois):
+                print(f"Überspringe {name} (nicht lesbar oder {len(label)} statt {len(multi.rois)} Stellen)")
+                continue
+            # Am Bildrand abgeschnittene ROIs wären kleiner und ließen sich nicht stapeln
+            if any(r["x"] < 0 or r["y"] < 0 or r["x"] + r["w"] > gray.shape[1] or r["y"] + r["h"] > gray.shape[0]
+                   for r in multi.rois):
+                print(f"Überspringe {name} (ROIs reichen über das Bild {gray.shape[1]}x{gray.shape[0]} hinaus)")
+                continue
+            t0 = time.perf_counter()
+            roi_imgs = [gray[r["y"]:r["y"] + r["h"], r["x"]:r["x"] + r["w"]] for r in multi.rois]
+            recognitions = multi.recognize_rois(multi.preprocess_rois(roi_imgs), None, executor, variant_stats)
+            latency_ms = (time.perf_counter() - t0) * 1000
+
+            recognized = "".join(r["extracted_digits"][:1] or "?" for r in recognitions)
+            for expected_digit, recognition in zip(label, recognitions):
+                for method, result in recognition["results"].items():
+                    if method not in calibration:
+                        continue
+                    bin_index = min(CALIBRATION_BINS - 1, max(0, int(result["conf"] / 100 * CALIBRATION_BINS)))
+                    cell = calibration[method][bin_index]
+                    cell[0] += re.sub(r'\D', '', result["text"]) == expected_digit
+                    cell[1] += 1
+            per_image.append({"image": name, "expected": label, "recognized": recognized,
+                              "latency_ms": latency_ms, "digit_accuracy": digit_accuracy(label, recognized),
+                              "exact": recognized == label,
+                              "calls": sum(len(r["results"]) for r in recognitions)})
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    step = 100 // CALIBRATION_BINS
+    calibration_report = {
+        method: [{"confidence": f"{i * step}-{(i + 1) * step}", "accuracy": correct / total, "samples": total}
+                 for i, (correct, total) in enumerate(bins) if total]
+        for method, bins in calibration.items()
+    }
+    return {"strategy": multi.OCR_STRATEGY, "per_image": per_image, "summary": summarize(per_image),
+            "calibration": calibration_report, "variant_stats": variant_stats.summary()}
+
+
+# --- Parameter-Gitter ---
+def grid_points(grid):
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+
+def run_grid(corpus, grid=PARAMETER_GRID, workers=GRID_WORKERS, accuracy_target=ACCURACY_TARGET):
+    """Misst alle Kombinationen und wählt die schnellste ausreichend genaue.
+
+    Die Genauigkeit wird parallel gemessen (ein Prozess pro Kombination). Die Latenzen
+    dieses Durchgangs enthalten die Konkurrenz der anderen Prozesse und stehen nur als
+    *_under_load im Bericht. Die Kombinationen, die accuracy_target erreichen, werden
+    danach einzeln nacheinander gemessen; nur diese Latenzen entscheiden über "best".
+    """
+    points = grid_points(grid)
+    print(f"Parameter-Gitter: {len(points)} Kombinationen x {len(corpus)} Bilder, {workers} Prozesse")
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for result in executor.map(run_espcam, itertools.repeat(corpus), points):
+            summary = result["summary"]
+            results.append({"params": result["params"], "images": summary["images"],
+                            "digit_accuracy": summary["digit_accuracy"],
+                            "exact_matches": summary["exact_matches"],
+                            "latency_ms_mean_under_load": summary["latency_ms_mean"],
+                            "latency_ms_p95_under_load": summary["latency_ms_p95"]})
+            print(f"  {result['params']}: Genauigkeit {summary['digit_accuracy'] * 100:.1f}%, "
+                  f"Ø {summary['latency_ms_mean']:.0f} ms (unter Last)")
+
+    qualified = [r for r in results if r["digit_accuracy"] >= accuracy_target]
+    if qualified:
+        print(f"Latenz einzeln messen: {len(qualified)} Kombinationen mit >= {accuracy_target * 100:.0f}% Genauigkeit")
+    # Eigener Prozess mit nur einem Worker: gleiche Bedingungen wie oben, aber ohne parallele Läufe
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        for entry, result in zip(qualified, executor.map(run_espcam, itertools.repeat(corpus),
+                                                           [r["params"] for r in qualified])):
+            entry["latency_ms_mean"] = result["summary"]["latency_ms_mean"]
+            entry["latency_ms_p95"] = result["summary"]["latency_ms_p95"]
+            print(f"  {entry['params']}: Ø {entry['latency_ms_mean']:.0f} ms / p95 {entry['latency_ms_p95']:.0f} ms")
+    best = min(qualified, key=lambda r: r["latency_ms_mean"]) if qualified else None
+    return {"accuracy_target": accuracy_target, "results": results, "best": best}
+
+
+def print_summary(title, summary):
+    print(f"\n--- {title} ---")
+    print(f"{summary['images']} Bilder, Ziffern-Genauigkeit {summary['digit_accuracy'] * 100:.1f}%, "
+          f"{summary['exact_matches']} exakt, Latenz Ø {summary['latency_ms_mean']:.0f} ms / "
+          f"p95 {summary['latency_ms_p95']:.0f} ms")
+
+
+# --- Hauptteil des Skripts ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Genauigkeit und Geschwindigkeit der Zählerstand-Erkennung messen.")
+    parser.add_argument("directory", help="Ordner mit beschrifteten Aufnahmen (Dateiname beginnt mit dem Zählerstand)")
+    parser.add_argument("--mode", choices=("espcam", "multi", "grid", "all"), default="all")
+    parser.add_argument("--strategy", choices=("all", "cascade"), help="OCR_STRATEGY für den Mehrfach-ROI-Test")
+    parser.add_argument("--target", type=float, default=ACCURACY_TARGET, help="Mindest-Genauigkeit (0-1)")
+    parser.add_argument("--workers", type=int, default=GRID_WORKERS)
+    parser.add_argument("--report", default=REPORT_FILE)
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.directory)
+    if not corpus:
+        print(f"Keine beschrifteten Aufnahmen in '{args.directory}' gefunden.")
+        sys.exit(1)
+
+    report = {"directory": args.directory, "images": len(corpus)}
+    if args.mode in ("espcam", "all"):
+        report["espcam"] = run_espcam(corpus)
+        print_summary("espcam.py (aktuelle Konfiguration)", report["espcam"]["summary"])
+    if args.mode in ("multi", "all"):
+        report["multi"] = run_multi(corpus, args.strategy)
+        print_summary(f"Mehrfach-ROI (Strategie '{report['multi']['strategy']}')", report["multi"]["summary"])
+        print("Konfidenz-Kalibrierung (Konfidenz -> tatsächliche Trefferquote):")
+        for method, bins in report["multi"]["calibration"].items():
+            cells = ", ".join(f"{b['confidence']}%: {b['accuracy'] * 100:.0f}% (n={b['samples']})" for b in bins)
+            print(f"  {method}: {cells}")
+    if args.mode in ("grid", "all"):
+        report["grid"] = run_grid(corpus, workers=args.workers, accuracy_target=args.target)
+        best = report["grid"]["best"]
+        if best:
+            print(f"\nSchnellste Konfiguration mit >= {args.target * 100:.0f}% Genauigkeit: {best['params']} "
+                  f"({best['digit_accuracy'] * 100:.1f}%, Ø {best['latency_ms_mean']:.0f} ms einzeln gemessen)")
+        else:
+            print(f"\nKeine Konfiguration erreicht {args.target * 100:.0f}% Genauigkeit.")
+
+    with open(args.report, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nBericht gespeichert in {args.report}")
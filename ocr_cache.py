@@ -0,0 +1,119 @@
+import json
+import os
+from collections import OrderedDict
+
+# --- Konfiguration ---
+CACHE_MAX_ENTRIES = 256   # Obergrenze, danach wird der am längsten unbenutzte Eintrag entfernt (LRU)
+CACHE_HASH_SIZE = 8       # dHash mit 8x8 = 64 Bit
+CACHE_MAX_HAMMING = 2     # Bis zu so vielen abweichenden Bits gilt ein ROI als unverändert (0 = nur exakt gleich)
+CACHE_FORMAT = 2          # Version der Cache-Datei (2: Schlüssel pro ROI)
+
+
+def dhash(image, hash_size=CACHE_HASH_SIZE):
+    """Berechnet einen Differenz-Hash (dHash) eines Graustufen-/Binärbildes als int."""
+    import cv2
+    if len(image.shape) == 3:
+        image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    # Auf (hash_size+1) x hash_size verkleinern und benachbarte Pixel vergleichen
+    small = cv2.resize(image, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    diff = small[:, 1:] > small[:, :-1]
+    value = 0
+    for bit in diff.flatten():
+        value = (value << 1) | int(bit)
+    return value
+
+
+class DigitOCRCache:
+    """LRU-Cache für OCR-Ergebnisse einzelner Ziffern-ROIs.
+
+    Schlüssel ist (ROI, Wahrnehmungs-Hash (dHash) des vorverarbeiteten ROI).
+    Ein Treffer liegt vor, wenn für dasselbe ROI ein gespeicherter Hash
+    höchstens max_hamming Bits abweicht, d.h. die Ziffer sich seit der letzten
+    Aufnahme nicht sichtbar verändert hat. Einträge anderer ROIs werden nie
+    verwendet, auch wenn ihr Hash ähnlich ist. Nicht threadsicher: get/put nur
+    aus dem Thread aufrufen, der die OCR-Aufträge verteilt.
+    """
+
+    def __init__(self, max_entries=CACHE_MAX_ENTRIES, hash_size=CACHE_HASH_SIZE,
+                 max_hamming=CACHE_MAX_HAMMING):
+        self.max_entries = max_entries
+        self.hash_size = hash_size
+        self.max_hamming = max_hamming
+        self.entries = OrderedDict()  # (ROI, Hash) -> Ergebnis, älteste zuerst
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def key(self, roi_image, roi=None):
+        """Schlüssel für das Bild eines ROI. roi: Name oder Index des ROI (z.B. roi["name"])."""
+        return roi, dhash(roi_image, self.hash_size)
+
+    def get(self, key):
+        """Gibt das gespeicherte Ergebnis für einen (fast) gleichen Hash desselben ROI zurück oder None."""
+        match = key if key in self.entries else self._nearest(key)
+        if match is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(match)
+        self.hits += 1
+        return self.entries[match]
+
+    def _nearest(self, key):
+        if self.max_hamming <= 0:
+            return None
+        roi, value = key
+        best_key, best_distance = None, self.max_hamming + 1
+        for stored_key in self.entries:
+            if stored_key[0] != roi:
+                continue
+            distance = bin(stored_key[1] ^ value).count("1")
+            if distance < best_distance:
+                best_key, best_distance = stored_key, distance
+        return best_key
+
+    def put(self, key, result):
+        self.entries[key] = result
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self):
+        return {"entries": len(self.entries), "hits": self.hits, "misses": self.misses,
+                "evictions": self.evictions, "hit_rate": round(self.hit_rate, 3)}
+
+    # --- Persistenz zwischen Skriptläufen ---
+    def save(self, path):
+        data = {"format": CACHE_FORMAT, "hash_size": self.hash_size,
+                "stats": {"hits": self.hits, "misses": self.misses, "evictions": self.evictions},
+                "entries": [[roi, f"{value:x}", result] for (roi, value), result in self.entries.items()]}
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)  # Atomar, damit ein Abbruch die Datei nicht zerstört
+
+    @classmethod
+    def load(cls, path, **kwargs):
+        cache = cls(**kwargs)
+        if not os.path.exists(path):
+            return cache
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("format") != CACHE_FORMAT or data.get("hash_size") != cache.hash_size:
+                print(f"INFO: OCR-Cache {path} mit anderem Format oder anderer Hash-Größe erstellt, wird neu aufgebaut.")
+                return cache
+            for roi, key_hex, result in data.get("entries", []):
+                cache.put((roi, int(key_hex, 16)), result)
+            stats = data.get("stats", {})
+            cache.hits = stats.get("hits", 0)
+            cache.misses = stats.get("misses", 0)
+            cache.evictions = stats.get("evictions", 0)
+        except (OSError, ValueError) as e:
+            print(f"WARNUNG: OCR-Cache {path} konnte nicht geladen werden: {e}")
+        return cache
@@ -0,0 +1,91 @@
+import json
+import os
+import threading
+
+# --- Konfiguration ---
+CASCADE_EXPLORE_EVERY = 20     # Jedes n-te Bild läuft mit allen Varianten, damit die Statistik aktuell bleibt
+
+
+class VariantWinStats:
+    """Zählt, wie oft jede OCR-Variante das beste Ergebnis geliefert hat.
+
+    Daraus ergibt sich die Reihenfolge für die Kaskade: Varianten mit hoher
+    Gewinnquote werden zuerst ausprobiert. Threadsicher, da die ROIs parallel
+    erkannt werden können.
+    """
+
+    def __init__(self, explore_every=CASCADE_EXPLORE_EVERY):
+        self.explore_every = explore_every
+        self.wins = {}          # Methode -> Anzahl "bestes Ergebnis"
+        self.recognitions = 0   # Anzahl erkannter Ziffern
+        self.ocr_calls = 0      # Anzahl OCR-Aufrufe insgesamt
+        self.early_exits = 0    # Erkennungen, die vor der letzten Variante abgebrochen wurden
+        self.frames = 0         # Anzahl Bilder, für die should_explore() gefragt wurde
+        self._lock = threading.Lock()
+
+    def win_rate(self, method):
+        # Laplace-Glättung: unbekannte Varianten starten nicht bei 0
+        return (self.wins.get(method, 0) + 1) / (self.recognitions + 2)
+
+    def order(self, variants):
+        """Sortiert Varianten (Tupel mit Methodenname an Position 0) nach Gewinnquote."""
+        with self._lock:
+            # sorted() ist stabil: bei Gleichstand bleibt die ursprüngliche Reihenfolge
+            return sorted(variants, key=lambda variant: -self.win_rate(variant[0]))
+
+    def should_explore(self):
+        """True, wenn alle ROIs des nächsten Bildes alle Varianten ausführen sollen.
+
+        Einmal pro Bild aufrufen, bevor die ROIs parallel erkannt werden.
+        """
+        with self._lock:
+            explore = self.explore_every > 0 and self.frames % self.explore_every == 0
+            self.frames += 1
+            return explore
+
+    def record(self, best_method, calls, early_exit):
+        with self._lock:
+            self.wins[best_method] = self.wins.get(best_method, 0) + 1
+            self.recognitions += 1
+            self.ocr_calls += calls
+            if early_exit:
+                self.early_exits += 1
+
+    @property
+    def calls_per_digit(self):
+        return self.ocr_calls / self.recognitions if self.recognitions else 0.0
+
+    def summary(self):
+        with self._lock:
+            ranking = ", ".join(f"{method}: {count}" for method, count in
+                                sorted(self.wins.items(), key=lambda item: -item[1]))
+            return (f"{self.recognitions} Ziffern, Ø {self.calls_per_digit:.2f} OCR-Aufrufe/Ziffer, "
+                    f"{self.early_exits} vorzeitig beendet. Siege: {ranking}")
+
+    # --- Persistenz zwischen Skriptläufen ---
+    def save(self, path):
+        with self._lock:
+            data = {"wins": self.wins, "recognitions": self.recognitions,
+                    "ocr_calls": self.ocr_calls, "early_exits": self.early_exits,
+                    "frames": self.frames}
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path, **kwargs):
+        stats = cls(**kwargs)
+        if not os.path.exists(path):
+            return stats
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            stats.wins = {method: int(count) for method, count in data.get("wins", {}).items()}
+            stats.recognitions = int(data.get("recognitions", 0))
+            stats.ocr_calls = int(data.get("ocr_calls", 0))
+            stats.early_exits = int(data.get("early_exits", 0))
+            stats.frames = int(data.get("frames", 0))
+        except (OSError, ValueError) as e:
+            print(f"WARNUNG: Varianten-Statistik {path} konnte nicht geladen werden: {e}")
+        return stats
@@ -2,6 +2,7 @@ import pygame
 import sys
 import random
 import math # Für Partikel-Winkel
+from collision import swept_circle_rect # Kontinuierliche Kollision (kein Durchtunneln)
 
 # --- Konstanten ---
 SCREEN_WIDTH = 900
@@ -31,6 +32,15 @@ PADDLE_SPEED = 8
 BALL_SPEED_X_INITIAL = 6
 BALL_SPEED_Y_INITIAL = 6
 BALL_SPEED_INCREASE = 0.2 # Erhöhung bei jedem Paddel-Treffer
+SERVE_DELAY_MS = 600 # Pause nach einem Punkt, bevor der Ball losfliegt
+
+# Zeitschritt: Die Simulation läuft immer mit SIMULATION_HZ Schritten pro Sekunde
+# (alle Geschwindigkeiten oben sind Pixel pro Schritt), unabhängig von der Bildrate.
+# Gezeichnet wird so oft wie möglich (bis MAX_FPS), zwischen zwei Schritten interpoliert.
+SIMULATION_HZ = 60
+SIMULATION_STEP_MS = 1000 / SIMULATION_HZ
+MAX_FPS = 144 # 0 = unbegrenzt
+MAX_STEPS_PER_FRAME = 5 # Bei sehr langsamen Frames lieber Zeit verwerfen als immer weiter zurückfallen
 
 # Punkte-Limit
 WINNING_SCORE = 5
@@ -95,6 +105,15 @@ paddle_b_flash_timer = 0
 ball_flash_timer = 0
 particles = [] # Liste für Partikel-Objekte
 
+# Aufschlag-Countdown: Solange > 0, wartet der Ball in der Mitte.
+# Die Schleife läuft dabei weiter (Partikel, Paddel, Eingaben).
+serve_timer_ms = 0
+
+# Positionen vor dem letzten Simulationsschritt (zum Interpolieren beim Zeichnen)
+ball_prev = ball.topleft
+paddle_a_prev = paddle_a.topleft
+paddle_b_prev = paddle_b.topleft
+
 # --- Partikel Klasse ---
 class Particle:
     def __init__(self, x, y, angle, speed, color, size, lifespan):
@@ -137,13 +156,14 @@ def create_particles(x, y, base_color, count):
 
 def ball_reset():
     """Setzt den Ball zurück und erzeugt Partikeleffekt."""
-    global ball_dx, ball_dy, current_ball_speed_x, current_ball_speed_y
+    global ball_dx, ball_dy, current_ball_speed_x, current_ball_speed_y, serve_timer_ms, ball_prev
     ball.center = (SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2)
+    ball_prev = ball.topleft # Nicht vom alten Ort zur Mitte interpolieren
 
     # Partikel in der Mitte
     create_particles(ball.centerx, ball.centery, random.choice(PARTICLE_COLORS), SCORE_PARTICLES)
 
-    pygame.time.wait(600) # Längere Pause nach Punkt für den Effekt
+    serve_timer_ms = SERVE_DELAY_MS # Längere Pause nach Punkt für den Effekt (blockiert nicht)
 
     # Reset Geschwindigkeiten und wähle zufällige Richtung
     current_ball_speed_x = BALL_SPEED_X_INITIAL
@@ -154,10 +174,160 @@ def ball_reset():
         score_sound.play()
 
 
-def draw_elements():
-    """Zeichnet alle Spielelemente mit Effekten."""
-    global paddle_a_flash_timer, paddle_b_flash_timer, ball_flash_timer
+def store_previous_positions():
+    """Merkt sich die Positionen vor einem Simulationsschritt."""
+    global ball_prev, paddle_a_prev, paddle_b_prev
+    ball_prev = ball.topleft
+    paddle_a_prev = paddle_a.topleft
+    paddle_b_prev = paddle_b.topleft
+
+
+def interpolated(rect, prev_topleft, alpha):
+    """Rechteck an der Zwischenposition alpha (0..1) zwischen letztem und aktuellem Schritt."""
+    drawn = rect.copy()
+    drawn.x = round(prev_topleft[0] + (rect.x - prev_topleft[0]) * alpha)
+    drawn.y = round(prev_topleft[1] + (rect.y - prev_topleft[1]) * alpha)
+    return drawn
+
+
+def update():
+    """Ein Simulationsschritt (1 / SIMULATION_HZ Sekunden)."""
+    global ball_dx, ball_dy, current_ball_speed_x, current_ball_speed_y, score_a, score_b, game_over, winner
+    global paddle_a_flash_timer, paddle_b_flash_timer, ball_flash_timer, particles, serve_timer_ms
+
+    store_previous_positions()
+
+    # --- Spiel Logik (nur wenn nicht Game Over) ---
+    if not game_over:
+        # Paddel Bewegung
+        keys = pygame.key.get_pressed()
+        # Spieler A (Links: W/S)
+        if keys[pygame.K_w] and paddle_a.top > 0:
+            paddle_a.y -= PADDLE_SPEED
+        if keys[pygame.K_s] and paddle_a.bottom < SCREEN_HEIGHT:
+            paddle_a.y += PADDLE_SPEED
+        # Spieler B (Rechts: Pfeil Hoch/Runter)
+        if keys[pygame.K_UP] and paddle_b.top > 0:
+            paddle_b.y -= PADDLE_SPEED
+        if keys[pygame.K_DOWN] and paddle_b.bottom < SCREEN_HEIGHT:
+            paddle_b.y += PADDLE_SPEED
+
+        # Ball Bewegung (erst nach Ablauf des Aufschlag-Countdowns)
+        # Die ganze Bahn wird gegen das Paddel geprüft, auf das der Ball zufliegt,
+        # damit er auch bei hoher Geschwindigkeit nicht hindurchrutscht.
+        paddle_hit = None
+        remaining = 0.0 # Restanteil der Bewegung nach dem Abprall
+        if serve_timer_ms > 0:
+            serve_timer_ms -= SIMULATION_STEP_MS
+        else:
+            paddle = paddle_a if ball_dx < 0 else paddle_b
+            hit = swept_circle_rect(ball.centerx, ball.centery, ball_dx, ball_dy, BALL_RADIUS, paddle)
+            if hit is None:
+                ball.x += ball_dx
+                ball.y += ball_dy
+            else:
+                # Ball genau an den Kontaktpunkt setzen
+                ball.center = (round(ball.centerx + ball_dx * hit.t), round(ball.centery + ball_dy * hit.t))
+                remaining = 1.0 - hit.t
+                if hit.normal_x * ball_dx < 0: # Vorderseite (oder Ecke) getroffen
+                    paddle_hit = paddle
+                else: # Ober- oder Unterkante: nur vertikal abprallen
+                    ball_dy *= -1
+
+        # Ball Kollision mit Wänden (Oben/Unten)
+        if ball.top <= 0 or ball.bottom >= SCREEN_HEIGHT:
+            ball_dy *= -1
+            ball_flash_timer = FLASH_DURATION # Ball blinken lassen
+            create_particles(ball.centerx, ball.centery, BALL_COLOR_HIT, WALL_HIT_PARTICLES) # Partikel an Wand
+            if sound_enabled:
+                wall_sound.play()
+             # Verhindern, dass der Ball stecken bleibt
+            if ball.top < 0: ball.top = 0
+            if ball.bottom > SCREEN_HEIGHT: ball.bottom = SCREEN_HEIGHT
+
+
+        # Ball Kollision mit Paddeln (Kontakt oben entlang der Bahn bestimmt)
+        if paddle_hit is paddle_a:
+            ball_dx *= -1
+            # Winkel basierend auf Treffpunkt am Paddel anpassen
+            relative_intersect_y = (paddle_a.centery - ball.centery)
+            normalized_relative_intersect_y = relative_intersect_y / (PADDLE_HEIGHT / 2)
+            bounce_angle = normalized_relative_intersect_y * (math.pi / 3) # Max 60 Grad
+            # Geschwindigkeit erhöhen
+            current_ball_speed_x += BALL_SPEED_INCREASE
+            current_ball_speed_y += BALL_SPEED_INCREASE
+            ball_dx = current_ball_speed_x * math.cos(bounce_angle)
+            ball_dy = current_ball_speed_y * -math.sin(bounce_angle)
+
+            paddle_a_flash_timer = FLASH_DURATION # Paddel A blinken
+            ball_flash_timer = FLASH_DURATION     # Ball blinken
+            create_particles(ball.centerx, ball.centery, PADDLE_A_COLOR, PADDLE_HIT_PARTICLES) # Partikel
+            if sound_enabled: hit_sound.play()
+            # Verhindern, dass Ball im Paddel steckt
+            ball.left = paddle_a.right
+
+
+        if paddle_hit is paddle_b:
+            ball_dx *= -1
+            relative_intersect_y = (paddle_b.centery - ball.centery)
+            normalized_relative_intersect_y = relative_intersect_y / (PADDLE_HEIGHT / 2)
+            bounce_angle = normalized_relative_intersect_y * (math.pi / 3) # Max 60 Grad
+            current_ball_speed_x += BALL_SPEED_INCREASE
+            current_ball_speed_y += BALL_SPEED_INCREASE
+            # Winkel spiegeln für rechtes Paddel
+            ball_dx = current_ball_speed_x * -math.cos(bounce_angle)
+            ball_dy = current_ball_speed_y * -math.sin(bounce_angle)
+
+            paddle_b_flash_timer = FLASH_DURATION # Paddel B blinken
+            ball_flash_timer = FLASH_DURATION     # Ball blinken
+            create_particles(ball.centerx, ball.centery, PADDLE_B_COLOR, PADDLE_HIT_PARTICLES) # Partikel
+            if sound_enabled: hit_sound.play()
+            # Verhindern, dass Ball im Paddel steckt
+            ball.right = paddle_b.left
+
+        # Rest der Bewegung nach einem Paddel-Abprall mit der neuen Richtung
+        if remaining > 0:
+            ball.x += ball_dx * remaining
+            ball.y += ball_dy * remaining
+
+        # Ball aus dem Spielfeld (Punkt für Gegner)
+        if ball.left <= 0:
+            score_b += 1
+            if score_b >= WINNING_SCORE:
+                game_over = True
+                winner = "Player Magenta" # Spieler B
+            else:
+                ball_reset()
+        if ball.right >= SCREEN_WIDTH:
+            score_a += 1
+            if score_a >= WINNING_SCORE:
+                game_over = True
+                winner = "Player Cyan" # Spieler A
+            else:
+                ball_reset()
+
+
+    # --- Effekte ---
+    # Blink-Timer zählen in Simulationsschritten, damit sie bei jeder Bildrate gleich lang sind
+    if paddle_a_flash_timer > 0: paddle_a_flash_timer -= 1
+    if paddle_b_flash_timer > 0: paddle_b_flash_timer -= 1
+    if ball_flash_timer > 0: ball_flash_timer -= 1
+
+    # Update Partikel Positionen und Lebensdauer
+    live_particles = []
+    for p in particles:
+        p.update()
+        if p.lifespan > 0:
+            live_particles.append(p)
+    particles = live_particles
+
+
+def draw_elements(alpha=1.0):
+    """Zeichnet alle Spielelemente mit Effekten.
 
+    alpha (0..1) gibt an, wie weit die Zeit zwischen letztem und nächstem
+    Simulationsschritt fortgeschritten ist; Ball und Paddel werden dazwischen interpoliert.
+    """
     # Hintergrund (könnte auch ein Gradient sein)
     screen.fill(DARK_BG)
 
@@ -174,32 +344,28 @@ def draw_elements():
 
     # Paddel A Farbe bestimmen (Flash-Effekt)
     current_paddle_a_color = PADDLE_A_COLOR
-    if paddle_a_flash_timer > 0:
-        if paddle_a_flash_timer % 4 < 2: # Lässt es blinken
-            current_paddle_a_color = WHITE
-        paddle_a_flash_timer -= 1
+    if paddle_a_flash_timer > 0 and paddle_a_flash_timer % 4 < 2: # Lässt es blinken
+        current_paddle_a_color = WHITE
 
     # Paddel B Farbe bestimmen
     current_paddle_b_color = PADDLE_B_COLOR
-    if paddle_b_flash_timer > 0:
-        if paddle_b_flash_timer % 4 < 2:
-            current_paddle_b_color = WHITE
-        paddle_b_flash_timer -= 1
+    if paddle_b_flash_timer > 0 and paddle_b_flash_timer % 4 < 2:
+        current_paddle_b_color = WHITE
 
     # Ball Farbe bestimmen
     current_ball_color = BALL_COLOR_DEFAULT
     if ball_flash_timer > 0:
         current_ball_color = BALL_COLOR_HIT
-        ball_flash_timer -= 1
 
     # Paddel zeichnen (mit abgerundeten Ecken)
-    pygame.draw.rect(screen, current_paddle_a_color, paddle_a, border_radius=5)
-    pygame.draw.rect(screen, current_paddle_b_color, paddle_b, border_radius=5)
+    pygame.draw.rect(screen, current_paddle_a_color, interpolated(paddle_a, paddle_a_prev, alpha), border_radius=5)
+    pygame.draw.rect(screen, current_paddle_b_color, interpolated(paddle_b, paddle_b_prev, alpha), border_radius=5)
 
     # Ball zeichnen (als Kreis)
-    pygame.draw.ellipse(screen, current_ball_color, ball)
+    ball_drawn = interpolated(ball, ball_prev, alpha)
+    pygame.draw.ellipse(screen, current_ball_color, ball_drawn)
     # Optional: Kleinerer weißer Kern für Glüheffekt-Andeutung
-    inner_ball_rect = ball.inflate(-BALL_SIZE * 0.4, -BALL_SIZE * 0.4)
+    inner_ball_rect = ball_drawn.inflate(-BALL_SIZE * 0.4, -BALL_SIZE * 0.4)
     pygame.draw.ellipse(screen, WHITE, inner_ball_rect)
 
 
@@ -211,8 +377,12 @@ def draw_elements():
 
 
 # --- Spiel Loop ---
+accumulator_ms = 0.0 # Noch nicht simulierte Zeit
 running = True
 while running:
+    # Framerate begrenzen (MAX_FPS) und vergangene Zeit messen
+    accumulator_ms += clock.tick(MAX_FPS)
+
     # --- Event Handling ---
     for event in pygame.event.get():
         if event.type == pygame.QUIT:
@@ -230,111 +400,21 @@ while running:
                  paddle_b.centery = SCREEN_HEIGHT // 2
                  particles.clear() # Partikel vom Game Over entfernen
                  ball_reset()
+                 store_previous_positions()
 
 
-    # --- Spiel Logik (nur wenn nicht Game Over) ---
-    if not game_over:
-        # Paddel Bewegung
-        keys = pygame.key.get_pressed()
-        # Spieler A (Links: W/S)
-        if keys[pygame.K_w] and paddle_a.top > 0:
-            paddle_a.y -= PADDLE_SPEED
-        if keys[pygame.K_s] and paddle_a.bottom < SCREEN_HEIGHT:
-            paddle_a.y += PADDLE_SPEED
-        # Spieler B (Rechts: Pfeil Hoch/Runter)
-        if keys[pygame.K_UP] and paddle_b.top > 0:
-            paddle_b.y -= PADDLE_SPEED
-        if keys[pygame.K_DOWN] and paddle_b.bottom < SCREEN_HEIGHT:
-            paddle_b.y += PADDLE_SPEED
-
-        # Ball Bewegung
-        ball.x += ball_dx
-        ball.y += ball_dy
-
-        # Ball Kollision mit Wänden (Oben/Unten)
-        if ball.top <= 0 or ball.bottom >= SCREEN_HEIGHT:
-            ball_dy *= -1
-            ball_flash_timer = FLASH_DURATION # Ball blinken lassen
-            create_particles(ball.centerx, ball.centery, BALL_COLOR_HIT, WALL_HIT_PARTICLES) # Partikel an Wand
-            if sound_enabled:
-                wall_sound.play()
-             # Verhindern, dass der Ball stecken bleibt
-            if ball.top < 0: ball.top = 0
-            if ball.bottom > SCREEN_HEIGHT: ball.bottom = SCREEN_HEIGHT
-
-
-        # Ball Kollision mit Paddeln
-        collision_tolerance = 10 # Toleranz, um "durchrutschen" zu vermeiden
-        if ball.colliderect(paddle_a) and ball_dx < 0:
-             if abs(paddle_a.right - ball.left) < collision_tolerance:
-                 ball_dx *= -1
-                 # Winkel basierend auf Treffpunkt am Paddel anpassen
-                 relative_intersect_y = (paddle_a.centery - ball.centery)
-                 normalized_relative_intersect_y = relative_intersect_y / (PADDLE_HEIGHT / 2)
-                 bounce_angle = normalized_relative_intersect_y * (math.pi / 3) # Max 60 Grad
-                 # Geschwindigkeit erhöhen
-                 current_ball_speed_x += BALL_SPEED_INCREASE
-                 current_ball_speed_y += BALL_SPEED_INCREASE
-                 ball_dx = current_ball_speed_x * math.cos(bounce_angle)
-                 ball_dy = current_ball_speed_y * -math.sin(bounce_angle)
-
-                 paddle_a_flash_timer = FLASH_DURATION # Paddel A blinken
-                 ball_flash_timer = FLASH_DURATION     # Ball blinken
-                 create_particles(ball.centerx, ball.centery, PADDLE_A_COLOR, PADDLE_HIT_PARTICLES) # Partikel
-                 if sound_enabled: hit_sound.play()
-                 # Verhindern, dass Ball im Paddel steckt
-                 ball.left = paddle_a.right
-
-
-        if ball.colliderect(paddle_b) and ball_dx > 0:
-            if abs(paddle_b.left - ball.right) < collision_tolerance:
-                ball_dx *= -1
-                relative_intersect_y = (paddle_b.centery - ball.centery)
-                normalized_relative_intersect_y = relative_intersect_y / (PADDLE_HEIGHT / 2)
-                bounce_angle = normalized_relative_intersect_y * (math.pi / 3) # Max 60 Grad
-                current_ball_speed_x += BALL_SPEED_INCREASE
-                current_ball_speed_y += BALL_SPEED_INCREASE
-                # Winkel spiegeln für rechtes Paddel
-                ball_dx = current_ball_speed_x * -math.cos(bounce_angle)
-                ball_dy = current_ball_speed_y * -math.sin(bounce_angle)
-
-                paddle_b_flash_timer = FLASH_DURATION # Paddel B blinken
-                ball_flash_timer = FLASH_DURATION     # Ball blinken
-                create_particles(ball.centerx, ball.centery, PADDLE_B_COLOR, PADDLE_HIT_PARTICLES) # Partikel
-                if sound_enabled: hit_sound.play()
-                # Verhindern, dass Ball im Paddel steckt
-                ball.right = paddle_b.left
-
-
-        # Ball aus dem Spielfeld (Punkt für Gegner)
-        if ball.left <= 0:
-            score_b += 1
-            if score_b >= WINNING_SCORE:
-                game_over = True
-                winner = "Player Magenta" # Spieler B
-            else:
-                ball_reset()
-        if ball.right >= SCREEN_WIDTH:
-            score_a += 1
-            if score_a >= WINNING_SCORE:
-                game_over = True
-                winner = "Player Cyan" # Spieler A
-            else:
-                ball_reset()
-
-
-    # --- Partikel Logik ---
-    # Update Partikel Positionen und Lebensdauer
-    live_particles = []
-    for p in particles:
-        p.update()
-        if p.lifespan > 0:
-            live_particles.append(p)
-    particles = live_particles
+    # --- Simulation in festen Schritten ---
+    steps = 0
+    while accumulator_ms >= SIMULATION_STEP_MS and steps < MAX_STEPS_PER_FRAME:
+        update()
+        accumulator_ms -= SIMULATION_STEP_MS
+        steps += 1
+    if steps == MAX_STEPS_PER_FRAME:
+        accumulator_ms = min(accumulator_ms, SIMULATION_STEP_MS) # Rückstand verwerfen (Spiel läuft kurz langsamer)
 
 
     # --- Zeichnen ---
-    draw_elements()
+    draw_elements(accumulator_ms / SIMULATION_STEP_MS)
 
     # Game Over Bildschirm
     if game_over:
@@ -356,9 +436,6 @@ while running:
     # Bildschirm aktualisieren
     pygame.display.flip()
 
-    # Framerate begrenzen
-    clock.tick(60) # 60 Frames pro Sekunde
-
 # --- Spiel beenden ---
 pygame.quit()
 sys.exit()
\ No newline at end of file
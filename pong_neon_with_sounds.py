@@ -2,9 +2,8 @@ import pygame
 import sys
 import random
 import math
-import wave  # Für WAV-Datei-Erstellung
-import numpy as np # Für Sound-Daten-Generierung
-import os # Zum Prüfen, ob Dateien existieren
+from collision import swept_circle_rect # Kontinuierliche Kollision (kein Durchtunneln)
+from sound_bank import SoundBank, ChannelPool, PITCH_STEP, pitch_for_speed # Sounds im Speicher erzeugen
 
 # --- Konstanten ---
 # (Unverändert von der vorherigen Version)
@@ -30,6 +29,14 @@ PADDLE_SPEED = 8
 BALL_SPEED_X_INITIAL = 6
 BALL_SPEED_Y_INITIAL = 6
 BALL_SPEED_INCREASE = 0.2
+BALL_SPEED_MAX = 15
+SERVE_DELAY_MS = 600 # Pause nach einem Punkt, bevor der Ball losfliegt
+# Feste Simulationsrate (Geschwindigkeiten in Pixel pro Schritt), gezeichnet wird bis MAX_FPS mit Interpolation
+SIMULATION_HZ = 60
+SIMULATION_STEP_MS = 1000 / SIMULATION_HZ
+MAX_FPS = 144 # 0 = unbegrenzt
+MAX_STEPS_PER_FRAME = 5
+SOUND_PITCH_MAX = 1.5 # Tonhöhe der Treffer-Sounds bei BALL_SPEED_MAX
 WINNING_SCORE = 5
 FLASH_DURATION = 8
 PARTICLE_LIFESPAN = 25
@@ -39,91 +46,24 @@ PADDLE_HIT_PARTICLES = 20
 WALL_HIT_PARTICLES = 8
 SCORE_PARTICLES = 40
 
-# --- Sounddatei-Generator ---
-def generate_wav(filename, duration_ms, frequency, amplitude=16000, framerate=44100, fade_ms=5):
-    """Generiert eine einfache WAV-Datei mit einem Sinuston und Fade-in/out."""
-    if os.path.exists(filename):
-        print(f"Datei {filename} existiert bereits, wird nicht überschrieben.")
-        return
-
-    print(f"Generiere Sounddatei: {filename}...")
-    n_samples = int(framerate * duration_ms / 1000.0)
-    t = np.linspace(0, duration_ms / 1000.0, n_samples, endpoint=False)
-    signal = amplitude * np.sin(2 * np.pi * frequency * t)
-
-    # Einfaches lineares Fade-in/Fade-out, um Klicks zu vermeiden
-    fade_samples = int(framerate * fade_ms / 1000.0)
-    if n_samples > 2 * fade_samples:
-        fade_in = np.linspace(0, 1, fade_samples)
-        fade_out = np.linspace(1, 0, fade_samples)
-        signal[:fade_samples] *= fade_in
-        signal[-fade_samples:] *= fade_out
-    elif n_samples > 0: # Kurzer Sound, nur fade-in/out überlappend
-         fade = np.linspace(0, 1, n_samples // 2)
-         signal[:n_samples // 2] *= fade
-         fade = np.linspace(1, 0, n_samples - n_samples // 2)
-         signal[n_samples // 2:] *= fade
-
-
-    # Konvertieren zu 16-bit PCM
-    signal_int = np.clip(signal, -32767, 32767).astype(np.int16)
-    signal_bytes = signal_int.tobytes()
-
-    try:
-        with wave.open(filename, 'w') as wf:
-            wf.setnchannels(1)  # Mono
-            wf.setsampwidth(2)  # 16-bit (2 bytes)
-            wf.setframerate(framerate)
-            wf.setnframes(n_samples)
-            wf.setcomptype('NONE', 'not compressed')
-            wf.writeframes(signal_bytes)
-        print(f"{filename} erfolgreich generiert.")
-    except Exception as e:
-        print(f"Fehler beim Generieren von {filename}: {e}")
-
-
-# --- Sounddateien definieren und ggf. generieren ---
-PADDLE_HIT_SOUND_FILE = "paddle_hit.wav"
-WALL_HIT_SOUND_FILE = "wall_hit.wav"
-SCORE_SOUND_FILE = "score.wav"
-
-# Generiere die Sounds, wenn sie nicht existieren
-# (Parameter können angepasst werden für anderen Klang)
-generate_wav(PADDLE_HIT_SOUND_FILE, duration_ms=50, frequency=1200)
-generate_wav(WALL_HIT_SOUND_FILE, duration_ms=60, frequency=600)
-generate_wav(SCORE_SOUND_FILE, duration_ms=150, frequency=1000) # Etwas längerer Ton für Punkt
-
-
 # --- Spiel Setup ---
 pygame.init()
 
-# Soundeffekte laden (nachdem sie potenziell generiert wurden)
+# Soundeffekte direkt im Speicher erzeugen (keine WAV-Dateien, siehe sound_bank.py)
 sound_enabled = False
+sound_bank = None
 try:
     pygame.mixer.init()
-    if os.path.exists(PADDLE_HIT_SOUND_FILE):
-        hit_sound = pygame.mixer.Sound(PADDLE_HIT_SOUND_FILE)
-    else: raise FileNotFoundError(f"{PADDLE_HIT_SOUND_FILE} nicht gefunden oder generiert.")
-
-    if os.path.exists(WALL_HIT_SOUND_FILE):
-        wall_sound = pygame.mixer.Sound(WALL_HIT_SOUND_FILE)
-    else: raise FileNotFoundError(f"{WALL_HIT_SOUND_FILE} nicht gefunden oder generiert.")
-
-    if os.path.exists(SCORE_SOUND_FILE):
-        score_sound = pygame.mixer.Sound(SCORE_SOUND_FILE)
-    else: raise FileNotFoundError(f"{SCORE_SOUND_FILE} nicht gefunden oder generiert.")
-
+    # Feste Kanäle mit Priorität (Punkt > Paddel > Wand), damit schnelle Wandtreffer nichts verdrängen
+    sound_bank = SoundBank(channel_pool=ChannelPool())
+    # Alle Tonhöhen bis SOUND_PITCH_MAX vorab erzeugen (dauert nur Millisekunden)
+    sound_bank.prewarm([1.0 + i * PITCH_STEP for i in range(round((SOUND_PITCH_MAX - 1.0) / PITCH_STEP) + 1)])
     sound_enabled = True
-    print("Sounds erfolgreich geladen.")
-    # Optional: Lautstärke anpassen
-    # hit_sound.set_volume(0.6)
-    # wall_sound.set_volume(0.5)
-    # score_sound.set_volume(0.7)
-
-except (pygame.error, FileNotFoundError) as e:
-    print(f"Warnung: Sounds konnten nicht initialisiert/geladen werden: {e}")
+    print(f"Sounds erfolgreich erzeugt ({len(sound_bank)} Varianten).")
+
+except pygame.error as e:
+    print(f"Warnung: Sounds konnten nicht initialisiert werden: {e}")
     print("Spiel läuft ohne Sound.")
-    hit_sound, wall_sound, score_sound = None, None, None # Sicherstellen, dass Variablen existieren
 
 
 screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
@@ -152,6 +92,13 @@ paddle_a_flash_timer = 0
 paddle_b_flash_timer = 0
 ball_flash_timer = 0
 particles = []
+# Aufschlag-Countdown: Solange > 0, wartet der Ball in der Mitte.
+# Die Schleife läuft dabei weiter (Partikel, Paddel, Eingaben).
+serve_timer_ms = 0
+# Positionen vor dem letzten Simulationsschritt (zum Interpolieren beim Zeichnen)
+ball_prev = ball.topleft
+paddle_a_prev = paddle_a.topleft
+paddle_b_prev = paddle_b.topleft
 
 # --- Partikel Klasse ---
 class Particle:
@@ -203,13 +150,14 @@ def create_particles(x, y, base_color, count):
 
 
 def ball_reset():
-    global ball_dx, ball_dy, current_ball_speed_x, current_ball_speed_y
+    global ball_dx, ball_dy, current_ball_speed_x, current_ball_speed_y, serve_timer_ms, ball_prev
     ball.center = (SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2)
+    ball_prev = ball.topleft # Nicht vom alten Ort zur Mitte interpolieren
     create_particles(ball.centerx, ball.centery, random.choice(PARTICLE_COLORS), SCORE_PARTICLES)
-    if sound_enabled and score_sound:
-        score_sound.play()
+    if sound_enabled:
+        sound_bank.play("score")
 
-    pygame.time.wait(600)
+    serve_timer_ms = SERVE_DELAY_MS # Pause ohne die Schleife anzuhalten
 
     current_ball_speed_x = BALL_SPEED_X_INITIAL
     current_ball_speed_y = BALL_SPEED_Y_INITIAL
@@ -217,8 +165,24 @@ def ball_reset():
     ball_dy = current_ball_speed_y * random.choice((1, -1))
 
 
-def draw_elements():
-    global paddle_a_flash_timer, paddle_b_flash_timer, ball_flash_timer
+def store_previous_positions():
+    """Merkt sich die Positionen vor einem Simulationsschritt."""
+    global ball_prev, paddle_a_prev, paddle_b_prev
+    ball_prev = ball.topleft
+    paddle_a_prev = paddle_a.topleft
+    paddle_b_prev = paddle_b.topleft
+
+
+def interpolated(rect, prev_topleft, alpha):
+    """Rechteck an der Zwischenposition alpha (0..1) zwischen letztem und aktuellem Schritt."""
+    drawn = rect.copy()
+    drawn.x = round(prev_topleft[0] + (rect.x - prev_topleft[0]) * alpha)
+    drawn.y = round(prev_topleft[1] + (rect.y - prev_topleft[1]) * alpha)
+    return drawn
+
+
+def draw_elements(alpha=1.0):
+    """Zeichnet alles, Ball und Paddel interpoliert zwischen den Simulationsschritten."""
     screen.fill(DARK_BG)
     mid_x = SCREEN_WIDTH // 2
     dash_length = 10
@@ -234,23 +198,21 @@ def draw_elements():
     current_paddle_a_color = PADDLE_A_COLOR
     if paddle_a_flash_timer > 0:
         current_paddle_a_color = WHITE if paddle_a_flash_timer % 4 < 2 else PADDLE_A_COLOR
-        paddle_a_flash_timer -= 1
 
     current_paddle_b_color = PADDLE_B_COLOR
     if paddle_b_flash_timer > 0:
         current_paddle_b_color = WHITE if paddle_b_flash_timer % 4 < 2 else PADDLE_B_COLOR
-        paddle_b_flash_timer -= 1
 
     current_ball_color = BALL_COLOR_DEFAULT
     if ball_flash_timer > 0:
         current_ball_color = BALL_COLOR_HIT
-        ball_flash_timer -= 1
 
     # Objekte zeichnen
-    pygame.draw.rect(screen, current_paddle_a_color, paddle_a, border_radius=5)
-    pygame.draw.rect(screen, current_paddle_b_color, paddle_b, border_radius=5)
-    pygame.draw.ellipse(screen, current_ball_color, ball)
-    inner_ball_rect = ball.inflate(-BALL_SIZE * 0.4, -BALL_SIZE * 0.4)
+    pygame.draw.rect(screen, current_paddle_a_color, interpolated(paddle_a, paddle_a_prev, alpha), border_radius=5)
+    pygame.draw.rect(screen, current_paddle_b_color, interpolated(paddle_b, paddle_b_prev, alpha), border_radius=5)
+    ball_drawn = interpolated(ball, ball_prev, alpha)
+    pygame.draw.ellipse(screen, current_ball_color, ball_drawn)
+    inner_ball_rect = ball_drawn.inflate(-BALL_SIZE * 0.4, -BALL_SIZE * 0.4)
     pygame.draw.ellipse(screen, WHITE, inner_ball_rect)
 
     # Scores
@@ -260,25 +222,12 @@ def draw_elements():
     screen.blit(score_b_text, (SCREEN_WIDTH * 0.75 - score_b_text.get_width(), 20))
 
 
-# --- Spiel Loop ---
-running = True
-while running:
-    # --- Event Handling ---
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
-        if event.type == pygame.KEYDOWN:
-            if event.key == pygame.K_ESCAPE:
-                 running = False
-            if game_over and event.key == pygame.K_RETURN:
-                 score_a = 0
-                 score_b = 0
-                 game_over = False
-                 winner = ""
-                 paddle_a.centery = SCREEN_HEIGHT // 2
-                 paddle_b.centery = SCREEN_HEIGHT // 2
-                 particles.clear()
-                 ball_reset() # Startet mit Sound & Partikeln
+def update():
+    """Ein Simulationsschritt (1 / SIMULATION_HZ Sekunden)."""
+    global ball_dx, ball_dy, current_ball_speed_x, current_ball_speed_y, score_a, score_b, game_over, winner
+    global paddle_a_flash_timer, paddle_b_flash_timer, ball_flash_timer, particles, serve_timer_ms
+
+    store_previous_positions()
 
     # --- Spiel Logik (nur wenn nicht Game Over) ---
     if not game_over:
@@ -289,9 +238,26 @@ while running:
         if keys[pygame.K_UP] and paddle_b.top > 0: paddle_b.y -= PADDLE_SPEED
         if keys[pygame.K_DOWN] and paddle_b.bottom < SCREEN_HEIGHT: paddle_b.y += PADDLE_SPEED
 
-        # Ball Bewegung
-        ball.x += ball_dx
-        ball.y += ball_dy
+        # Ball Bewegung (erst nach Ablauf des Aufschlag-Countdowns)
+        # Die ganze Bahn wird gegen das Paddel geprüft, auf das der Ball zufliegt
+        # (swept), statt nach dem Schritt mit einer Toleranz auf Überlappung zu testen.
+        paddle_contact = None
+        remaining = 0.0 # Restanteil der Bewegung nach dem Abprall
+        if serve_timer_ms > 0:
+            serve_timer_ms -= SIMULATION_STEP_MS
+        else:
+            paddle = paddle_a if ball_dx < 0 else paddle_b
+            hit = swept_circle_rect(ball.centerx, ball.centery, ball_dx, ball_dy, BALL_RADIUS, paddle)
+            if hit is None:
+                ball.x += ball_dx
+                ball.y += ball_dy
+            else:
+                ball.center = (round(ball.centerx + ball_dx * hit.t), round(ball.centery + ball_dy * hit.t))
+                remaining = 1.0 - hit.t
+                if hit.normal_x * ball_dx < 0: # Vorderseite (oder Ecke) getroffen
+                    paddle_contact = paddle
+                else: # Ober- oder Unterkante: nur vertikal abprallen
+                    ball_dy *= -1
 
         # Ball Kollision mit Wänden (Oben/Unten)
         if ball.top <= 0 or ball.bottom >= SCREEN_HEIGHT:
@@ -300,48 +266,54 @@ while running:
             # Sicherstellen, dass der Treffpunkt für Partikel innerhalb des Screens liegt
             hit_y = max(BALL_RADIUS, min(SCREEN_HEIGHT - BALL_RADIUS, ball.centery))
             create_particles(ball.centerx, hit_y, BALL_COLOR_HIT, WALL_HIT_PARTICLES)
-            if sound_enabled and wall_sound: wall_sound.play()
+            if sound_enabled:
+                sound_bank.play("wall", pitch_for_speed(current_ball_speed_y, BALL_SPEED_Y_INITIAL,
+                                                        BALL_SPEED_MAX, SOUND_PITCH_MAX))
             if ball.top < 0: ball.top = 0
             if ball.bottom > SCREEN_HEIGHT: ball.bottom = SCREEN_HEIGHT
 
-        # Ball Kollision mit Paddeln
-        collision_tolerance = abs(ball_dx) * 1.1 if ball_dx != 0 else 10 # Dynamische Toleranz
+        # Ball Kollision mit Paddeln (Kontakt oben entlang der Bahn bestimmt)
         paddle_hit = False
 
-        if paddle_a.colliderect(ball) and ball_dx < 0:
-             if abs(paddle_a.right - ball.left) < collision_tolerance:
-                 ball_dx *= -1
-                 relative_intersect_y = (paddle_a.centery - ball.centery)
-                 normalized_relative_intersect_y = relative_intersect_y / (PADDLE_HEIGHT / 2)
-                 bounce_angle = normalized_relative_intersect_y * (math.pi / 3.5) # Etwas flacherer max Winkel
-                 current_ball_speed_x = min(abs(current_ball_speed_x) + BALL_SPEED_INCREASE, 15) # Max Speed X
-                 current_ball_speed_y = min(abs(current_ball_speed_y) + BALL_SPEED_INCREASE, 15) # Max Speed Y
-                 ball_dx = current_ball_speed_x * math.cos(bounce_angle)
-                 ball_dy = current_ball_speed_y * -math.sin(bounce_angle)
-                 paddle_a_flash_timer = FLASH_DURATION
-                 ball.left = paddle_a.right # Korrigiere Position
-                 paddle_hit = True
-                 create_particles(ball.midright[0], ball.centery, PADDLE_A_COLOR, PADDLE_HIT_PARTICLES)
-
-
-        elif paddle_b.colliderect(ball) and ball_dx > 0:
-            if abs(paddle_b.left - ball.right) < collision_tolerance:
-                ball_dx *= -1
-                relative_intersect_y = (paddle_b.centery - ball.centery)
-                normalized_relative_intersect_y = relative_intersect_y / (PADDLE_HEIGHT / 2)
-                bounce_angle = normalized_relative_intersect_y * (math.pi / 3.5)
-                current_ball_speed_x = min(abs(current_ball_speed_x) + BALL_SPEED_INCREASE, 15)
-                current_ball_speed_y = min(abs(current_ball_speed_y) + BALL_SPEED_INCREASE, 15)
-                ball_dx = current_ball_speed_x * -math.cos(bounce_angle)
-                ball_dy = current_ball_speed_y * -math.sin(bounce_angle)
-                paddle_b_flash_timer = FLASH_DURATION
-                ball.right = paddle_b.left # Korrigiere Position
-                paddle_hit = True
-                create_particles(ball.midleft[0], ball.centery, PADDLE_B_COLOR, PADDLE_HIT_PARTICLES)
+        if paddle_contact is paddle_a:
+            ball_dx *= -1
+            relative_intersect_y = (paddle_a.centery - ball.centery)
+            normalized_relative_intersect_y = relative_intersect_y / (PADDLE_HEIGHT / 2)
+            bounce_angle = normalized_relative_intersect_y * (math.pi / 3.5) # Etwas flacherer max Winkel
+            current_ball_speed_x = min(abs(current_ball_speed_x) + BALL_SPEED_INCREASE, BALL_SPEED_MAX) # Max Speed X
+            current_ball_speed_y = min(abs(current_ball_speed_y) + BALL_SPEED_INCREASE, BALL_SPEED_MAX) # Max Speed Y
+            ball_dx = current_ball_speed_x * math.cos(bounce_angle)
+            ball_dy = current_ball_speed_y * -math.sin(bounce_angle)
+            paddle_a_flash_timer = FLASH_DURATION
+            ball.left = paddle_a.right # Korrigiere Position
+            paddle_hit = True
+            create_particles(ball.midright[0], ball.centery, PADDLE_A_COLOR, PADDLE_HIT_PARTICLES)
+
+
+        elif paddle_contact is paddle_b:
+            ball_dx *= -1
+            relative_intersect_y = (paddle_b.centery - ball.centery)
+            normalized_relative_intersect_y = relative_intersect_y / (PADDLE_HEIGHT / 2)
+            bounce_angle = normalized_relative_intersect_y * (math.pi / 3.5)
+            current_ball_speed_x = min(abs(current_ball_speed_x) + BALL_SPEED_INCREASE, BALL_SPEED_MAX)
+            current_ball_speed_y = min(abs(current_ball_speed_y) + BALL_SPEED_INCREASE, BALL_SPEED_MAX)
+            ball_dx = current_ball_speed_x * -math.cos(bounce_angle)
+            ball_dy = current_ball_speed_y * -math.sin(bounce_angle)
+            paddle_b_flash_timer = FLASH_DURATION
+            ball.right = paddle_b.left # Korrigiere Position
+            paddle_hit = True
+            create_particles(ball.midleft[0], ball.centery, PADDLE_B_COLOR, PADDLE_HIT_PARTICLES)
 
         if paddle_hit:
             ball_flash_timer = FLASH_DURATION
-            if sound_enabled and hit_sound: hit_sound.play()
+            if sound_enabled: # Höherer Ton bei schnellerem Ball
+                sound_bank.play("paddle", pitch_for_speed(current_ball_speed_x, BALL_SPEED_X_INITIAL,
+                                                          BALL_SPEED_MAX, SOUND_PITCH_MAX))
+
+        # Rest der Bewegung nach einem Paddel-Abprall mit der neuen Richtung
+        if remaining > 0:
+            ball.x += ball_dx * remaining
+            ball.y += ball_dy * remaining
 
 
         # Ball aus dem Spielfeld (Punkt für Gegner)
@@ -363,6 +335,11 @@ while running:
             ball_reset()
 
 
+    # --- Effekte (Blink-Timer in Simulationsschritten) ---
+    if paddle_a_flash_timer > 0: paddle_a_flash_timer -= 1
+    if paddle_b_flash_timer > 0: paddle_b_flash_timer -= 1
+    if ball_flash_timer > 0: ball_flash_timer -= 1
+
     # --- Partikel Logik ---
     live_particles = []
     for p in particles:
@@ -372,8 +349,43 @@ while running:
     particles = live_particles
 
 
+# --- Spiel Loop ---
+accumulator_ms = 0.0 # Noch nicht simulierte Zeit
+running = True
+while running:
+    # Framerate begrenzen (MAX_FPS) und vergangene Zeit messen
+    accumulator_ms += clock.tick(MAX_FPS)
+
+    # --- Event Handling ---
+    for event in pygame.event.get():
+        if event.type == pygame.QUIT:
+            running = False
+        if event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_ESCAPE:
+                 running = False
+            if game_over and event.key == pygame.K_RETURN:
+                 score_a = 0
+                 score_b = 0
+                 game_over = False
+                 winner = ""
+                 paddle_a.centery = SCREEN_HEIGHT // 2
+                 paddle_b.centery = SCREEN_HEIGHT // 2
+                 particles.clear()
+                 ball_reset() # Startet mit Sound & Partikeln
+                 store_previous_positions()
+
+    # --- Simulation in festen Schritten ---
+    steps = 0
+    while accumulator_ms >= SIMULATION_STEP_MS and steps < MAX_STEPS_PER_FRAME:
+        update()
+        accumulator_ms -= SIMULATION_STEP_MS
+        steps += 1
+    if steps == MAX_STEPS_PER_FRAME:
+        accumulator_ms = min(accumulator_ms, SIMULATION_STEP_MS) # Rückstand verwerfen
+
+
     # --- Zeichnen ---
-    draw_elements()
+    draw_elements(accumulator_ms / SIMULATION_STEP_MS)
 
     # Game Over Bildschirm
     if game_over:
@@ -391,9 +403,8 @@ while running:
     # Bildschirm aktualisieren
     pygame.display.flip()
 
-    # Framerate begrenzen
-    clock.tick(60)
-
 # --- Spiel beenden ---
+if sound_enabled:
+    print(sound_bank.channel_pool.summary())
 pygame.quit()
 sys.exit()
\ No newline at end of file
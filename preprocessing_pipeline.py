@@ -0,0 +1,188 @@
+import time
+
+import cv2
+import numpy as np
+
+
+# --- Stufen ---
+# Jede Stufe verarbeitet alle ROIs eines Bildes auf einmal. Die ROIs liegen
+# gestapelt in einem Array (Anzahl, Höhe, Breite[, Kanäle]). Punktweise Stufen
+# (Farbumwandlung, fester Schwellwert) laufen als ein einziger OpenCV-Aufruf
+# über den ganzen Stapel, Stufen mit Nachbarschaft (Blur, adaptiver Schwellwert,
+# Morphologie) pro ROI, damit nichts über die ROI-Grenzen hinweg verschmiert.
+# Alle Stufen schreiben mit dst= in vorab angelegte Puffer.
+
+class ScaleStage:
+    name = "scale"
+
+    def __init__(self, factor, interpolation=cv2.INTER_CUBIC):
+        self.factor = factor
+        self.interpolation = interpolation
+
+    def describe(self):
+        return f"Skalieren x{self.factor}"
+
+    def output_shape(self, shape):
+        n, h, w = shape[:3]
+        return (n, int(h * self.factor), int(w * self.factor)) + tuple(shape[3:])
+
+    def apply(self, src, dst):
+        size = (dst.shape[2], dst.shape[1])
+        for i in range(len(src)):
+            cv2.resize(src[i], size, dst=dst[i], interpolation=self.interpolation)
+
+
+class GrayscaleStage:
+    name = "grayscale"
+
+    def describe(self):
+        return "Graustufen"
+
+    def output_shape(self, shape):
+        return tuple(shape[:3])
+
+    def apply(self, src, dst):
+        if src.ndim == 3: # Bereits Graustufen (z.B. direkt so dekodiert)
+            np.copyto(dst, src)
+            return
+        n, h, w = dst.shape
+        # Punktweise: ein Aufruf für den ganzen Stapel
+        cv2.cvtColor(src.reshape(n * h, w, src.shape[3]), cv2.COLOR_BGR2GRAY, dst=dst.reshape(n * h, w))
+
+
+class BlurStage:
+    name = "blur"
+
+    def __init__(self, method='median', kernel_size=3):
+        if kernel_size % 2 == 0 or kernel_size < 1:
+            print("WARNUNG: Blur Kernel Size muss ungerade und >= 1 sein. Setze auf 3.")
+            kernel_size = 3
+        self.method = method
+        self.kernel_size = kernel_size
+
+    def describe(self):
+        return f"{self.method} Blur {self.kernel_size}x{self.kernel_size}"
+
+    def output_shape(self, shape):
+        return tuple(shape)
+
+    def apply(self, src, dst):
+        k = self.kernel_size
+        for i in range(len(src)):
+            if self.method == 'median':
+                cv2.medianBlur(src[i], k, dst=dst[i])
+            else:
+                cv2.GaussianBlur(src[i], (k, k), 0, dst=dst[i])
+
+
+class ThresholdStage:
+    """Schwellwert 'adaptive', 'otsu' oder 'binary'. Erwartet Graustufen."""
+    name = "threshold"
+
+    def __init__(self, method, invert=True, block_size=15, c=7, binary_value=127):
+        self.method = method
+        self.invert = invert
+        self.block_size = block_size
+        self.c = c
+        self.binary_value = binary_value
+        self.last_otsu_values = [] # Von Otsu bestimmte Schwellwerte des letzten Durchlaufs
+
+    def describe(self):
+        if self.method == 'adaptive':
+            details = f"Block: {self.block_size}, C: {self.c}"
+        elif self.method == 'binary':
+            details = f"Wert: {self.binary_value}"
+        else:
+            details = "automatisch"
+        return f"{self.method} Threshold ({details}, Invertiert: {self.invert})"
+
+    def output_shape(self, shape):
+        return tuple(shape)
+
+    def apply(self, src, dst):
+        thresh_type = cv2.THRESH_BINARY_INV if self.invert else cv2.THRESH_BINARY
+        if self.method == 'adaptive':
+            for i in range(len(src)):
+                cv2.adaptiveThreshold(src[i], 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, thresh_type,
+                                      self.block_size, self.c, dst=dst[i])
+        elif self.method == 'otsu':
+            # Otsu bestimmt den Schwellwert pro ROI
+            self.last_otsu_values = [cv2.threshold(src[i], 0, 255, thresh_type + cv2.THRESH_OTSU, dst=dst[i])[0]
+                                     for i in range(len(src))]
+        else:
+            # Fester Schwellwert ist punktweise: ein Aufruf für den ganzen Stapel
+            n, h, w = src.shape
+            cv2.threshold(src.reshape(n * h, w), self.binary_value, 255, thresh_type, dst=dst.reshape(n * h, w))
+
+
+class MorphologyStage:
+    name = "morphology"
+
+    def __init__(self, operation='close', kernel_size=(2, 2)):
+        if kernel_size[0] <= 0 or kernel_size[1] <= 0:
+            print("WARNUNG: Morph Kernel Size ungültig. Setze auf (2,2).")
+            kernel_size = (2, 2)
+        self.operation = operation
+        self.kernel = np.ones(kernel_size, np.uint8) # Einmal anlegen statt pro Bild
+        self.op = cv2.MORPH_OPEN if operation == 'open' else cv2.MORPH_CLOSE
+
+    def describe(self):
+        return f"Morphologie {self.operation} {self.kernel.shape}"
+
+    def output_shape(self, shape):
+        return tuple(shape)
+
+    def apply(self, src, dst):
+        for i in range(len(src)):
+            cv2.morphologyEx(src[i], self.op, self.kernel, dst=dst[i])
+
+
+# --- Pipeline ---
+class PreprocessingPipeline:
+    """Führt die Stufen nacheinander auf allen ROIs eines Bildes aus.
+
+    Die Puffer werden beim ersten Bild angelegt und bei jedem weiteren Bild
+    gleicher Größe wiederverwendet. Das Ergebnis von run() ist daher nur bis
+    zum nächsten Aufruf gültig (bei Bedarf .copy() verwenden).
+    """
+
+    def __init__(self, stages):
+        self.stages = list(stages)
+        self._input_buffer = None
+        self._buffers = [None] * len(self.stages)
+        self.stage_times = {stage.name: 0.0 for stage in self.stages} # Gesamtzeit je Stufe in s
+        self.runs = 0
+
+    def describe(self):
+        return " -> ".join(stage.describe() for stage in self.stages) or "keine Vorverarbeitung"
+
+    @staticmethod
+    def _buffer(buffer, shape, dtype):
+        if buffer is None or buffer.shape != shape or buffer.dtype != dtype:
+            return np.empty(shape, dtype)
+        return buffer
+
+    def run(self, roi_images):
+        """Verarbeitet gleich große ROIs gemeinsam. Gibt ein Array (Anzahl, Höhe, Breite[, Kanäle]) zurück."""
+        if len(roi_images) == 0:
+            raise ValueError("Keine ROIs übergeben")
+        shape = (len(roi_images),) + roi_images[0].shape
+        if any(img.shape != roi_images[0].shape for img in roi_images):
+            raise ValueError("Alle ROIs müssen gleich groß sein, um gestapelt zu werden")
+
+        self._input_buffer = self._buffer(self._input_buffer, shape, roi_images[0].dtype)
+        data = np.stack(roi_images, out=self._input_buffer)
+        for index, stage in enumerate(self.stages):
+            start = time.perf_counter()
+            out = self._buffers[index] = self._buffer(self._buffers[index], stage.output_shape(data.shape), np.uint8)
+            stage.apply(data, out)
+            self.stage_times[stage.name] += time.perf_counter() - start
+            data = out
+        self.runs += 1
+        return data
+
+    def timing_summary(self):
+        if not self.runs:
+            return "noch keine Durchläufe"
+        parts = [f"{name}: {total / self.runs * 1000:.2f} ms" for name, total in self.stage_times.items()]
+        return f"Ø pro Bild ({self.runs} Bilder): " + ", ".join(parts)
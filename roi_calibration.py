@@ -0,0 +1,258 @@
+import argparse
+import json
+import os
+import sys
+
+import cv2
+import numpy as np
+
+# --- Konfiguration ---
+# Findet das Ziffernfenster eines Zählers automatisch und teilt es in
+# Ziffernzellen auf, statt ROI_X/ROI_Y/... von Hand auszumessen.
+CALIBRATION_FILE = 'roi_calibration.json'  # Ergebnis pro Kamera
+NUM_DIGITS = 6
+DRIFT_TOLERANCE_PX = 3.0      # Verschiebung (Pixel im Originalbild), ab der neu kalibriert wird
+DRIFT_MIN_RESPONSE = 0.1      # Darunter ist phaseCorrelate unsicher -> neu kalibrieren
+DRIFT_CHECK_WIDTH = 160       # Breite des verkleinerten Referenzbilds für den Drift-Test
+WINDOW_MIN_ASPECT = 2.0       # Ziffernfenster: Breite/Höhe zwischen diesen Werten
+WINDOW_MAX_ASPECT = 12.0
+WINDOW_MIN_AREA = 0.01        # Mindestfläche des Fensters (Anteil am Bild)
+DIGIT_MIN_HEIGHT = 0.4        # Ziffer muss mindestens so hoch sein wie dieser Anteil der Fensterhöhe
+CELL_PADDING = 2              # Rand um jede Ziffernzelle (Pixel)
+
+
+# --- Ziffernfenster finden (Konturanalyse) ---
+def find_digit_window(gray):
+    """Sucht das Ziffernfenster als breites Rechteck mit vielen Kanten. Gibt (x, y, w, h) oder None zurück."""
+    img_h, img_w = gray.shape
+    # Kanten der Ziffern waagrecht zu einem Band verbinden
+    edges = cv2.Canny(cv2.GaussianBlur(gray, (5, 5), 0), 50, 150)
+    kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (max(3, img_w // 40), 3))
+    band = cv2.morphologyEx(edges, cv2.MORPH_CLOSE, kernel, iterations=2)
+    contours, _ = cv2.findContours(band, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+    best, best_score = None, 0.0
+    for contour in contours:
+        x, y, w, h = cv2.boundingRect(contour)
+        if h == 0 or w * h < WINDOW_MIN_AREA * img_w * img_h:
+            continue
+        if not WINDOW_MIN_ASPECT <= w / h <= WINDOW_MAX_ASPECT:
+            continue
+        # Bewertung: Fläche x Kantendichte (Ziffern erzeugen viele Kanten)
+        density = cv2.countNonZero(edges[y:y + h, x:x + w]) / float(w * h)
+        score = w * h * density
+        if score > best_score:
+            best, best_score = (x, y, w, h), score
+    return best
+
+
+# --- Ziffernzellen (Connected Components, Projektionsprofil) ---
+def _binarize(window):
+    """Otsu in beiden Polaritäten; Ziffern sind der kleinere Vordergrund."""
+    _, binary = cv2.threshold(window, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+    if cv2.countNonZero(binary) > binary.size / 2:
+        binary = cv2.bitwise_not(binary)
+    return binary
+
+
+def cells_from_components(binary, num_digits):
+    """Ziffern als zusammenhängende Komponenten mit ausreichender Höhe. Gibt x-Bereiche oder None zurück."""
+    win_h = binary.shape[0]
+    count, _, stats, _ = cv2.connectedComponentsWithStats(binary, connectivity=8)
+    spans = []
+    for label in range(1, count):
+        x, y, w, h, area = stats[label]
+        if h >= DIGIT_MIN_HEIGHT * win_h and h < win_h and area > 0.02 * w * h:
+            spans.append([x, x + w])
+    # Überlappende Teile einer Ziffer (z.B. unterbrochene Striche) zusammenfassen
+    spans.sort()
+    merged = []
+    for start, end in spans:
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged if len(merged) == num_digits else None
+
+
+def cells_from_profile(binary, num_digits):
+    """Trennt Ziffern an Spalten ohne Vordergrund (vertikales Projektionsprofil)."""
+    profile = (binary > 0).sum(axis=0)
+    ink = profile > max(1, 0.05 * binary.shape[0])
+    spans, start = [], None
+    for x, has_ink in enumerate(ink):
+        if has_ink and start is None:
+            start = x
+        elif not has_ink and start is not None:
+            spans.append([start, x])
+            start = None
+    if start is not None:
+        spans.append([start, len(ink)])
+    # Schmale Reste (Rauschen, Trennstriche) verwerfen
+    min_width = binary.shape[1] / (num_digits * 6.0)
+    spans = [span for span in spans if span[1] - span[0] >= min_width]
+    return spans if len(spans) == num_digits else None
+
+
+def split_digit_cells(window, num_digits):
+    """Teilt ein Graustufen-Ziffernfenster in num_digits Zellen. Gibt (x-Bereiche, Methode) zurück."""
+    binary = _binarize(window)
+    spans = cells_from_components(binary, num_digits)
+    if spans is not None:
+        return spans, "components"
+    spans = cells_from_profile(binary, num_digits)
+    if spans is not None:
+        return spans, "profile"
+    # Notlösung: gleich breite Zellen
+    step = window.shape[1] / float(num_digits)
+    return [[int(i * step), int((i + 1) * step)] for i in range(num_digits)], "equal"
+
+
+def calibrate(gray, num_digits=NUM_DIGITS):
+    """Findet Ziffernfenster und Zellen. Gibt ein Kalibrier-Dict zurück oder None."""
+    window = find_digit_window(gray)
+    if window is None:
+        return None
+    wx, wy, ww, wh = window
+    spans, method = split_digit_cells(gray[wy:wy + wh, wx:wx + ww], num_digits)
+    img_h, img_w = gray.shape
+    # Alle Zellen gleich breit (um die Ziffer zentriert), damit sie gestapelt
+    # verarbeitet werden können (preprocessing_pipeline.py)
+    cell_w = min(img_w, max(end - start for start, end in spans) + 2 * CELL_PADDING)
+    cells = []
+    for start, end in spans:
+        x = wx + (start + end) // 2 - cell_w // 2
+        x = min(max(0, x), img_w - cell_w)
+        cells.append([int(x), int(wy), int(cell_w), int(wh)])
+    return {"window": [int(v) for v in window], "cells": cells, "method": method,
+            "image_size": [img_w, img_h]}
+
+
+# --- Drift-Erkennung ---
+def drift_thumbnail(gray):
+    """Verkleinertes Bild für phaseCorrelate (float32). Gibt (Bild, Skalierung) zurück."""
+    scale = DRIFT_CHECK_WIDTH / float(gray.shape[1])
+    small = cv2.resize(gray, (DRIFT_CHECK_WIDTH, max(1, int(gray.shape[0] * scale))), interpolation=cv2.INTER_AREA)
+    return small.astype(np.float32), scale
+
+
+def measure_drift(reference, gray):
+    """Verschiebung (dx, dy) in Originalpixeln und Antwortstärke gegenüber dem Referenzbild."""
+    current, scale = drift_thumbnail(gray)
+    if current.shape != reference.shape:
+        return None, 0.0
+    window = cv2.createHanningWindow((reference.shape[1], reference.shape[0]), cv2.CV_32F)
+    (dx, dy), response = cv2.phaseCorrelate(reference, current, window)
+    return (dx / scale, dy / scale), response
+
+
+class ROICalibrator:
+    """Kalibrierte ROIs pro Kamera, gespeichert in einer JSON-Datei.
+
+    Pro Bild wird nur per phaseCorrelate auf einem kleinen Vorschaubild
+    geprüft, ob sich die Kamera verschoben hat. Erst dann wird neu kalibriert.
+    """
+
+    def __init__(self, path=CALIBRATION_FILE, num_digits=NUM_DIGITS, drift_tolerance=DRIFT_TOLERANCE_PX):
+        self.path = path
+        self.num_digits = num_digits
+        self.drift_tolerance = drift_tolerance
+        self.calibrations = {}
+        self._references = {} # Kamera -> Referenz-Vorschaubild (float32)
+        self.calibration_runs = 0
+        self.drift_checks = 0
+        if path and os.path.exists(path):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    self.calibrations = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"WARNUNG: Kalibrierung {path} konnte nicht geladen werden: {e}")
+
+    def save(self):
+        if not self.path:
+            return
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.calibrations, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def _reference(self, camera_id):
+        reference = self._references.get(camera_id)
+        if reference is None:
+            stored = self.calibrations[camera_id].get("reference")
+            if stored is not None:
+                reference = self._references[camera_id] = np.asarray(stored, dtype=np.float32)
+        return reference
+
+    def _needs_calibration(self, camera_id, gray):
+        calibration = self.calibrations.get(camera_id)
+        if calibration is None or calibration.get("num_digits") != self.num_digits:
+            return True
+        if calibration.get("image_size") != [gray.shape[1], gray.shape[0]]:
+            return True
+        reference = self._reference(camera_id)
+        if reference is None:
+            return True
+        self.drift_checks += 1
+        shift, response = measure_drift(reference, gray)
+        if shift is None or response < DRIFT_MIN_RESPONSE:
+            return True
+        return max(abs(shift[0]), abs(shift[1])) > self.drift_tolerance
+
+    def calibrate(self, camera_id, gray):
+        """Kalibriert neu und speichert das Ergebnis. Gibt das Kalibrier-Dict oder None zurück."""
+        self.calibration_runs += 1
+        calibration = calibrate(gray, self.num_digits)
+        if calibration is None:
+            return None
+        reference, _ = drift_thumbnail(gray)
+        calibration["num_digits"] = self.num_digits
+        calibration["reference"] = np.round(reference).astype(int).tolist()
+        self.calibrations[camera_id] = calibration
+        self._references[camera_id] = reference
+        try:
+            self.save()
+        except OSError as e:
+            print(f"WARNUNG: Kalibrierung konnte nicht gespeichert werden: {e}")
+        print(f"INFO: ROIs für '{camera_id}' kalibriert ({calibration['method']}): {calibration['cells']}")
+        return calibration
+
+    def rois(self, camera_id, gray):
+        """Gibt die Ziffernzellen [(x, y, w, h), ...] für ein Graustufenbild zurück oder None."""
+        if self._needs_calibration(camera_id, gray):
+            if self.calibrate(camera_id, gray) is None:
+                print(f"WARNUNG: Kein Ziffernfenster für '{camera_id}' gefunden.")
+                # Lieber die alte Kalibrierung verwenden als gar keine
+                calibration = self.calibrations.get(camera_id)
+                return [tuple(cell) for cell in calibration["cells"]] if calibration else None
+        return [tuple(cell) for cell in self.calibrations[camera_id]["cells"]]
+
+
+# --- Hauptteil des Skripts ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ziffern-ROIs eines Zählerbildes automatisch bestimmen.")
+    parser.add_argument("image", help="z.B. received_original.jpg")
+    parser.add_argument("--digits", type=int, default=NUM_DIGITS)
+    parser.add_argument("--camera", default="default", help="Name der Kamera in der Kalibrierdatei")
+    parser.add_argument("--file", default=CALIBRATION_FILE)
+    args = parser.parse_args()
+
+    image = cv2.imread(args.image)
+    if image is None:
+        print(f"Fehler: Bild konnte nicht geladen werden: '{args.image}'")
+        sys.exit(1)
+    calibrator = ROICalibrator(args.file, args.digits)
+    calibration = calibrator.calibrate(args.camera, cv2.cvtColor(image, cv2.COLOR_BGR2GRAY))
+    if calibration is None:
+        print("Kein Ziffernfenster gefunden. ROIs bitte von Hand ausmessen.")
+        sys.exit(1)
+
+    x, y, w, h = calibration["window"]
+    cv2.rectangle(image, (x, y), (x + w, y + h), (255, 0, 0), 2)
+    print("rois = [")
+    for i, (x, y, w, h) in enumerate(calibration["cells"]):
+        cv2.rectangle(image, (x, y), (x + w, y + h), (0, 255, 0), 1)
+        print(f'    {{"name": "ROI {i + 1}", "x": {x}, "y": {y}, "w": {w}, "h": {h}}},')
+    print("]")
+    cv2.imwrite("roi_calibration.png", image)
+    print("Ergebnis eingezeichnet in roi_calibration.png")
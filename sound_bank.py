@@ -0,0 +1,172 @@
+import numpy as np
+import pygame
+
+# --- Klangdefinitionen ---
+# Die Töne werden direkt im Speicher erzeugt (keine WAV-Dateien).
+# Parameter können angepasst werden für anderen Klang.
+TONES = {
+    "paddle": {"duration_ms": 50, "frequency": 1200},
+    "wall": {"duration_ms": 60, "frequency": 600},
+    "score": {"duration_ms": 150, "frequency": 1000}, # Etwas längerer Ton für Punkt
+}
+AMPLITUDE = 16000
+FADE_MS = 5
+PITCH_STEP = 0.05          # Tonhöhen werden auf dieses Raster gerundet (begrenzt die Anzahl Varianten)
+PITCH_RANGE = (0.5, 2.0)   # Kleinste und größte Tonhöhe (1.0 = Originalfrequenz)
+
+# --- Kanalverwaltung ---
+# Feste Anzahl reservierter Mixer-Kanäle für die Spiel-Sounds. Sind alle belegt,
+# verdrängt ein Sound die älteste Stimme gleicher oder niedrigerer Priorität.
+CHANNEL_POOL_SIZE = 6
+SOUND_PRIORITIES = {"score": 3, "paddle": 2, "wall": 1}  # Höher = wichtiger
+MIN_INTERVAL_MS = {"paddle": 30, "wall": 40}             # Gleiche Ereignisse schneller hintereinander werden verworfen
+
+
+def synthesize(duration_ms, frequency, amplitude=AMPLITUDE, framerate=44100, fade_ms=FADE_MS):
+    """Erzeugt einen Sinuston mit Fade-in/out als 16-bit PCM (Mono, int16)."""
+    n_samples = int(framerate * duration_ms / 1000.0)
+    t = np.arange(n_samples) / framerate
+    signal = amplitude * np.sin(2 * np.pi * frequency * t)
+
+    # Einfaches lineares Fade-in/Fade-out, um Klicks zu vermeiden
+    fade_samples = int(framerate * fade_ms / 1000.0)
+    if n_samples > 2 * fade_samples:
+        signal[:fade_samples] *= np.linspace(0, 1, fade_samples)
+        signal[-fade_samples:] *= np.linspace(1, 0, fade_samples)
+    elif n_samples > 0: # Kurzer Sound, nur fade-in/out überlappend
+        half = n_samples // 2
+        signal[:half] *= np.linspace(0, 1, half)
+        signal[half:] *= np.linspace(1, 0, n_samples - half)
+
+    return np.clip(signal, -32767, 32767).astype(np.int16)
+
+
+class SoundBank:
+    """Erzeugt die Spiel-Sounds im Speicher und hält Tonhöhen-Varianten im Cache.
+
+    Jede Variante (Name, Tonhöhe) wird beim ersten Abspielen einmal synthetisiert
+    und danach wiederverwendet. pygame.mixer muss bereits initialisiert sein.
+    """
+
+    def __init__(self, tones=TONES, pitch_step=PITCH_STEP, pitch_range=PITCH_RANGE, channel_pool=None):
+        mixer_format = pygame.mixer.get_init()
+        if mixer_format is None:
+            raise pygame.error("pygame.mixer ist nicht initialisiert")
+        self.framerate, size, self.channels = mixer_format
+        if size != -16:
+            raise pygame.error(f"Mixer-Format {size} wird nicht unterstützt (erwartet 16-bit signed)")
+        self.tones = dict(tones)
+        self.pitch_step = pitch_step
+        self.pitch_range = pitch_range
+        self.channel_pool = channel_pool # Optional: ChannelPool statt freier Mixer-Kanäle
+        self._cache = {}
+
+    def _quantize(self, pitch):
+        low, high = self.pitch_range
+        pitch = min(high, max(low, pitch))
+        return round(round(pitch / self.pitch_step) * self.pitch_step, 4)
+
+    def sound(self, name, pitch=1.0):
+        """Gibt den pygame.mixer.Sound für name in der (gerundeten) Tonhöhe zurück."""
+        key = (name, self._quantize(pitch))
+        sound = self._cache.get(key)
+        if sound is None:
+            tone = self.tones[name]
+            samples = synthesize(tone["duration_ms"], tone["frequency"] * key[1],
+                                 tone.get("amplitude", AMPLITUDE), self.framerate)
+            if self.channels > 1: # Mono auf alle Kanäle verteilen
+                samples = np.repeat(samples[:, None], self.channels, axis=1)
+            sound = self._cache[key] = pygame.mixer.Sound(buffer=np.ascontiguousarray(samples).tobytes())
+        return sound
+
+    def play(self, name, pitch=1.0):
+        if self.channel_pool is not None:
+            return self.channel_pool.play(name, self.sound(name, pitch))
+        return self.sound(name, pitch).play()
+
+    def prewarm(self, pitches=(1.0,)):
+        """Erzeugt Varianten vorab, damit beim ersten Treffer nichts synthetisiert werden muss."""
+        for name in self.tones:
+            for pitch in pitches:
+                self.sound(name, pitch)
+
+    def __len__(self):
+        return len(self._cache)
+
+
+class ChannelPool:
+    """Spielt Sounds auf einer festen Anzahl reservierter Mixer-Kanäle.
+
+    Ist kein Kanal frei, wird die älteste Stimme mit der niedrigsten Priorität
+    (höchstens gleich der neuen) gestoppt. Gleiche Ereignisse innerhalb von
+    MIN_INTERVAL_MS werden verworfen, damit schnelle Wandtreffer den Mixer
+    nicht fluten.
+    """
+
+    def __init__(self, size=CHANNEL_POOL_SIZE, priorities=SOUND_PRIORITIES, min_interval_ms=MIN_INTERVAL_MS):
+        if pygame.mixer.get_num_channels() < size:
+            pygame.mixer.set_num_channels(size)
+        pygame.mixer.set_reserved(size) # Sound.play() ohne Pool verwendet diese Kanäle nicht
+        self.channels = [pygame.mixer.Channel(i) for i in range(size)]
+        self.priorities = dict(priorities)
+        self.min_interval_ms = dict(min_interval_ms)
+        self._voices = [None] * size  # Pro Kanal: (Priorität, Startzeit ms) der laufenden Stimme
+        self._last_played = {}        # Name -> Startzeit ms
+        self.played = 0
+        self.stolen = 0
+        self.dropped = 0              # Keine Stimme verdrängbar oder zu kurz nach gleichem Ereignis
+        self.rate_limited = 0         # Davon durch MIN_INTERVAL_MS verworfen
+
+    def _free_channel(self):
+        for index, channel in enumerate(self.channels):
+            if not channel.get_busy():
+                return index
+        return None
+
+    def _victim(self, priority):
+        """Älteste Stimme mit der niedrigsten Priorität <= priority oder None."""
+        candidates = [(voice[0], voice[1], index) for index, voice in enumerate(self._voices)
+                      if voice is not None and voice[0] <= priority]
+        return min(candidates)[2] if candidates else None
+
+    def play(self, name, sound, now_ms=None):
+        """Spielt sound für das Ereignis name. Gibt den Kanal zurück oder None, wenn verworfen."""
+        now = pygame.time.get_ticks() if now_ms is None else now_ms
+        last = self._last_played.get(name)
+        if last is not None and now - last < self.min_interval_ms.get(name, 0):
+            self.dropped += 1
+            self.rate_limited += 1
+            return None
+
+        priority = self.priorities.get(name, 0)
+        index = self._free_channel()
+        if index is None:
+            index = self._victim(priority)
+            if index is None:
+                self.dropped += 1
+                return None
+            self.channels[index].stop()
+            self.stolen += 1
+
+        channel = self.channels[index]
+        channel.play(sound)
+        self._voices[index] = (priority, now)
+        self._last_played[name] = now
+        self.played += 1
+        return channel
+
+    def counters(self):
+        return {"played": self.played, "stolen": self.stolen, "dropped": self.dropped,
+                "rate_limited": self.rate_limited}
+
+    def summary(self):
+        return (f"Sounds: {self.played} gespielt, {self.stolen} verdrängt, {self.dropped} verworfen "
+                f"(davon {self.rate_limited} durch Ratenbegrenzung)")
+
+
+def pitch_for_speed(speed, min_speed, max_speed, max_pitch=1.5):
+    """Bildet eine Geschwindigkeit linear auf die Tonhöhe 1.0 .. max_pitch ab."""
+    if max_speed <= min_speed:
+        return 1.0
+    fraction = min(1.0, max(0.0, (speed - min_speed) / (max_speed - min_speed)))
+    return 1.0 + fraction * (max_pitch - 1.0)
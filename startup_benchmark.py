@@ -0,0 +1,91 @@
+import argparse
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+# --- Konfiguration ---
+# Misst, wie lange die Skripte zum Starten brauchen (Import aller Module),
+# und welche Module dabei die meiste Zeit kosten. Nutzt 'python -X importtime',
+# das für jedes importierte Modul die eigene und die kumulierte Zeit ausgibt.
+STARTUP_TARGET_S = 0.5   # Ziel für Cron-Aufnahmen (SAVE_IMAGE_ONLY / Bild holen)
+RUNS = 5                 # Wiederholungen, gemessen wird der Median
+TOP_MODULES = 10         # So viele teuerste Module anzeigen
+
+# Szenarien: Name -> Python-Code, dessen Startzeit gemessen wird
+SCENARIOS = {
+    # Nur Konfiguration laden, z.B. für meter_daemon oder andere Skripte
+    "import espcam": "import espcam",
+    # Was SAVE_IMAGE_ONLY braucht: HTTP-Session für den Abruf, dann Datei schreiben
+    "save-only": "import espcam; espcam.get_http_session()",
+    # Voller Erkennungspfad: Vorverarbeitung baut die OpenCV-Pipeline
+    "ocr": "import espcam; espcam.get_preprocessing_pipeline()",
+}
+
+# Module, die in einem schlanken Start nicht geladen werden sollten
+HEAVY_MODULES = ('cv2', 'numpy', 'PIL', 'pytesseract', 'easyocr', 'torch', 'turbojpeg')
+
+_IMPORTTIME_RE = re.compile(r"import time:\s*(\d+)\s*\|\s*(\d+)\s*\|(\s*)(\S+)")
+
+
+def parse_importtime(stderr):
+    """Gibt [(Modul, eigene Zeit s, kumulierte Zeit s, Tiefe), ...] aus der -X importtime Ausgabe zurück."""
+    modules = []
+    for line in stderr.splitlines():
+        match = _IMPORTTIME_RE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            modules.append((name, int(self_us) / 1e6, int(cumulative_us) / 1e6, (len(indent) - 1) // 2))
+    return modules
+
+
+def measure(code, runs=RUNS):
+    """Startet den Interpreter runs-mal. Gibt (Median-Wandzeit s, Module des letzten Laufs) zurück."""
+    wall_times = []
+    modules = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                                capture_output=True, text=True)
+        wall_times.append(time.perf_counter() - start)
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "Fehler")
+        modules = parse_importtime(result.stderr)
+    return statistics.median(wall_times), modules
+
+
+# --- Hauptteil des Skripts ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Startzeit der ESP32/OCR-Skripte messen.")
+    parser.add_argument("scenarios", nargs="*", default=list(SCENARIOS),
+                        help=f"Zu messende Szenarien: {', '.join(SCENARIOS)} (Standard: alle)")
+    parser.add_argument("--runs", type=int, default=RUNS)
+    parser.add_argument("--target", type=float, default=STARTUP_TARGET_S, help="Zielzeit in Sekunden")
+    args = parser.parse_args()
+    unknown = [name for name in args.scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"Unbekannte Szenarien: {', '.join(unknown)}")
+
+    too_slow = False
+    for name in args.scenarios:
+        try:
+            wall, modules = measure(SCENARIOS[name], args.runs)
+        except RuntimeError as e:
+            print(f"\n--- {name} ---\nFEHLER: {e}")
+            too_slow = True
+            continue
+        top_level = [m for m in modules if m[3] == 0]
+        heavy = sorted({m[0].split('.')[0] for m in modules} & set(HEAVY_MODULES))
+        print(f"\n--- {name} ---")
+        print(f"Startzeit (Median aus {args.runs}): {wall * 1000:.0f} ms, "
+              f"davon Importe {sum(m[2] for m in top_level) * 1000:.0f} ms ({len(modules)} Module)")
+        print(f"Schwere Module geladen: {', '.join(heavy) if heavy else 'keine'}")
+        print("Teuerste Importe (kumuliert):")
+        for module, _, cumulative, _ in sorted(top_level, key=lambda m: m[2], reverse=True)[:TOP_MODULES]:
+            print(f"  {cumulative * 1000:8.1f} ms  {module}")
+        if name != "ocr" and wall > args.target:
+            print(f"WARNUNG: Ziel von {args.target * 1000:.0f} ms überschritten.")
+            too_slow = True
+
+    sys.exit(1 if too_slow else 0)
@@ -0,0 +1,78 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("cv2")
+pytest.importorskip("pytesseract")
+
+import bild_ausewrtung_multiple_numbers as multi
+from ocr_cache import DigitOCRCache
+from ocr_cascade import VariantWinStats
+
+
+class GuardedCache(DigitOCRCache):
+    """Schlägt fehl, wenn der Cache aus einem anderen als dem aufrufenden Thread benutzt wird."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.owner = threading.get_ident()
+
+    def get(self, key):
+        assert threading.get_ident() == self.owner
+        return super().get(key)
+
+    def put(self, key, result):
+        assert threading.get_ident() == self.owner
+        super().put(key, result)
+
+
+def frame(seed):
+    rng = np.random.default_rng(seed)
+    images = []
+    for roi in range(6):
+        image = (rng.random((30, 20)) > 0.5).astype(np.uint8) * 255
+        images.append({"original": image, "minimal": image, "roi": f"ziffer{roi}"})
+    return images
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    calls = []
+
+    def fake_variant(roi_processed, variant):
+        calls.append((roi_processed["roi"], variant[0]))
+        return {"text": "7", "conf": 95.0}
+
+    monkeypatch.setattr(multi, "ocr_variant", fake_variant)
+    monkeypatch.setattr(multi, "OCR_STRATEGY", "cascade")
+    return calls
+
+
+@pytest.mark.parametrize("parallel", [False, True])
+def test_exploration_covers_the_whole_frame(calls, parallel):
+    stats = VariantWinStats(explore_every=2)
+    executor = ThreadPoolExecutor(max_workers=4) if parallel else None
+    try:
+        for seed in range(3):
+            calls.clear()
+            multi.recognize_rois_tesseract(frame(seed), executor=executor, variant_stats=stats)
+            per_roi = {roi: sum(1 for r, _ in calls if r == roi) for roi, _ in calls}
+            expected = len(multi.OCR_VARIANTS) if seed % 2 == 0 else 1
+            # Entweder erkunden alle ROIs des Bildes oder keines
+            assert sorted(per_roi.values()) == [expected] * 6
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+
+def test_cache_is_only_used_by_calling_thread(calls):
+    cache = GuardedCache()
+    stats = VariantWinStats()
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        first = multi.recognize_rois_tesseract(frame(0), cache, executor, stats)
+        second = multi.recognize_rois_tesseract(frame(0), cache, executor, stats)
+    assert not any(r["from_cache"] for r in first)
+    assert all(r["from_cache"] for r in second)
+    assert [r["extracted_digits"] for r in second] == ["7"] * 6
@@ -0,0 +1,82 @@
+import math
+
+import pytest
+
+from breakout_bricks import BrickField
+
+BALL_RADIUS = 10   # Wie in breakout.py
+BRICK_GAP = 5
+
+
+class Box:
+    def __init__(self, left, top, width, height):
+        self.left, self.top, self.right, self.bottom = left, top, left + width, top + height
+
+
+def distance_to(x, y, rect):
+    nearest_x = min(max(x, rect.left), rect.right)
+    nearest_y = min(max(y, rect.top), rect.bottom)
+    return math.hypot(x - nearest_x, y - nearest_y)
+
+
+def two_bricks(hits=1):
+    """Zwei Bricks nebeneinander mit BRICK_GAP Abstand, wie im Spiel."""
+    field = BrickField()
+    left = {'rect': Box(0, 0, 75, 20), 'hits': hits}
+    right = {'rect': Box(75 + BRICK_GAP, 0, 75, 20), 'hits': hits}
+    field.add(left)
+    field.add(right)
+    return field, left, right
+
+
+def test_ball_into_gap_hits_both_corners_and_reflects_down():
+    field, left, right = two_bricks()
+    # Start in den Eckbereichen beider Bricks (im vergrößerten Rechteck, außerhalb der Ecken)
+    x, y = 75 + BRICK_GAP / 2, 29.9
+    assert distance_to(x, y, left['rect']) > BALL_RADIUS and distance_to(x, y, right['rect']) > BALL_RADIUS
+    x, y, dx, dy, hit = field.move_ball(x, y, 0, -8, BALL_RADIUS)
+    assert {id(brick) for brick in hit} == {id(left), id(right)}
+    assert dx == pytest.approx(0, abs=1e-9)
+    assert dy == pytest.approx(8)
+    assert len(field) == 0
+
+
+@pytest.mark.parametrize("start_x", [60, 68, 72, 75, 77.5, 80, 83, 87, 95])
+@pytest.mark.parametrize("angle", [-30, -15, -5, 0, 5, 15, 30]) # Grad gegen die Senkrechte
+def test_ball_at_gap_reflects_off_bottom_and_never_enters_a_brick(start_x, angle):
+    field, left, right = two_bricks(hits=100) # Bricks bleiben liegen, damit man Eindringen sieht
+    speed = 12
+    x, y = start_x, 60
+    dx, dy = speed * math.sin(math.radians(angle)), -speed * math.cos(math.radians(angle))
+    first_hit = None
+    for _ in range(10):
+        x, y, dx, dy, hit = field.move_ball(x, y, dx, dy, BALL_RADIUS)
+        for brick in (left, right):
+            assert distance_to(x, y, brick['rect']) >= BALL_RADIUS - 1e-6
+        if hit and first_hit is None:
+            first_hit = (dx, dy)
+    assert first_hit is not None
+    assert first_hit[1] > 0 # Von der Unterseite bzw. den unteren Ecken nach unten abgeprallt
+    # Die Seitenflächen in der Lücke sind für den Ball (Durchmesser > Lücke) nicht erreichbar
+    assert y > 20
+
+
+@pytest.mark.parametrize("start_x", [75.5, 76.5, 77.5, 78.5, 79.5]) # Quer über die Lücke
+@pytest.mark.parametrize("direction", [(4, -8), (-4, -8), (0, -9), (2, -9), (-2, -9)])
+def test_start_in_corner_region_of_neighbour(start_x, direction):
+    """Nach einem Abprall liegt der Ball oft schon im Eckbereich des Nachbar-Bricks."""
+    field, left, right = two_bricks(hits=100)
+    x, y = start_x, 29.99 # Unter der Lücke liegt jede Startposition in den Eckbereichen beider Bricks
+    for brick in (left, right):
+        assert distance_to(x, y, brick['rect']) > BALL_RADIUS
+    x, y, dx, dy, hit = field.move_ball(x, y, *direction, BALL_RADIUS)
+    for brick in (left, right):
+        assert distance_to(x, y, brick['rect']) >= BALL_RADIUS - 1e-6
+    assert hit and dy > 0
+
+
+def test_hit_points():
+    field, left, right = two_bricks(hits=2)
+    assert field.hit(left) is False and len(field) == 2
+    assert field.hit(left) is True and len(field) == 1
+    assert list(field) == [right]
@@ -0,0 +1,120 @@
+import math
+import random
+
+import pytest
+
+pygame = pytest.importorskip("pygame")
+
+import breakout_entities as entities
+from breakout_bricks import BrickField
+
+WIDTH, HEIGHT, RADIUS = 800, 600, 10
+FAR_PADDLE = pygame.Rect(-500, 0, 10, 10) # Außerhalb des Spielfelds, trifft nie
+
+
+def assert_consistent(pool):
+    assert all(obj.index == i for i, obj in enumerate(pool.active))
+    assert len(pool.active) + len(pool._free) == pool.capacity
+
+
+# --- Pool ---
+def test_exhausted_pool_drops_spawns():
+    pool = entities.Pool(entities.Laser, 3)
+    spawned = [pool.spawn(i, 0) for i in range(5)]
+    assert spawned[3:] == [None, None]
+    assert pool.dropped == 2 and len(pool) == 3
+    pool.release(spawned[0])
+    assert pool.spawn(9, 9) is spawned[0] # Freigegebene Objekte werden wiederverwendet
+    assert pool.dropped == 2
+
+
+def test_release_keeps_indices():
+    rng = random.Random(1)
+    pool = entities.Pool(entities.Laser, 16)
+    for _ in range(500):
+        if pool.active and (rng.random() < 0.5 or len(pool) == pool.capacity):
+            pool.release(rng.choice(pool.active))
+        else:
+            pool.spawn(0, 0)
+        assert_consistent(pool)
+    pool.clear()
+    assert_consistent(pool)
+    assert len(pool) == 0
+
+
+def test_double_release_is_rejected():
+    pool = entities.Pool(entities.Laser, 4)
+    a, b = pool.spawn(0, 0), pool.spawn(1, 0)
+    pool.release(a)
+    with pytest.raises(ValueError):
+        pool.release(a)
+    pool.clear()
+    with pytest.raises(ValueError):
+        pool.release(b)
+    assert_consistent(pool)
+
+
+# --- Multi-Ball ---
+def test_split_spawns_only_from_existing_balls():
+    balls = entities.Pool(entities.Ball, 16)
+    entities.spawn_ball(balls, 100, 200, 4, -4)
+    entities.spawn_ball(balls, 300, 250, -3, 5)
+    angles = (-0.3, 0.3)
+    entities.split_balls(balls, angles)
+    assert len(balls) == 6
+    originals = balls.active[:2]
+    expected = set()
+    for ball in originals:
+        for angle in angles:
+            c, s = math.cos(angle), math.sin(angle)
+            expected.add((ball.x, ball.y, round(ball.dx * c - ball.dy * s, 9), round(ball.dx * s + ball.dy * c, 9)))
+    assert {(b.x, b.y, round(b.dx, 9), round(b.dy, 9)) for b in balls.active[2:]} == expected
+    assert_consistent(balls)
+
+
+def test_split_stops_at_pool_capacity():
+    balls = entities.Pool(entities.Ball, 4)
+    for x in (100, 200, 300):
+        entities.spawn_ball(balls, x, 200, 4, -4)
+    entities.split_balls(balls, (-0.3, 0.3))
+    assert len(balls) == 4 and balls.dropped == 5
+    assert_consistent(balls)
+
+
+# --- Simulationsschritt ---
+def test_update_balls_releases_floor_balls():
+    balls = entities.Pool(entities.Ball, 16)
+    # Abwechselnd Bälle kurz vor dem Boden und mitten im Feld
+    for i in range(10):
+        y = HEIGHT - RADIUS - 2 if i % 2 == 0 else 300
+        entities.spawn_ball(balls, 50 + i * 60, y, 0, 5)
+    survivors = [ball for ball in balls.active if ball.y == 300]
+
+    hit_bricks, lost = entities.update_balls(balls, BrickField(), FAR_PADDLE, WIDTH, HEIGHT, RADIUS)
+    assert hit_bricks == [] and lost == 5
+    assert sorted(balls.active, key=lambda b: b.x) == survivors
+    assert all(ball.y == 305 for ball in balls.active) # Jeder Ball genau einmal bewegt
+    assert_consistent(balls)
+
+
+# --- Treffer ---
+def test_brick_hit_by_ball_and_laser_counts_once(monkeypatch):
+    bricks = BrickField()
+    brick = {'rect': pygame.Rect(100, 100, 60, 20), 'hits': 2}
+    bricks.add(brick)
+    balls = entities.Pool(entities.Ball, 4)
+    lasers = entities.Pool(entities.Laser, 4)
+    powerups = entities.Pool(entities.PowerUp, 4)
+    entities.spawn_ball(balls, 115, 135, 0, -8)  # Trifft die Unterseite
+    lasers.spawn(145, 126)                        # Trifft im selben Schritt
+
+    hit_bricks, _ = entities.update_balls(balls, bricks, FAR_PADDLE, WIDTH, HEIGHT, RADIUS)
+    entities.update_lasers(lasers, bricks, hit_bricks)
+    assert hit_bricks == [brick, brick] and brick['hits'] == 0 and len(bricks) == 0
+
+    monkeypatch.setattr(entities.random, "random", lambda: 0.0) # Jeder Wurf lässt ein Power-Up fallen
+    unique = entities.unique_bricks(hit_bricks)
+    assert unique == [brick]
+    for hit in unique:
+        entities.maybe_drop_powerup(powerups, hit)
+    assert len(powerups) == 1
@@ -0,0 +1,98 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("pygame")
+
+import breakout_levels
+from breakout_bricks import BrickField
+from breakout_levels import Level
+
+COLORS = [(255, 0, 0), (0, 255, 0)]
+
+
+def test_save_and_load_keep_types_and_hits(tmp_path):
+    path = str(tmp_path / "level.npz")
+    types = np.array([[0, 1, 15], [7, 0, 2]], dtype=np.uint8)
+    hits = np.array([[0, 1, 15], [3, 0, 9]], dtype=np.uint8)
+    breakout_levels.save_level(path, Level(types, hits))
+    loaded = breakout_levels.load_level(path)
+    assert np.array_equal(loaded.types, types)
+    assert np.array_equal(loaded.hits, hits)
+
+
+def test_generated_level_round_trip(tmp_path):
+    path = str(tmp_path / "level.npz")
+    level = breakout_levels.generate_level(20, 30, seed=3)
+    breakout_levels.save_level(path, level)
+    loaded = breakout_levels.load_level(path)
+    assert np.array_equal(loaded.types, level.types) and np.array_equal(loaded.hits, level.hits)
+
+
+@pytest.mark.parametrize("field", ["types", "hits"])
+def test_values_above_15_are_rejected(tmp_path, field):
+    grid = {"types": np.ones((2, 2), dtype=np.uint8), "hits": np.ones((2, 2), dtype=np.uint8)}
+    grid[field][1, 1] = 16
+    with pytest.raises(ValueError):
+        breakout_levels.save_level(str(tmp_path / "level.npz"), Level(grid["types"], grid["hits"]))
+
+
+def test_unknown_version_is_rejected(tmp_path):
+    path = str(tmp_path / "level.npz")
+    np.savez_compressed(path, cells=np.ones((2, 2), dtype=np.uint8), version=np.uint8(99))
+    with pytest.raises(ValueError, match="99"):
+        breakout_levels.load_level(path)
+
+
+def test_file_without_level_is_rejected(tmp_path):
+    path = str(tmp_path / "other.npz")
+    np.savez_compressed(path, data=np.zeros(3))
+    with pytest.raises(ValueError):
+        breakout_levels.load_level(path)
+
+
+def test_same_seed_same_level():
+    a = breakout_levels.generate_level(12, 17, seed=42)
+    b = breakout_levels.generate_level(12, 17, seed=42)
+    c = breakout_levels.generate_level(12, 17, seed=43)
+    assert np.array_equal(a.types, b.types) and np.array_equal(a.hits, b.hits)
+    assert not (np.array_equal(a.types, c.types) and np.array_equal(a.hits, c.hits))
+
+
+@pytest.mark.parametrize("cols", [1, 2, 9, 10, 101])
+def test_generated_level_is_mirrored(cols):
+    level = breakout_levels.generate_level(15, cols, seed=cols)
+    assert level.types.shape == (15, cols)
+    assert np.array_equal(level.types, level.types[:, ::-1])
+    assert np.array_equal(level.hits, level.hits[:, ::-1])
+    # Leere Zellen haben keine Treffer, Bricks mindestens einen
+    assert np.array_equal(level.hits > 0, level.types > 0)
+    assert level.hits.max() <= breakout_levels.GENERATOR_MAX_HITS
+
+
+def test_build_bricks_places_every_brick():
+    level = breakout_levels.generate_level(6, 9, seed=7)
+    field = BrickField()
+    field.add({'rect': breakout_levels.pygame.Rect(0, 0, 1, 1)}) # Wird ersetzt
+    count = breakout_levels.build_bricks(level, field, COLORS, 30, 10, 2, 5, 40)
+    assert count == len(field) == np.count_nonzero(level.types)
+    for brick in field:
+        col, row = (brick['rect'].x - 5) // 32, (brick['rect'].y - 40) // 12
+        assert level.types[row, col] > 0
+        assert brick['hits'] == level.hits[row, col]
+        assert brick['color'] == COLORS[(level.types[row, col] - 1) % len(COLORS)]
+
+
+def test_build_bricks_rejects_levels_outside_the_field():
+    field = BrickField()
+    level = breakout_levels.classic_level(2, 4)
+    # 4 Spalten: 5 + 4 * 32 - 2 = 131 Pixel breit, 2 Zeilen: 40 + 2 * 12 - 2 = 62 Pixel hoch
+    assert breakout_levels.build_bricks(level, field, COLORS, 30, 10, 2, 5, 40, bounds=(131, 62)) == 8
+    for bounds in ((130, 62), (131, 61)):
+        with pytest.raises(ValueError):
+            breakout_levels.build_bricks(level, field, COLORS, 30, 10, 2, 5, 40, bounds=bounds)
+    assert len(field) == 8 # Unverändert
+    # Nur belegte Zellen zählen: leere Randspalten dürfen überstehen
+    types = np.zeros((2, 10), dtype=np.uint8)
+    types[:, :4] = 1
+    assert breakout_levels.build_bricks(Level(types, types.copy()), field, COLORS, 30, 10, 2, 5, 40,
+                                        bounds=(131, 62)) == 8
@@ -0,0 +1,91 @@
+import math
+
+import pytest
+
+from collision import swept_circle_rect, reflect
+
+
+class Box:
+    def __init__(self, left, top, width, height):
+        self.left, self.top, self.right, self.bottom = left, top, left + width, top + height
+
+
+def overlaps(x, y, radius, rect):
+    nearest_x = min(max(x, rect.left), rect.right)
+    nearest_y = min(max(y, rect.top), rect.bottom)
+    return (x - nearest_x) ** 2 + (y - nearest_y) ** 2 < radius * radius
+
+
+def sampled_contact(x, y, dx, dy, radius, rect, samples=20000):
+    """Referenz: erstes abgetastetes t, bei dem Kreis und Rechteck überlappen."""
+    for i in range(samples + 1):
+        if overlaps(x + dx * i / samples, y + dy * i / samples, radius, rect):
+            return i / samples
+    return None
+
+
+def assert_matches_reference(x, y, dx, dy, radius, rect, samples=20000):
+    hit = swept_circle_rect(x, y, dx, dy, radius, rect)
+    expected = sampled_contact(x, y, dx, dy, radius, rect, samples)
+    if expected is None:
+        assert hit is None
+    else:
+        assert hit is not None
+        assert expected - 1 / samples - 1e-9 <= hit.t <= expected + 1e-9
+
+
+@pytest.mark.parametrize("distance", [15, 60, 300, 1000, 10000])
+def test_fast_ball_against_paddle_matches_reference(distance):
+    paddle = Box(100, 200, 18, 120) # Wie das Pong-Paddel
+    radius = 10
+    for start_y in range(173, 350, 7):
+        for slope in (0.0, 0.05, -0.05, 0.4, -0.4):
+            assert_matches_reference(paddle.right + radius + 3, start_y, -distance, distance * slope, radius, paddle)
+
+
+def test_start_in_corner_region_hits_rounded_corner():
+    rect = Box(0, 0, 10, 10)
+    hit = swept_circle_rect(-4, -4, 40, 40, 5, rect) # Im vergrößerten Rechteck, aber außerhalb der Ecke
+    assert hit is not None
+    assert hit.t == pytest.approx((4 * math.sqrt(2) - 5) / (40 * math.sqrt(2)))
+    assert (hit.normal_x, hit.normal_y) == pytest.approx((-math.sqrt(0.5), -math.sqrt(0.5)))
+
+
+@pytest.mark.parametrize("corner", [(0, 0, -1, -1), (10, 0, 1, -1), (0, 10, -1, 1), (10, 10, 1, 1)])
+def test_starts_inside_grown_box_match_reference(corner):
+    rect = Box(0, 0, 10, 10)
+    radius = 5
+    corner_x, corner_y, sign_x, sign_y = corner
+    for offset in (3.6, 4.0, 4.5, 4.9):
+        x, y = corner_x + sign_x * offset, corner_y + sign_y * offset
+        for angle in range(0, 360, 15):
+            dx, dy = 30 * math.cos(math.radians(angle)), 30 * math.sin(math.radians(angle))
+            assert_matches_reference(x, y, dx, dy, radius, rect, samples=6000)
+
+
+def test_corner_graze():
+    rect = Box(0, 0, 10, 10)
+    radius = 5
+    # Waagerecht an der oberen linken Ecke vorbei: Abstand zur Ecke knapp über bzw. unter radius
+    assert swept_circle_rect(-20, -5.01, 40, 0, radius, rect) is None
+    hit = swept_circle_rect(-20, -4.99, 40, 0, radius, rect)
+    assert hit is not None
+    assert hit.normal_y < -0.99 and hit.normal_x < 0 # Fast senkrecht nach oben, leicht nach links
+    # Streift die Ecke aus dem Eckbereich heraus
+    assert swept_circle_rect(-4, -4, 0, -20, radius, rect) is None
+
+
+def test_contact_at_start():
+    rect = Box(0, 0, 10, 10)
+    # Berührt schon die linke Kante und bewegt sich hinein
+    assert swept_circle_rect(-4, 5, 10, 0, 5, rect) == (0.0, -1, 0)
+    # Bewegt sich wieder heraus: kein Kontakt
+    assert swept_circle_rect(-4, 5, -10, 0, 5, rect) is None
+    # Genau auf Abstand radius: erster Kontakt bei t = 0 über den Strahltest
+    hit = swept_circle_rect(-5, 5, 10, 0, 5, rect)
+    assert hit.t == 0.0 and (hit.normal_x, hit.normal_y) == (-1, 0)
+
+
+def test_reflect():
+    assert reflect(3, 4, 0, -1) == (3, -4)
+    assert reflect(3, 4, -1, 0) == (-3, 4)
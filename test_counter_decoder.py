@@ -0,0 +1,36 @@
+from counter_decoder import RollingCounterDecoder
+
+
+def reading(digits, conf):
+    """Kandidaten wie von digit_candidates: eine Ziffer pro Stelle mit gleicher Konfidenz."""
+    return [{digit: conf} for digit in digits]
+
+
+def test_low_confidence_first_reading_is_rejected():
+    decoder = RollingCounterDecoder(4)
+    # Durchschnittliche Evidenz 0.6 läge über COUNTER_MIN_SCORE, ist aber keine sichere Lesung
+    value, status, score = decoder.decode(reading("1234", 60.0), timestamp=0)
+    assert (value, status) == (None, 'rejected')
+    assert score > decoder.min_score
+    assert decoder.last_value is None
+
+
+def test_one_unsure_digit_blocks_first_reading():
+    decoder = RollingCounterDecoder(4)
+    candidates = reading("123", 99.0) + [{"4": 70.0}]
+    assert decoder.decode(candidates, timestamp=0)[:2] == (None, 'rejected')
+    assert decoder.decode(reading("1234", 95.0), timestamp=1)[:2] == ("1234", 'initial')
+
+
+def test_incomplete_first_reading_is_rejected():
+    decoder = RollingCounterDecoder(4)
+    candidates = reading("123", 99.0) + [{}]
+    assert decoder.decode(candidates, timestamp=0) == (None, 'rejected', 0.0)
+
+
+def test_after_confident_start_rolling_digit_is_resolved():
+    decoder = RollingCounterDecoder(4)
+    assert decoder.decode(reading("1239", 95.0), timestamp=0)[:2] == ("1239", 'initial')
+    # Letzte Stelle halb gedreht (leer), vorletzte schon auf 4: 1240
+    candidates = [{"1": 95.0}, {"2": 95.0}, {"4": 80.0}, {}]
+    assert decoder.decode(candidates, timestamp=1)[:2] == ("1240", 'accepted')
@@ -0,0 +1,92 @@
+import os
+import secrets
+import threading
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Listener
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import easyocr_worker
+from easyocr_worker import BatchingOCRServer, EasyOCRClient
+
+
+class FakeReader:
+    """Merkt sich die allowlist jedes readtext-Aufrufs; der erste Aufruf wartet auf release."""
+
+    def __init__(self):
+        self.allowlists = []
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def readtext(self, canvas, allowlist, detail, paragraph):
+        self.allowlists.append(allowlist)
+        self.started.set()
+        self.release.wait(5)
+        return []
+
+
+def test_other_allowlist_keeps_its_place():
+    reader = FakeReader()
+    server = BatchingOCRServer(reader, max_wait_s=0.2)
+    image = np.zeros((20, 10), dtype=np.uint8)
+    first = server.submit([image], "0123456789")
+    assert reader.started.wait(5)
+    # Während der erste Stapel läuft, stehen abwechselnd verschiedene allowlists an
+    futures = [server.submit([image], allowlist) for allowlist in ("01", "0123456789", "01")]
+    reader.release.set()
+    for future in [first] + futures:
+        assert future.result(5) == [("", 0.0)]
+    assert reader.allowlists == ["0123456789", "01", "0123456789", "01"]
+
+
+# --- Schlüssel und Verbindung ---
+def test_worker_creates_private_key_and_client_reuses_it(tmp_path, monkeypatch):
+    monkeypatch.delenv(easyocr_worker.WORKER_AUTHKEY_ENV, raising=False)
+    path = str(tmp_path / "ocr.key")
+    with pytest.raises(FileNotFoundError):
+        easyocr_worker.load_authkey(path) # Client erzeugt nie einen Schlüssel
+    key = easyocr_worker.load_authkey(path, create=True)
+    assert len(key) == 32
+    assert os.stat(path).st_mode & 0o777 == 0o600
+    assert easyocr_worker.load_authkey(path) == key
+    assert easyocr_worker.load_authkey(str(tmp_path / "other.key"), create=True) != key
+
+
+@pytest.mark.skipif(os.name != "posix", reason="Dateirechte nur unter POSIX")
+def test_key_readable_by_others_is_rejected(tmp_path, monkeypatch):
+    monkeypatch.delenv(easyocr_worker.WORKER_AUTHKEY_ENV, raising=False)
+    path = tmp_path / "ocr.key"
+    path.write_text("00" * 32)
+    path.chmod(0o644)
+    with pytest.raises(PermissionError):
+        easyocr_worker.load_authkey(str(path))
+
+
+def test_key_from_environment(tmp_path, monkeypatch):
+    monkeypatch.setenv(easyocr_worker.WORKER_AUTHKEY_ENV, "ab" * 32)
+    assert easyocr_worker.load_authkey(str(tmp_path / "missing.key")) == b"\xab" * 32
+
+
+def test_client_needs_the_workers_key():
+    key = secrets.token_bytes(32)
+    server = BatchingOCRServer(FakeReader())
+    with Listener(("127.0.0.1", 0), authkey=key) as listener:
+        def accept_one():
+            try:
+                server.handle(listener.accept())
+            except AuthenticationError:
+                pass # Wie in serve(): Verbindung abgelehnt
+
+        for authkey, accepted in ((secrets.token_bytes(32), False), (key, True)):
+            thread = threading.Thread(target=accept_one, daemon=True)
+            thread.start()
+            if accepted:
+                client = EasyOCRClient(listener.address, authkey=authkey)
+                assert client.stats()["batches"] == 0
+                client.close()
+            else:
+                with pytest.raises(AuthenticationError):
+                    EasyOCRClient(listener.address, authkey=authkey)
+            thread.join(5)
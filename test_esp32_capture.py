@@ -0,0 +1,164 @@
+import socketserver
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("requests")
+
+from esp32_capture import ESP32CamClient, MJPEGStreamParser
+
+JPEG = b"\xff\xd8" + bytes(range(256)) * 4 + b"\xff\xd9"
+# Bilder mit eingebettetem Vorschaubild: ein innerer EOI-Marker vor dem eigentlichen Ende
+NESTED_JPEG = b"\xff\xd8" + b"head" + b"\xff\xd8thumb\xff\xd9" + b"tail" + b"\xff\xd9"
+BOUNDARY = b"frame"
+
+
+def multipart(frames, content_length=True):
+    parts = []
+    for frame in frames:
+        header = b"--" + BOUNDARY + b"\r\nContent-Type: image/jpeg\r\n"
+        if content_length:
+            header += b"Content-Length: %d\r\n" % len(frame)
+        parts.append(header + b"\r\n" + frame + b"\r\n")
+    return b"".join(parts)
+
+
+# --- Lokale Fake-Kamera ---
+class FakeCamera:
+    """Lokaler HTTP-Server, der wie eine ESP32-CAM antwortet.
+
+    respond(handler, n) schreibt die Antwort auf die n-te Anfrage und gibt zurück,
+    ob die Verbindung offen bleibt.
+    """
+
+    def __init__(self, respond):
+        camera = self
+        self.respond = respond
+        self.requests = 0
+        self.connections = 0
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                camera.connections += 1
+                while True:
+                    request_line = self.rfile.readline()
+                    if not request_line:
+                        return
+                    while self.rfile.readline() not in (b"\r\n", b""):
+                        pass
+                    camera.requests += 1
+                    try:
+                        if not camera.respond(self, camera.requests):
+                            return
+                    except (BrokenPipeError, ConnectionResetError):
+                        return
+
+        socketserver.ThreadingTCPServer.daemon_threads = True
+        self.server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), Handler)
+        self.port = self.server.server_address[1]
+
+    def url(self, path):
+        return f"http://127.0.0.1:{self.port}{path}"
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def jpeg_response(handler, n):
+    handler.wfile.write(b"HTTP/1.1 200 OK\r\nContent-Type: image/jpeg\r\n"
+                        b"Content-Length: %d\r\n\r\n" % len(JPEG) + JPEG)
+    return True
+
+
+def stream_response(body, pieces=1, pause=0.0):
+    """MJPEG-Antwort ohne Content-Length der Gesamtantwort, in pieces Stücken gesendet."""
+    def respond(handler, n):
+        handler.wfile.write(b"HTTP/1.1 200 OK\r\nContent-Type: multipart/x-mixed-replace;boundary="
+                            + BOUNDARY + b"\r\nConnection: close\r\n\r\n")
+        step = max(1, len(body) // pieces)
+        for start in range(0, len(body), step):
+            handler.wfile.write(body[start:start + step])
+            handler.wfile.flush()
+            time.sleep(pause)
+        return False
+    return respond
+
+
+def endless_stream(handler, n):
+    handler.wfile.write(b"HTTP/1.1 200 OK\r\nContent-Type: multipart/x-mixed-replace;boundary="
+                        + BOUNDARY + b"\r\n\r\n")
+    while True: # Bis der Client die Verbindung schließt
+        handler.wfile.write(multipart([JPEG]))
+        handler.wfile.flush()
+        time.sleep(0.02)
+
+
+def stream_frames(camera, chunk_size=4096):
+    client = ESP32CamClient("127.0.0.1", stream_url=camera.url("/stream"))
+    with client:
+        return list(client.iter_stream(chunk_size=chunk_size))
+
+
+# --- Parser ---
+@pytest.mark.parametrize("content_length", [True, False])
+def test_parser_handles_every_split_point(content_length):
+    frames = [JPEG, JPEG[:100] + JPEG[-2:]]
+    body = multipart(frames, content_length)
+    for split in range(1, len(body)):
+        parser = MJPEGStreamParser()
+        assert parser.feed(body[:split]) + parser.feed(body[split:]) == frames, split
+
+
+def test_parser_byte_by_byte():
+    body = multipart([JPEG, JPEG], content_length=False) + multipart([JPEG])
+    parser = MJPEGStreamParser()
+    frames = [frame for i in range(len(body)) for frame in parser.feed(body[i:i + 1])]
+    assert frames == [JPEG] * 3
+
+
+def test_content_length_keeps_inner_markers():
+    parser = MJPEGStreamParser()
+    assert parser.feed(multipart([NESTED_JPEG, JPEG])) == [NESTED_JPEG, JPEG]
+
+
+# --- Client ---
+def test_capture_reuses_connection():
+    with FakeCamera(jpeg_response) as camera:
+        with ESP32CamClient("127.0.0.1", capture_url=camera.url("/capture")) as client:
+            assert [client.capture() for _ in range(3)] == [JPEG] * 3
+    assert camera.requests == 3 and camera.connections == 1
+
+
+@pytest.mark.parametrize("content_length", [True, False])
+def test_iter_stream(content_length):
+    with FakeCamera(stream_response(multipart([JPEG] * 3, content_length))) as camera:
+        assert stream_frames(camera) == [JPEG] * 3
+
+
+@pytest.mark.parametrize("content_length", [True, False])
+def test_iter_stream_with_parts_split_across_reads(content_length):
+    # Kleine Lesegröße und viele Sendestücke: Header und Marker liegen über Lesegrenzen verteilt
+    body = multipart([JPEG] * 3, content_length)
+    with FakeCamera(stream_response(body, pieces=37, pause=0.001)) as camera:
+        assert stream_frames(camera, chunk_size=5) == [JPEG] * 3
+
+
+def test_stop_stream_ends_thread():
+    with FakeCamera(endless_stream) as camera:
+        client = ESP32CamClient("127.0.0.1", stream_url=camera.url("/stream"))
+        client.start_stream(reconnect_delay=0.05)
+        latest = client.latest_frame(wait_timeout=5)
+        assert latest is not None and latest[1] == JPEG
+        thread = client._stream_thread
+        client.stop_stream(timeout=5)
+        assert not thread.is_alive()
+        received = client.frames_received
+        time.sleep(0.1)
+        assert client.frames_received == received # Kein neuer Verbindungsversuch
+        client.close()
@@ -0,0 +1,48 @@
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+np = pytest.importorskip("numpy")
+
+import espcam
+
+
+class DeadWorkerClient:
+    """Client eines Workers, der inzwischen beendet wurde."""
+
+    def __init__(self):
+        self.calls = 0
+        self.closed = False
+
+    def readtext(self, images, allowlist="0123456789"):
+        self.calls += 1
+        raise EOFError
+
+    def close(self):
+        self.closed = True
+
+
+class LocalReader:
+    def __init__(self):
+        self.calls = 0
+
+    def readtext(self, image, allowlist, detail, paragraph):
+        self.calls += 1
+        return [([(0, 0), (10, 0), (10, 10), (0, 10)], "4", 0.9)]
+
+
+def test_dead_worker_falls_back_to_local_reader(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path) # Debug-Bilder nicht ins Repository schreiben
+    client, reader = DeadWorkerClient(), LocalReader()
+    monkeypatch.setattr(espcam, "OCR_ENGINE", "easyocr")
+    monkeypatch.setattr(espcam, "EASYOCR_CLIENT", client)
+    monkeypatch.setattr(espcam, "EASYOCR_USE_WORKER", True)
+    monkeypatch.setattr(espcam, "get_easyocr_reader", lambda: reader)
+    image_bytes = cv2.imencode(".jpg", np.full((120, 80, 3), 200, dtype=np.uint8))[1].tobytes()
+
+    for _ in range(2):
+        text, _, conf = espcam.recognize_meter_reading_with_confidence(image_bytes, (5, 5, 30, 50))
+        assert (text, conf) == ("4", pytest.approx(90.0))
+    # Nur der erste Aufruf geht an den toten Worker, danach direkt lokal
+    assert client.calls == 1 and client.closed
+    assert reader.calls == 2
+    assert espcam.get_easyocr_client() is None
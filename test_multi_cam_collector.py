@@ -0,0 +1,210 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import multi_cam_collector
+from multi_cam_collector import CameraConnection, CameraStats, CaptureError, MultiCameraCollector
+
+JPEG = b"\xff\xd8" + bytes(range(256)) * 8 + b"\xff\xd9"
+
+
+# --- Lokale Fake-Kameras ---
+class FakeCamera:
+    """Lokaler HTTP-Server, der wie eine ESP32-CAM antwortet.
+
+    respond(reader, writer, n) schreibt die Antwort auf die n-te Anfrage und gibt
+    zurück, ob die Verbindung offen bleibt.
+    """
+
+    def __init__(self, respond):
+        self.respond = respond
+        self.requests = 0
+        self.connect_times = []
+        self._writers = []
+
+    async def __aenter__(self):
+        self.server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self
+
+    async def __aexit__(self, *exc):
+        self.server.close()
+        for writer in self._writers:
+            writer.close()
+        await self.server.wait_closed()
+
+    def camera(self, name="cam"):
+        return {"name": name, "host": "127.0.0.1", "port": self.port, "path": "/capture", "roi": (0, 0, 10, 10)}
+
+    async def _handle(self, reader, writer):
+        self.connect_times.append(time.monotonic())
+        self._writers.append(writer)
+        try:
+            while True:
+                await reader.readuntil(b"\r\n\r\n")
+                self.requests += 1
+                keep_alive = await self.respond(reader, writer, self.requests)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+def jpeg_response(body=JPEG, status="200 OK", content_type="image/jpeg"):
+    async def respond(reader, writer, n):
+        writer.write((f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\n"
+                      f"Content-Length: {len(body)}\r\n\r\n").encode() + body)
+        return True
+    return respond
+
+
+async def read_to_close_response(reader, writer, n):
+    # Ohne Content-Length, in zwei Teilen mit Pause: der Body endet erst mit dem Verbindungsende
+    writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: image/jpeg\r\nConnection: close\r\n\r\n" + JPEG[:1000])
+    await writer.drain()
+    await asyncio.sleep(0.05)
+    writer.write(JPEG[1000:])
+    return False
+
+
+async def chunked_response(reader, writer, n):
+    writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: image/jpeg\r\nTransfer-Encoding: chunked\r\n\r\n")
+    for start in range(0, len(JPEG), 700):
+        part = JPEG[start:start + 700]
+        writer.write(f"{len(part):x}\r\n".encode() + part + b"\r\n")
+    writer.write(b"0\r\n\r\n")
+    return True
+
+
+async def stalled_response(reader, writer, n):
+    await reader.read() # Antwortet nie, wartet bis der Client aufgibt
+    return False
+
+
+def fetch_all(respond, count):
+    async def main():
+        async with FakeCamera(respond) as camera:
+            connection = CameraConnection("127.0.0.1", camera.port, "/capture")
+            try:
+                bodies = [await connection.fetch() for _ in range(count)]
+            finally:
+                await connection.close()
+            return bodies, camera
+    return asyncio.run(main())
+
+
+# --- HTTP-Client ---
+def test_keep_alive_reuses_connection():
+    bodies, camera = fetch_all(jpeg_response(), 3)
+    assert bodies == [JPEG] * 3
+    assert len(camera.connect_times) == 1 and camera.requests == 3
+
+
+def test_body_without_content_length_is_read_to_close():
+    bodies, camera = fetch_all(read_to_close_response, 2)
+    assert bodies == [JPEG] * 2 # Nicht nach den ersten 1000 Bytes abgeschnitten
+    assert len(camera.connect_times) == 2
+
+
+def test_chunked_body_is_decoded():
+    bodies, camera = fetch_all(chunked_response, 2)
+    assert bodies == [JPEG] * 2
+    assert len(camera.connect_times) == 1
+
+
+def test_oversized_body_is_rejected(monkeypatch):
+    monkeypatch.setattr(multi_cam_collector, "MAX_RESPONSE_BYTES", 1500)
+    for respond in (read_to_close_response, chunked_response, jpeg_response()):
+        with pytest.raises(CaptureError):
+            fetch_all(respond, 1)
+
+
+@pytest.mark.parametrize("respond", [jpeg_response(status="404 Not Found"),
+                                     jpeg_response(content_type="text/html"),
+                                     jpeg_response(body=b"")])
+def test_bad_response_raises_capture_error(respond):
+    with pytest.raises(CaptureError):
+        fetch_all(respond, 1)
+
+
+# --- Sammler ---
+def make_collector(cameras, **kwargs):
+    collector = MultiCameraCollector(cameras, output_dir=None, frame_gate=False, **kwargs)
+    collector.executor.shutdown()
+    collector.executor = ThreadPoolExecutor(max_workers=2) # OCR im Test ohne Prozesse
+    return collector
+
+
+def test_stalled_camera_times_out_with_exponential_backoff(monkeypatch):
+    monkeypatch.setattr(multi_cam_collector, "_recognize", lambda image_bytes, roi: ("123", 90.0, 1.0))
+    monkeypatch.setattr(multi_cam_collector, "BACKOFF_INITIAL_S", 0.05)
+    monkeypatch.setattr(multi_cam_collector.random, "uniform", lambda a, b: 1.0)
+
+    async def main():
+        async with FakeCamera(stalled_response) as stalled, FakeCamera(jpeg_response()) as healthy:
+            collector = make_collector([stalled.camera("stalled"), healthy.camera("healthy")],
+                                       poll_interval_s=0.02, capture_timeout_s=0.1)
+            asyncio.get_running_loop().call_later(1.3, collector.stop)
+            await collector.run()
+            return collector, stalled
+
+    collector, stalled = asyncio.run(main())
+    # Nach jedem Zeitlimit eine neue Verbindung; Abstände 0.1 s + 0.05, 0.1, 0.2, 0.4 s Backoff
+    gaps = [b - a for a, b in zip(stalled.connect_times, stalled.connect_times[1:])]
+    assert len(gaps) >= 3
+    for shorter, longer in zip(gaps, gaps[1:]):
+        assert longer > shorter + 0.03
+    # Jeder Versuch endet mit einem Zeitlimit (der letzte läuft beim Stoppen evtl. noch)
+    assert collector.stats["stalled"].errors in (len(stalled.connect_times) - 1, len(stalled.connect_times))
+    assert collector.stats["stalled"].captures == 0
+    # Die hängende Kamera bremst die andere nicht
+    assert collector.stats["healthy"].captures >= 20
+    assert collector.stats["healthy"].errors == 0
+
+
+def test_full_ocr_pool_drops_images(monkeypatch):
+    release = threading.Event()
+
+    def slow_recognize(image_bytes, roi):
+        release.wait(5)
+        return "123", 90.0, 1.0
+
+    monkeypatch.setattr(multi_cam_collector, "_recognize", slow_recognize)
+
+    async def main():
+        async with FakeCamera(jpeg_response()) as camera:
+            collector = make_collector([camera.camera()], poll_interval_s=0.02, max_pending_ocr=1)
+            loop = asyncio.get_running_loop()
+            loop.call_later(0.3, release.set)
+            loop.call_later(0.4, collector.stop)
+            await collector.run()
+            return collector
+
+    stats = asyncio.run(main()).stats["cam"]
+    assert stats.captures >= 10
+    assert stats.readings >= 1
+    # Jedes Bild, das nicht gelesen wurde, ist als verworfen gezählt
+    assert stats.dropped == stats.captures - stats.readings
+    assert stats.dropped >= 5
+
+
+def test_summary_numbers():
+    stats = CameraStats()
+    stats.started = time.monotonic() - 60
+    stats.captures = 3
+    stats.errors = 1
+    stats.dropped = 2
+    stats.unchanged = 1
+    stats.bytes_received = 60 * 2048
+    stats.capture_latencies_ms.extend([30, 10, 20])
+    stats.ocr_latencies_ms.extend([100, 200])
+    summary = stats.summary()
+    assert summary.startswith("3 Aufnahmen (3.0/min, 2.0 KiB/s), 1 Fehler, 2 verworfen, 1 unverändert (33%)")
+    assert "Latenz Ø 20 ms / p95 30 ms" in summary
+    assert summary.endswith("OCR Ø 150 ms")
@@ -0,0 +1,46 @@
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+np = pytest.importorskip("numpy")
+pytest.importorskip("pytesseract")
+
+import bild_ausewrtung_multiple_numbers as multi
+import ocr_benchmark
+
+
+def jpeg(width, height):
+    return cv2.imencode(".jpg", np.full((height, width), 200, dtype=np.uint8))[1].tobytes()
+
+
+def test_multi_skips_images_with_clipped_rois(monkeypatch):
+    monkeypatch.setattr(multi, "ocr_variant", lambda roi_processed, variant: {"text": "1", "conf": 95.0})
+    monkeypatch.setattr(multi, "OCR_PARALLEL", False)
+    right = max(r["x"] + r["w"] for r in multi.rois)
+    bottom = max(r["y"] + r["h"] for r in multi.rois)
+    corpus = [("ok.jpg", "111111", jpeg(right, bottom)),
+              ("narrow.jpg", "111111", jpeg(right - 10, bottom)), # Letztes ROI abgeschnitten
+              ("short.jpg", "111111", jpeg(right, bottom - 1))]
+    report = ocr_benchmark.run_multi(corpus, "cascade")
+    assert [entry["image"] for entry in report["per_image"]] == ["ok.jpg"]
+    assert report["summary"]["digit_accuracy"] == 1.0
+
+
+def fake_run_espcam(corpus, params=None):
+    """Statt OCR: Genauigkeit und Latenz aus den Parametern (modulweit, damit picklebar)."""
+    accuracy = {"low": 0.5, "fast": 0.96, "slow": 1.0}[params["mode"]]
+    latency = {"low": 1.0, "fast": 20.0, "slow": 50.0}[params["mode"]]
+    summary = {"images": len(corpus), "digit_accuracy": accuracy, "exact_matches": 0,
+               "latency_ms_mean": latency, "latency_ms_p95": latency}
+    return {"params": params, "per_image": [], "summary": summary}
+
+
+def test_grid_times_qualified_points_separately(monkeypatch):
+    monkeypatch.setattr(ocr_benchmark, "run_espcam", fake_run_espcam)
+    report = ocr_benchmark.run_grid([("a.jpg", "1", b"")], grid={"mode": ["low", "fast", "slow"]},
+                                    workers=2, accuracy_target=0.95)
+    by_mode = {r["params"]["mode"]: r for r in report["results"]}
+    assert all("latency_ms_mean_under_load" in r for r in report["results"])
+    # Nicht ausreichend genaue Kombinationen werden nicht einzeln gemessen
+    assert "latency_ms_mean" not in by_mode["low"]
+    assert by_mode["fast"]["latency_ms_mean"] == 20.0 and by_mode["slow"]["latency_ms_p95"] == 50.0
+    assert report["best"]["params"] == {"mode": "fast"}
@@ -0,0 +1,81 @@
+import json
+
+import pytest
+
+from ocr_cache import DigitOCRCache
+
+THREE = {"extracted_digits": "3", "best_confidence": 91}
+EIGHT = {"extracted_digits": "8", "best_confidence": 88}
+
+
+def flip_bits(value, count):
+    for bit in range(count):
+        value ^= 1 << (bit * 7)
+    return value
+
+
+def test_similar_hash_of_another_roi_is_not_used():
+    cache = DigitOCRCache(max_hamming=2)
+    value = 0x0F0F_3C3C_F0F0_C3C3
+    cache.put(("ziffer1", value), THREE)
+    assert cache.get(("ziffer2", value)) is None            # Gleicher Hash, anderes ROI
+    assert cache.get(("ziffer2", flip_bits(value, 1))) is None
+    assert cache.get(("ziffer1", value)) == THREE
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 2
+
+
+def test_hamming_limit_within_roi():
+    cache = DigitOCRCache(max_hamming=2)
+    value = 0x1234_5678_9ABC_DEF0
+    cache.put(("ziffer1", value), THREE)
+    assert cache.get(("ziffer1", flip_bits(value, 2))) == THREE
+    assert cache.get(("ziffer1", flip_bits(value, 3))) is None
+
+
+def test_exact_match_only():
+    cache = DigitOCRCache(max_hamming=0)
+    value = 0x1234_5678_9ABC_DEF0
+    cache.put(("ziffer1", value), THREE)
+    assert cache.get(("ziffer1", flip_bits(value, 1))) is None
+    assert cache.get(("ziffer1", value)) == THREE
+
+
+def test_nearest_entry_of_same_roi_wins():
+    cache = DigitOCRCache(max_hamming=2)
+    value = 0x1234_5678_9ABC_DEF0
+    cache.put(("ziffer1", flip_bits(value, 2)), EIGHT)
+    cache.put(("ziffer1", flip_bits(value, 1)), THREE)
+    assert cache.get(("ziffer1", value)) == THREE
+
+
+def test_save_and_load_keep_roi(tmp_path):
+    path = str(tmp_path / "cache.json")
+    cache = DigitOCRCache()
+    cache.put(("ziffer1", 42), THREE)
+    cache.put((2, 42), EIGHT) # ROI auch als Index möglich
+    cache.save(path)
+    loaded = DigitOCRCache.load(path)
+    assert loaded.get(("ziffer1", 42)) == THREE
+    assert loaded.get((2, 42)) == EIGHT
+
+
+def test_old_cache_file_without_roi_is_discarded(tmp_path):
+    path = tmp_path / "cache.json"
+    path.write_text(json.dumps({"hash_size": 8, "entries": [["2a", THREE]]}), encoding="utf-8")
+    assert len(DigitOCRCache.load(str(path)).entries) == 0
+
+
+def test_different_digit_images_do_not_share_result():
+    cv2 = pytest.importorskip("cv2")
+    np = pytest.importorskip("numpy")
+
+    def digit_image(digit):
+        image = np.zeros((60, 40), dtype=np.uint8)
+        cv2.putText(image, digit, (5, 50), cv2.FONT_HERSHEY_SIMPLEX, 1.8, 255, 4)
+        return image
+
+    cache = DigitOCRCache()
+    cache.put(cache.key(digit_image("3"), "ziffer1"), THREE)
+    assert cache.get(cache.key(digit_image("8"), "ziffer2")) is None # Andere Ziffer, anderes ROI
+    assert cache.get(cache.key(digit_image("3"), "ziffer2")) is None # Gleiches Bild, anderes ROI
+    assert cache.get(cache.key(digit_image("3"), "ziffer1")) == THREE
@@ -0,0 +1,27 @@
+from ocr_cascade import VariantWinStats
+
+
+def test_exploration_is_decided_per_frame():
+    stats = VariantWinStats(explore_every=3)
+    decisions = []
+    for frame in range(7):
+        decisions.append(stats.should_explore())
+        # Sechs ROIs pro Bild ändern nichts an der Entscheidung für das nächste Bild
+        for _ in range(6):
+            stats.record("Original (Zeichen)", calls=1, early_exit=True)
+    assert decisions == [True, False, False, True, False, False, True]
+
+
+def test_no_exploration_when_disabled():
+    stats = VariantWinStats(explore_every=0)
+    assert not any(stats.should_explore() for _ in range(5))
+
+
+def test_frame_count_survives_save_and_load(tmp_path):
+    path = str(tmp_path / "stats.json")
+    stats = VariantWinStats(explore_every=3)
+    assert stats.should_explore()
+    stats.should_explore()
+    stats.save(path)
+    loaded = VariantWinStats.load(path, explore_every=3)
+    assert [loaded.should_explore(), loaded.should_explore()] == [False, True]